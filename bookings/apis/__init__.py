@@ -7,4 +7,5 @@ from .fast_booking import *
 from .booking_tracker import *
 from .dashboard import *
 from .booking_bulk_update import *
-from .call_connect import *
\ No newline at end of file
+from .call_connect import *
+from .invoice_batch import *
\ No newline at end of file
@@ -10,6 +10,7 @@ from bookings.models import Booking, BookingItem, BookingActionTracker
 from bookings.serializers import BookingSerializer
 from bookings.serializers import BookingBulkUpdateSerializer
 from bookings.utils.calculations import get_booking_calculations
+from bookings.apis.bookings import apply_coupon_redemption
 
 
 
@@ -73,6 +74,7 @@ class BookingBulkUpdateViewSet(GenericViewSet):
                 result["base_total"] - result["final_amount"]
             )
             booking.coupon_id = coupon_id or None
+            apply_coupon_redemption(booking, booking.coupon_id)
             booking.status = "open"
 
         # -------------------------
@@ -116,6 +118,7 @@ class BookingBulkUpdateViewSet(GenericViewSet):
                 result["base_total"] - result["final_amount"]
             )
             booking.coupon_id = coupon_id or None
+            apply_coupon_redemption(booking, booking.coupon_id)
 
         # -------------------------
         # UPDATE ADDRESS
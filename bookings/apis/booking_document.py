@@ -6,14 +6,20 @@ from bookings.models import BookingDocument
 from bookings.serializers import BookingDocumentSerializer
 from bookings.utils.s3_utils import upload_to_s3
 from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+from rest_framework import status
+from drpathcare.direct_uploads import DirectUploadMixin
 
-class BookingDocumentViewSet(viewsets.ModelViewSet):
+class BookingDocumentViewSet(DirectUploadMixin, viewsets.ModelViewSet):
     queryset = BookingDocument.objects.all().order_by("-created_at")
     serializer_class = BookingDocumentSerializer
     parser_classes = (MultiPartParser, FormParser)
+    upload_prefix = "booking_docs/"
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        # Invoice still being generated for the first time → nothing to link to yet
+        qs = super().get_queryset().exclude(doc_type="invoice", file_url="")
         booking_id = self.request.query_params.get("booking")
         if booking_id:
             qs = qs.filter(booking_id=booking_id)
@@ -33,6 +39,16 @@ class BookingDocumentViewSet(viewsets.ModelViewSet):
         file_url = upload_to_s3(file_obj, prefix="booking_docs/")
         serializer.save(file_url=file_url, uploaded_by=self.request.user)
 
+    # POST /booking-documents/confirm/  { upload_token, booking, name, doc_type, ... }
+    @action(detail=False, methods=["post"], url_path="confirm", parser_classes=api_settings.DEFAULT_PARSER_CLASSES)
+    def confirm(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file_url = self.confirm_direct_upload(request.data.get("upload_token"))
+        serializer.save(file_url=file_url, uploaded_by=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 class ClientBookingDocumentViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -50,7 +66,7 @@ class ClientBookingDocumentViewSet(viewsets.ReadOnlyModelViewSet):
 
         qs = BookingDocument.objects.filter(
             booking__user=user
-        ).select_related("booking").order_by("-created_at")
+        ).exclude(doc_type="invoice", file_url="").select_related("booking").order_by("-created_at")
 
         # ⛔ Hide invoice if payment not successful
         qs = qs.exclude(
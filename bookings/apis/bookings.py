@@ -4,15 +4,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
 from drpathcare.pagination import StandardResultsSetPagination
+from drpathcare.sparse_fields import SparseFieldsMixin
+from drpathcare.direct_uploads import DirectUploadMixin
 from bookings.models import Booking, BookingItem, BookingActionTracker
 from bookings.serializers import BookingSerializer, BookingItemSerializer, BookingActionTrackerSerializer
 from decimal import Decimal
 from rest_framework.exceptions import ValidationError
 from bookings.utils.calculations import get_booking_calculations
-from payments.utils import create_payment_link
+from bookings.utils.coupons import sync_booking_coupon, CouponUnavailable
+from payments.links import request_payment_link
 from payments.models import BookingPayment
 from bookings.utils.s3_utils import upload_to_s3 
-from bookings.utils.invoice import generate_invoice_pdf
+from bookings.utils.invoice_jobs import enqueue_invoice
 from users.models import User
 from django.db.models import Count, Q
 from notifications.utils.push_service import send_expo_push_notification # Ensure this matches your util filename
@@ -46,9 +49,20 @@ def build_verification_notes(booking):
 
     return "\n".join(lines)
 
-class BookingViewSet(viewsets.ModelViewSet):
+def apply_coupon_redemption(booking, coupon_id):
+    try:
+        sync_booking_coupon(booking, coupon_id)
+    except CouponUnavailable as e:
+        raise ValidationError({"coupon": str(e)})
+
+
+class BookingViewSet(DirectUploadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all().select_related("user", "address", "coupon").prefetch_related("items")
     serializer_class = BookingSerializer
+    # POST /bookings/presign/ → cash proof goes straight to storage, update sends upload_token
+    upload_prefix = "cash_payments/"
+    expandable_fields = ["items", "actions", "user_detail", "address_detail", "coupon_detail"]
+    sparse_field_columns = {"view_stack": []}
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -120,6 +134,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         booking.total_savings = result["base_total"] - result["final_amount"]
         booking.save()
 
+        # ✅ 4b. Redeem coupon (atomic global / per-user usage counters)
+        apply_coupon_redemption(booking, booking.coupon_id)
+
         # ✅ 5. Log creation
         BookingActionTracker.objects.create(
             booking=booking,
@@ -132,8 +149,21 @@ class BookingViewSet(viewsets.ModelViewSet):
 
 
 
-    @transaction.atomic
     def perform_update(self, serializer):
+        # Storage HEAD for a presigned payment proof runs before the row locks are taken
+        data = self.request.data
+        proof_url = None
+        if (
+            data.get("action_type") == "update_payment"
+            and data.get("payment_method") in ("cash", "upi")
+            and data.get("upload_token")
+            and data.get("remarks", "").strip()  # else _perform_update rejects it; keep the token unused
+        ):
+            proof_url = self.confirm_direct_upload(data.get("upload_token"))
+        self._perform_update(serializer, proof_url)
+
+    @transaction.atomic
+    def _perform_update(self, serializer, proof_url=None):
         booking = serializer.instance
         data = self.request.data
         action_type = data.get("action_type")
@@ -158,10 +188,8 @@ class BookingViewSet(viewsets.ModelViewSet):
             booking.status = new_status
 
             if new_status == "sample_collected":
-                try:
-                    generate_invoice_pdf(booking.id)
-                except:
-                    pass
+                # Rendered + uploaded by the invoice worker after commit
+                enqueue_invoice(booking.id)
             
             # ✅ SPECIAL CASE: VERIFIED
             if new_status == "verified" and booking.initial_amount:
@@ -231,9 +259,12 @@ class BookingViewSet(viewsets.ModelViewSet):
                 booking.status = "payment_collected"
                 booking.save(update_fields=["payment_method", "payment_status", "status"])
 
-                # 🧾 Upload optional proof file via S3 utility
+                # 🧾 Optional proof: presigned upload (confirmed in perform_update), or legacy multipart file
                 file_obj = self.request.FILES.get("file")
-                file_url = upload_to_s3(file_obj, prefix="cash_payments/") if file_obj else None
+                if proof_url:
+                    file_url = proof_url
+                else:
+                    file_url = upload_to_s3(file_obj, prefix="cash_payments/") if file_obj else None
 
                 # 💰 Create payment record
                 BookingPayment.objects.create(
@@ -249,7 +280,8 @@ class BookingViewSet(viewsets.ModelViewSet):
                 booking.payment_status = payment_status or "initiated"
                 booking.save(update_fields=["payment_method", "payment_status"])
 
-                create_payment_link(
+                # Pending payment row now, Razorpay link after commit (no HTTP under the row lock)
+                request_payment_link(
                     booking=booking,
                     amount=booking.final_amount,
                     email=booking.user.email,
@@ -303,6 +335,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             booking.total_savings = result["base_total"] - result["final_amount"]
             booking.coupon_id = data.get("coupon") or None
             booking.status = "open"
+            apply_coupon_redemption(booking, booking.coupon_id)
             booking.save(
                 update_fields=[
                     "base_total",
@@ -353,6 +386,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             booking.discount_amount = result["total_discount"]
             booking.final_amount = result["final_amount"]
             booking.total_savings = result["base_total"] - result["final_amount"]
+            apply_coupon_redemption(booking, booking.coupon_id)
             booking.save(update_fields=[
                 "coupon",
                 "admin_discount",
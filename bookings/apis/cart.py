@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -6,6 +8,15 @@ from django.db import transaction
 from bookings.models import Cart, CartItem
 from bookings.serializers import CartSerializer, CartItemSerializer
 from lab.models import LabTest, Profile, Package
+from bookings.models import Booking
+from bookings.serializers import ClientBookingSerializer
+from bookings.apis.client_bookings import CLIENT_BOOKING_SELECT, CLIENT_BOOKING_PREFETCH
+from bookings.utils.cart import sync_cart, CartError
+from bookings.utils.checkout import checkout_cart
+from bookings.utils.coupons import CouponUnavailable
+from payments.links import request_payment_link
+
+logger = logging.getLogger(__name__)
 
 
 class CartViewSet(viewsets.ModelViewSet):
@@ -73,6 +84,74 @@ class CartViewSet(viewsets.ModelViewSet):
         serializer = CartSerializer(cart, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["put", "post"])
+    def sync(self, request):
+        """
+        PUT  /carts/sync/  { "items": [{"product_type": "Package", "product_id": 3}, ...] }
+             → cart holds exactly these items
+        POST /carts/sync/  same body → items are added, existing ones kept
+        """
+        try:
+            cart, added, removed = sync_cart(
+                request.user,
+                request.data.get("items", []),
+                replace=request.method == "PUT",
+            )
+        except CartError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        cart = Cart.objects.prefetch_related("items").get(pk=cart.pk)
+        serializer = CartSerializer(cart, context={"request": request})
+        return Response({**serializer.data, "added": added, "removed": removed}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def checkout(self, request):
+        """
+        POST /carts/checkout/
+        {
+            "patient": 12,                      # default for every item
+            "patients": {"<cart_item_id>": 14},  # optional per-item override
+            "address": 5, "scheduled_date": "2026-10-21", "scheduled_time_slot": "...",
+            "coupon": "<coupon_id>" | "coupon_code": "SAVE10",
+            "payment": "online"                  # optional → payment link
+        }
+        With "payment": "online" the response carries payment_id; the link is
+        created in the background and appears on that payment once ready.
+        """
+        try:
+            booking = checkout_cart(request.user, request.data, actor=request.user)
+        except (CartError, CouponUnavailable) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Pending payment row now, Razorpay link in the background (no gateway round trip here)
+        payment = None
+        if request.data.get("payment") == "online" and booking.final_amount > 0:
+            try:
+                payment = request_payment_link(
+                    booking=booking,
+                    amount=booking.final_amount,
+                    email=request.user.email,
+                    phone=request.user.mobile,
+                )
+            except Exception:
+                logger.exception("Payment link request failed for booking %s", booking.id)
+
+        booking = (
+            Booking.objects
+            .select_related(*CLIENT_BOOKING_SELECT)
+            .prefetch_related(*CLIENT_BOOKING_PREFETCH)
+            .get(pk=booking.pk)
+        )
+        serializer = ClientBookingSerializer(booking, context={"request": request})
+        return Response(
+            {
+                **serializer.data,
+                "payment_id": str(payment.pk) if payment else None,
+                "payment_link": payment.payment_link if payment else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=["post"])
     def clear(self, request):
         cart, _ = Cart.objects.get_or_create(user=request.user)
@@ -1,11 +1,48 @@
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.response import Response
 from drpathcare.pagination import StandardResultsSetPagination
-from bookings.models import Booking, BookingActionTracker
+from drpathcare.sparse_fields import SparseFieldsMixin
+from django.db.models import Prefetch
+from bookings.models import Booking, BookingItem, BookingActionTracker
 from bookings.serializers import ClientBookingSerializer
 
 
-class ClientBookingViewSet(viewsets.ModelViewSet):
+# ------------------------------
+# Prefetch plan for ClientBookingSerializer
+# Fixed query count per page: bookings + items (with patient/user/products
+# joined) + profile tests + package tests + payments + documents.
+# ------------------------------
+CLIENT_BOOKING_ITEMS = Prefetch(
+    "items",
+    queryset=BookingItem.objects.select_related(
+        "patient__user",
+        "lab_test__category",
+        "profile__category",
+        "profile__image",
+        "package__category",
+        "package__image",
+    ),
+)
+
+CLIENT_BOOKING_PREFETCH = (
+    CLIENT_BOOKING_ITEMS,
+    "items__profile__tests",
+    "items__package__tests",
+    "payments",
+    "documents",
+)
+
+CLIENT_BOOKING_SELECT = (
+    "coupon",
+    "user__role",
+    "user__parent",
+    "address__location",
+    "address__user__role",
+    "address__user__parent",
+)
+
+
+class ClientBookingViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """
     Client-side Booking API:
     
@@ -16,11 +53,12 @@ class ClientBookingViewSet(viewsets.ModelViewSet):
     - PUT disabled
     """
     queryset = Booking.objects.all().select_related(
-        "address", "coupon"
-    ).prefetch_related("items", "payments", "documents")
+        *CLIENT_BOOKING_SELECT
+    ).prefetch_related(*CLIENT_BOOKING_PREFETCH)
 
     serializer_class = ClientBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    expandable_fields = ["items", "payments", "documents", "user_detail", "address_detail"]
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
 
@@ -5,8 +5,11 @@ from django.utils import timezone
 from decimal import Decimal
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from bookings.models import Coupon, CouponRedemption
+from django.core.exceptions import ValidationError as DjangoValidationError
+from bookings.models import Coupon, CouponRedemption, Cart
 from bookings.serializers import CouponSerializer, CouponRedemptionSerializer
+from bookings.utils.coupons import get_active_coupon, compute_discount, limit_error, rank_coupons
+from bookings.utils.calculations import get_price_totals
 
 from drpathcare.pagination import StandardResultsSetPagination
 
@@ -44,32 +47,20 @@ class CouponViewSet(viewsets.ModelViewSet):
         if not code:
             return Response({"error": "Coupon code is required"}, status=400)
 
-        try:
-            coupon = Coupon.objects.get(code__iexact=code)
-        except Coupon.DoesNotExist:
-            return Response({"valid": False, "message": "Invalid coupon"}, status=400)
-
-        # ✅ Check active and date range
-        if not coupon.is_valid_now():
+        # ✅ Active + date range come from the in-process coupon table
+        coupon = get_active_coupon(code=code)
+        if coupon is None:
+            if not Coupon.objects.filter(code__iexact=code).exists():
+                return Response({"valid": False, "message": "Invalid coupon"}, status=400)
             return Response({"valid": False, "message": "Coupon is not active or expired"}, status=400)
 
-        # ✅ Global usage limit
-        if coupon.usage_limit is not None and coupon.remaining_global_uses() == 0:
-            return Response({"valid": False, "message": "Coupon usage limit reached"}, status=400)
-
-        # ✅ Per-user usage limit
-        user_uses = CouponRedemption.objects.filter(coupon=coupon, user=user).count()
-        if coupon.per_user_limit is not None and user_uses >= coupon.per_user_limit:
-            return Response({"valid": False, "message": "You have already used this coupon"}, status=400)
+        # ✅ Global + per-user usage limit (one query, only for limited coupons)
+        error = limit_error(coupon, user)
+        if error:
+            return Response({"valid": False, "message": error}, status=400)
 
         # ✅ Calculate discount
-        discount = Decimal("0.00")
-        if coupon.discount_type == "percent":
-            discount = (base_total * coupon.discount_value) / Decimal("100")
-            if coupon.max_discount_amount:
-                discount = min(discount, coupon.max_discount_amount)
-        else:
-            discount = coupon.discount_value
+        discount = compute_discount(coupon, base_total)
 
         final_amount = base_total - discount
         if final_amount < 0:
@@ -82,3 +73,35 @@ class CouponViewSet(viewsets.ModelViewSet):
             "final_amount": str(final_amount),
             "message": "Coupon applied successfully",
         })
+
+    @action(detail=False, methods=["post"], url_path="best")
+    def best_coupons(self, request):
+        """
+        Ranks every coupon the user can redeem for a cart.
+        Body: {} (own cart), {"cart": "<id>"} or {"items": [{"product_type", "product_id"}, ...]}
+        """
+        items = request.data.get("items")
+        if items is None:
+            carts = Cart.objects.all() if request.user.role else Cart.objects.filter(user=request.user)
+            cart_id = request.data.get("cart")
+            cart = (carts.filter(id=cart_id) if cart_id else carts.filter(user=request.user)).first()
+            if cart is None:
+                return Response({"error": "Cart not found"}, status=404)
+            rows = list(cart.items.values_list("base_price", "offer_price"))
+            base_total = sum((base for base, _ in rows), Decimal("0.00"))
+            offer_total = sum(((offer or base) for base, offer in rows), Decimal("0.00"))
+            user = cart.user_id
+        else:
+            try:
+                base_total, offer_total = get_price_totals(items)
+            except (DjangoValidationError, TypeError, ValueError) as e:
+                return Response({"error": str(getattr(e, "message", e))}, status=400)
+            user = request.user.pk
+
+        options = rank_coupons(base_total, offer_total, user)
+        return Response({
+            "base_total": str(base_total),
+            "offer_total": str(offer_total),
+            "best": options[0] if options else None,
+            "options": options,
+        })
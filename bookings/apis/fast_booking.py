@@ -1,7 +1,9 @@
 from rest_framework import viewsets, permissions, filters
 from drpathcare.pagination import StandardResultsSetPagination
+from drpathcare.sparse_fields import SparseFieldsMixin
+from drpathcare.fast_rows import FastRowsListMixin
 from bookings.models import Booking
-from bookings.serializers import BookingFastListSerializer
+from bookings.serializers import BookingFastListSerializer, BookingFastListRowMapper
 from django.conf import settings
 from datetime import datetime
 from django.db.models import Count, Q
@@ -10,12 +12,22 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from bookings.utils.export import generate_booking_excel_and_email
 
-class BookingFastListViewSet(viewsets.ReadOnlyModelViewSet):
+class BookingFastListViewSet(SparseFieldsMixin, FastRowsListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Ultra-fast CRM listing endpoint.
     No nested data, minimal DB columns, optimized queries.
+    Supports ?fields= to trim columns further and ?fast=1 for .values() rendering.
     """
     serializer_class = BookingFastListSerializer
+    fast_row_mapper_class = BookingFastListRowMapper
+    sparse_field_columns = {
+        "user_str": ["user__first_name", "user__last_name", "user__mobile"],
+        "address_str": ["address"],
+        "location_str": ["address"],
+        "created_by_str": [],
+        "view_stack": [],
+        "total_tests": [],
+    }
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -0,0 +1,62 @@
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from bookings.utils.invoice_batch import acquire_batch_lock, invoice_booking_ids, release_batch_lock
+
+
+class InvoiceBatchAPIView(APIView):
+    """
+    POST /api/invoices/batch/
+    { "month": "2026-09" }  or  { "booking_ids": [...] }
+
+    Hands the batch to the `generate_invoices` command in its own process and
+    returns immediately. View-all CRM roles only; one batch at a time.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        role = getattr(request.user, "role", None)
+        if not role or not role.view_all:
+            raise PermissionDenied("Only view-all CRM roles can run invoice batches.")
+
+        month = request.data.get("month")
+        booking_ids = request.data.get("booking_ids") or []
+
+        if month and not re.fullmatch(r"\d{4}-\d{2}", str(month)):
+            raise ValidationError({"month": "Use YYYY-MM."})
+        if booking_ids and not isinstance(booking_ids, list):
+            raise ValidationError({"booking_ids": "Must be a list."})
+        if not (month or booking_ids):
+            raise ValidationError({"detail": "month or booking_ids is required."})
+
+        ids = invoice_booking_ids(booking_ids, month)
+        if not ids:
+            return Response({"message": "No bookings matched.", "count": 0})
+
+        if not acquire_batch_lock():
+            return Response(
+                {"message": "Another invoice batch is running."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # The command owns the lock from here and releases it when it exits
+        command = [sys.executable, str(settings.BASE_DIR / "manage.py"), "generate_invoices", "--lock-held"]
+        command += ["--month", month] if month and not booking_ids else ["--ids", *map(str, ids)]
+        try:
+            subprocess.Popen(command, start_new_session=True)
+        except OSError:
+            release_batch_lock()
+            raise
+
+        return Response(
+            {"message": "Invoice generation started.", "count": len(ids)},
+            status=status.HTTP_202_ACCEPTED,
+        )
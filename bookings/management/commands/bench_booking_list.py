@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from bookings.models import Booking
+from bookings.serializers import BookingFastListRowMapper, BookingFastListSerializer
+
+
+class Command(BaseCommand):
+    help = "Rows/second for the CRM booking list: BookingFastListSerializer vs the ?fast=1 row mapper."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Bookings rendered per run (newest first)")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        # Same shape as BookingFastListViewSet.get_queryset()
+        queryset = (
+            Booking.objects.select_related("user")
+            .annotate(
+                payment_count=Count("payments", distinct=True),
+                document_count=Count("documents", distinct=True),
+            )
+            .order_by("-created_at")
+        )
+
+        def serializer_run():
+            return BookingFastListSerializer(list(queryset[:rows]), many=True).data
+
+        def mapper_run():
+            mapper = BookingFastListRowMapper()
+            return mapper.render(mapper.values_queryset(queryset)[:rows])
+
+        rendered = len(mapper_run())
+        if not rendered:
+            self.stdout.write("No bookings to render.")
+            return
+
+        results = {}
+        for label, run in (("serializer", serializer_run), ("fast rows", mapper_run)):
+            best = min(self._timed(run) for _ in range(repeat))
+            results[label] = best
+            self.stdout.write(f"{label:<10} : {rendered / best:,.0f} rows/s ({best * 1000:.1f} ms / {rendered} rows)")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up x{results['serializer'] / results['fast rows']:.2f}"))
+
+    @staticmethod
+    def _timed(run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
@@ -0,0 +1,76 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from bookings.models import Cart, CartItem
+from bookings.utils.cart import reprice_cart_items
+from lab.models import LabCategory, LabTest
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Timing of reprice_cart_items() over N cart items: full pass with every snapshot stale, "
+        "full pass with nothing to change, and one product's price change. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100_000)
+        parser.add_argument("--per-cart", type=int, default=10)
+        parser.add_argument("--products", type=int, default=300)
+
+    def handle(self, *args, **options):
+        items, per_cart, products = options["items"], options["per_cart"], options["products"]
+
+        with transaction.atomic():
+            tests = self._seed(items, per_cart, products)
+            results = [
+                ("full pass, all stale", self._timed(reprice_cart_items)),
+                ("full pass, nothing stale", self._timed(reprice_cart_items)),
+            ]
+            # What a LabTest price edit schedules on commit
+            LabTest.objects.filter(pk=tests[0].pk).update(price=Decimal("999"))
+            results.append(("one product changed", self._timed(lambda: reprice_cart_items(lab_test_ids=[tests[0].pk]))))
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{items:,} cart items in {items // per_cart:,} carts, {products} products")
+        for label, (elapsed, (changed, carts)) in results:
+            self.stdout.write(f"{label:<26}: {elapsed * 1000:9.1f} ms  ({changed:,} items, {carts:,} carts changed)")
+
+    @staticmethod
+    def _seed(items, per_cart, products):
+        category = LabCategory.objects.create(name="bench-cart", entity_type="lab_test")
+        tests = LabTest.objects.bulk_create(
+            LabTest(name=f"bench-cart-test-{n}", category=category, price=Decimal(100 + n), offer_price=Decimal(90 + n))
+            for n in range(products)
+        )
+        users = User.objects.bulk_create(
+            (User(mobile=f"7{n:09d}", email=f"bench-cart-{n}@example.com", password="!")
+             for n in range(items // per_cart)),
+            batch_size=5000,
+        )
+        carts = Cart.objects.bulk_create((Cart(user=user) for user in users), batch_size=5000)
+        # Snapshots taken at old prices, so every item is stale
+        CartItem.objects.bulk_create(
+            (
+                CartItem(
+                    cart=cart, product_type="LabTest", product_id=tests[(c * per_cart + n) % products].pk,
+                    product_name="old name", base_price=Decimal("1"), offer_price=None,
+                )
+                for c, cart in enumerate(carts)
+                for n in range(per_cart)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {CartItem._meta.db_table}")
+            cursor.execute(f"ANALYZE {Cart._meta.db_table}")
+        return tests
+
+    @staticmethod
+    def _timed(run):
+        start = time.perf_counter()
+        result = run()
+        return time.perf_counter() - start, result
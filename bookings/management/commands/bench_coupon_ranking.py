@@ -0,0 +1,77 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bookings.models import Coupon
+from bookings.utils.coupons import active_coupons, bump_coupon_version, compute_discount, limit_error, rank_coupons
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Best-coupon evaluation over N active coupons: rank_coupons() (one usage query) vs checking "
+        "each coupon with limit_error(). Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--coupons", type=int, default=1000)
+        parser.add_argument("--runs", type=int, default=50)
+
+    def handle(self, *args, **options):
+        count, runs = options["coupons"], options["runs"]
+        base_total, offer_total = Decimal("2400"), Decimal("1999")
+
+        with transaction.atomic():
+            user = self._seed(count)
+            bump_coupon_version()
+            rank_coupons(base_total, offer_total, user.pk)  # load the in-process table
+
+            def per_coupon():
+                options = []
+                for coupon in active_coupons():
+                    if coupon.is_valid_now() and limit_error(coupon, user.pk) is None:
+                        options.append((compute_discount(coupon, base_total), coupon.code))
+                return sorted(options, reverse=True)
+
+            results = [
+                ("rank_coupons", self._time(runs, lambda: rank_coupons(base_total, offer_total, user.pk))),
+                ("limit_error per coupon", self._time(runs, per_coupon)),
+            ]
+            transaction.set_rollback(True)
+        bump_coupon_version()  # drop the snapshot holding the rolled-back coupons
+
+        self.stdout.write(f"{count:,} active coupons, {runs} evaluations")
+        for label, samples in results:
+            p50 = statistics.median(samples)
+            p99 = statistics.quantiles(samples, n=100)[98]
+            self.stdout.write(
+                f"{label:<24}: p50 {p50 * 1000:8.2f} ms, p99 {p99 * 1000:8.2f} ms, "
+                f"{p50 / count * 1e6:6.2f} us/coupon"
+            )
+
+    @staticmethod
+    def _seed(count):
+        Coupon.objects.bulk_create(
+            Coupon(
+                code=f"BENCH{n:05d}",
+                discount_type="percent" if n % 2 else "flat",
+                discount_value=Decimal(n % 40 + 1),
+                max_discount_amount=Decimal("300") if n % 2 else None,
+                usage_limit=100 if n % 3 == 0 else None,
+                per_user_limit=1 if n % 5 == 0 else None,
+            )
+            for n in range(count)
+        )
+        return User.objects.create_user(email="bench-coupons@example.com", mobile="9999999902")
+
+    @staticmethod
+    def _time(runs, run):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+        return samples
@@ -0,0 +1,93 @@
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from bookings.apis import bookings as booking_api
+from bookings.apis.bookings import BookingViewSet
+from bookings.models import Booking, BookingItem
+from bookings.utils.invoice import generate_invoice_pdf
+from drpathcare import storage
+from lab.models import LabCategory, LabTest
+from users.models import Address, Location, Patient, Role, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency of PATCH /bookings/<id>/ moving a booking to sample_collected: invoice queued after "
+        "commit (enqueue_invoice) vs rendered and uploaded inside the request. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument("--items", type=int, default=5, help="Booking items on the invoice")
+        parser.add_argument("--upload-latency", type=float, default=0.0,
+                            help="Seconds added to every storage write (stand-in for the S3 round trip)")
+
+    def handle(self, *args, **options):
+        runs, latency = options["runs"], options["upload_latency"]
+        root = tempfile.TemporaryDirectory()
+        backend = storage.LocalStorageBackend(root=root.name)
+        save = backend.save
+
+        def slow_save(*args, **kwargs):
+            time.sleep(latency)
+            return save(*args, **kwargs)
+
+        backend.save = slow_save
+
+        with root, transaction.atomic(), mock.patch.object(storage, "_backend", backend):
+            user, booking = self._seed(options["items"])
+            view = BookingViewSet.as_view({"patch": "partial_update"})
+            factory = APIRequestFactory()
+
+            def run():
+                request = factory.patch(
+                    f"/api/bookings/{booking.pk}/",
+                    {"action_type": "update_status", "status": "sample_collected", "remarks": "Sample picked up"},
+                    format="json",
+                )
+                force_authenticate(request, user=user)
+                start = time.perf_counter()
+                response = view(request, pk=booking.pk)
+                elapsed = time.perf_counter() - start
+                assert response.status_code == 200, response.data
+                return elapsed
+
+            # The outer transaction never commits, so queued jobs never start
+            queued = [run() for _ in range(runs)]
+            with mock.patch.object(booking_api, "enqueue_invoice", generate_invoice_pdf):
+                inline = [run() for _ in range(runs)]
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{runs} updates, {options['items']} items, upload latency {latency * 1000:.0f} ms")
+        for label, samples in (("queued after commit", queued), ("rendered in request", inline)):
+            p50 = statistics.median(samples) * 1000
+            p99 = statistics.quantiles(samples, n=100)[98] * 1000
+            self.stdout.write(f"{label:<20}: p50 {p50:7.1f} ms, p99 {p99:7.1f} ms")
+
+    @staticmethod
+    def _seed(items):
+        role = Role.objects.create(name="bench-status-agent")
+        user = User.objects.create_user(
+            email="bench-status@example.com", mobile="9999999901", first_name="Bench", role=role
+        )
+        location, _ = Location.objects.get_or_create(
+            pincode="560001", defaults={"city": "Bengaluru", "state": "Karnataka"}
+        )
+        address = Address.objects.create(user=user, line1="12 MG Road", location=location)
+        patient = Patient.objects.create(user=user, first_name="Bench", last_name="Patient")
+        category = LabCategory.objects.create(name="bench-status", entity_type="lab_test")
+        booking = Booking.objects.create(user=user, address=address, status="open")
+        for n in range(items):
+            test = LabTest.objects.create(name=f"bench-status-test-{n}", category=category, price=Decimal("300"))
+            BookingItem.objects.create(
+                booking=booking, patient=patient, lab_test=test, base_price=Decimal("300"), offer_price=Decimal("250")
+            )
+        return user, booking
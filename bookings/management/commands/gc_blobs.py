@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.models import BookingDocument, ConfirmedUpload, StoredBlob
+from drpathcare.storage import DIRECT_UPLOAD_EXPIRES, get_storage
+from payments.models import BookingPayment
+
+
+class Command(BaseCommand):
+    help = "Delete stored blobs no row references anymore (ref_count=0 past the grace period)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-days", type=int, default=7,
+                            help="Keep unreferenced blobs this long (an upload may still be confirmed)")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["grace_days"])
+        candidates = StoredBlob.objects.filter(ref_count=0, last_used_at__lt=cutoff)
+
+        # Belt and braces: never drop an object a row still points at
+        urls = list(candidates.values_list("file_url", flat=True))
+        in_use = set(
+            BookingDocument.objects.filter(file_url__in=urls).values_list("file_url", flat=True)
+        ) | set(
+            BookingPayment.objects.filter(file_url__in=urls).values_list("file_url", flat=True)
+        )
+
+        storage = get_storage()
+        removed = 0
+        for blob in candidates.exclude(file_url__in=in_use).iterator():
+            if not options["dry_run"]:
+                storage.delete(blob.key)
+                blob.delete()
+            removed += 1
+
+        # Confirmation records only matter while their upload token can still be presented
+        if not options["dry_run"]:
+            ConfirmedUpload.objects.filter(
+                confirmed_at__lt=timezone.now() - timedelta(seconds=DIRECT_UPLOAD_EXPIRES * 2)
+            ).delete()
+
+        verb = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} blobs ({len(in_use)} still referenced)."))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.utils.invoice_batch import (
+    INVOICE_BATCH_CHUNK,
+    INVOICE_UPLOAD_WORKERS,
+    acquire_batch_lock,
+    generate_invoices,
+    invoice_booking_ids,
+    release_batch_lock,
+)
+
+
+class Command(BaseCommand):
+    help = "Regenerate booking invoices in bulk (process pool render + concurrent upload)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="YYYY-MM, invoiceable bookings created that month")
+        parser.add_argument("--ids", nargs="+", help="Explicit booking ids")
+        parser.add_argument("--workers", type=int, default=None, help="Render processes (default: all cores)")
+        parser.add_argument("--upload-workers", type=int, default=INVOICE_UPLOAD_WORKERS)
+        parser.add_argument("--chunk-size", type=int, default=INVOICE_BATCH_CHUNK)
+        parser.add_argument("--output-dir", help="Write PDFs here instead of uploading (no documents saved)")
+        parser.add_argument(
+            "--lock-held", action="store_true",
+            help="The batch lock was already taken by the caller (invoice batch API); release it when done",
+        )
+
+    def handle(self, *args, **options):
+        if not (options["month"] or options["ids"]):
+            raise CommandError("Pass --month or --ids.")
+        if not options["lock_held"] and not acquire_batch_lock():
+            raise CommandError("Another invoice batch is running.")
+
+        try:
+            booking_ids = invoice_booking_ids(options["ids"], options["month"])
+            if not booking_ids:
+                self.stdout.write("No bookings matched.")
+                return
+
+            stats = generate_invoices(
+                booking_ids,
+                workers=options["workers"],
+                upload_workers=options["upload_workers"],
+                chunk_size=options["chunk_size"],
+                output_dir=options["output_dir"],
+            )
+        finally:
+            release_batch_lock()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {stats['rendered']}/{stats['total']} invoices, uploaded {stats['uploaded']}, "
+            f"failed {stats['failed']} in {stats['seconds']}s ({stats['per_second']} invoices/s)."
+        ))
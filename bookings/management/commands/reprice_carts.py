@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.utils.cart import reprice_cart_items
+
+
+class Command(BaseCommand):
+    help = "Refresh every CartItem price/name snapshot from the current catalog."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        items, carts = reprice_cart_items()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-priced {items} cart items across {carts} carts in {elapsed:.2f}s."
+        ))
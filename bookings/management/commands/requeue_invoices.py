@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from bookings.utils.invoice_jobs import INVOICE_STALE_AFTER, requeue_stale_invoices
+
+
+class Command(BaseCommand):
+    help = "Re-run invoice jobs left pending/processing by a restart or deploy (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-after", type=int, default=INVOICE_STALE_AFTER,
+                            help="Minutes a job may sit in pending/processing before it is considered lost")
+
+    def handle(self, *args, **options):
+        doc_ids = requeue_stale_invoices(stale_after=options["stale_after"], wait=True)
+        self.stdout.write(self.style.SUCCESS(f"Re-ran {len(doc_ids)} stale invoice jobs."))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_usage_counters(apps, schema_editor):
+    Coupon = apps.get_model("bookings", "Coupon")
+    CouponRedemption = apps.get_model("bookings", "CouponRedemption")
+    CouponUsage = apps.get_model("bookings", "CouponUsage")
+
+    totals = CouponRedemption.objects.values("coupon_id").annotate(n=Count("id"))
+    for row in totals:
+        Coupon.objects.filter(pk=row["coupon_id"]).update(used_count=row["n"])
+
+    per_user = CouponRedemption.objects.values("coupon_id", "user_id").annotate(n=Count("id"))
+    CouponUsage.objects.bulk_create(
+        [CouponUsage(coupon_id=row["coupon_id"], user_id=row["user_id"], count=row["n"]) for row in per_user],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0019_storedblob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coupon',
+            name='used_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='CouponUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='bookings.coupon')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_usages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('coupon', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_usage_counters, migrations.RunPython.noop),
+    ]
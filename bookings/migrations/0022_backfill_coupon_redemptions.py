@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count, Exists, OuterRef
+
+
+def backfill_coupon_redemptions(apps, schema_editor):
+    """
+    Bookings created before redemptions were tracked carry a coupon but no
+    CouponRedemption row, so editing them would redeem the coupon again.
+    Record those uses, then recount the usage counters from redemptions.
+    """
+    Booking = apps.get_model("bookings", "Booking")
+    Coupon = apps.get_model("bookings", "Coupon")
+    CouponRedemption = apps.get_model("bookings", "CouponRedemption")
+    CouponUsage = apps.get_model("bookings", "CouponUsage")
+
+    legacy = (
+        Booking.objects
+        .filter(coupon__isnull=False)
+        .exclude(status="cancelled")
+        .exclude(Exists(CouponRedemption.objects.filter(booking=OuterRef("pk"))))
+        .values_list("id", "coupon_id", "user_id")
+    )
+    CouponRedemption.objects.bulk_create(
+        [CouponRedemption(coupon_id=coupon_id, user_id=user_id, booking_id=booking_id)
+         for booking_id, coupon_id, user_id in legacy.iterator(chunk_size=1000)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    Coupon.objects.update(used_count=0)
+    for row in CouponRedemption.objects.values("coupon_id").annotate(n=Count("id")):
+        Coupon.objects.filter(pk=row["coupon_id"]).update(used_count=row["n"])
+
+    CouponUsage.objects.all().delete()
+    per_user = CouponRedemption.objects.values("coupon_id", "user_id").annotate(n=Count("id"))
+    CouponUsage.objects.bulk_create(
+        [CouponUsage(coupon_id=row["coupon_id"], user_id=row["user_id"], count=row["n"]) for row in per_user],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0021_bookingdocument_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_coupon_redemptions, migrations.RunPython.noop),
+    ]
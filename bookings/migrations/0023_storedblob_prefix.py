@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def backfill_prefix(apps, schema_editor):
+    # Keys were always "<prefix><sha256><ext>"
+    StoredBlob = apps.get_model("bookings", "StoredBlob")
+    for blob in StoredBlob.objects.only("id", "sha256", "key").iterator():
+        index = blob.key.find(blob.sha256)
+        prefix = blob.key[:index] if index > 0 else ""
+        if prefix:
+            StoredBlob.objects.filter(pk=blob.pk).update(prefix=prefix)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0022_backfill_coupon_redemptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedblob',
+            name='prefix',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_prefix, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='storedblob',
+            name='sha256',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='storedblob',
+            constraint=models.UniqueConstraint(fields=('sha256', 'prefix'), name='storedblob_sha256_prefix_uniq'),
+        ),
+    ]
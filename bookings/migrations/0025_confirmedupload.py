@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0024_joblock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmedUpload',
+            fields=[
+                ('key', models.CharField(max_length=1024, primary_key=True, serialize=False)),
+                ('confirmed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
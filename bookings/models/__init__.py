@@ -3,4 +3,7 @@ from .booking_items import *
 from .booking_tracker import *
 from .cart import *
 from .coupons import *
-from .booking_document import *
\ No newline at end of file
+from .booking_document import *
+from .stored_blob import *
+from .job_lock import *
+from .confirmed_upload import *
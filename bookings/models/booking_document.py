@@ -3,6 +3,13 @@ from django.db import models
 from bookings.models.booking import Booking
 
 class BookingDocument(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="documents")
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
@@ -11,5 +18,11 @@ class BookingDocument(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     doc_type = models.CharField(max_length=50, blank=True, null=True)  # e.g. 'cash_receipt', 'lab_report', etc.
 
+    # Generation state for system-built documents (invoices); uploads are always "ready"
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="ready")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error_message = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return f"{self.name} ({self.booking_id})"
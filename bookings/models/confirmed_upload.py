@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class ConfirmedUpload(models.Model):
+    """
+    Storage keys whose direct-upload token has been confirmed. The primary
+    key makes a token single-use across every process (the cache may be
+    per-process); rows past the token's max age are pruned by `gc_blobs`.
+    """
+
+    key = models.CharField(max_length=1024, primary_key=True)
+    confirmed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.key
@@ -26,7 +26,10 @@ class Coupon(models.Model):
     per_user_limit = models.PositiveIntegerField(null=True, blank=True,
                                                  help_text="How many times single user can use")
     active = models.BooleanField(default=True)
+    # Denormalized redemption count, only ever moved by bookings.utils.coupons
+    used_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.code
@@ -44,8 +47,7 @@ class Coupon(models.Model):
     def remaining_global_uses(self):
         if self.usage_limit is None:
             return None
-        used = self.redemptions.count()
-        return max(self.usage_limit - used, 0)
+        return max(self.usage_limit - self.used_count, 0)
 
 
 class CouponRedemption(models.Model):
@@ -56,4 +58,14 @@ class CouponRedemption(models.Model):
     used_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ("coupon", "user", "booking")  # one redemption record per booking per user-coupon
\ No newline at end of file
+        unique_together = ("coupon", "user", "booking")  # one redemption record per booking per user-coupon
+
+
+class CouponUsage(models.Model):
+    """Per-user redemption counter, kept next to CouponRedemption rows."""
+    coupon = models.ForeignKey(Coupon, on_delete=models.CASCADE, related_name="usages")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="coupon_usages")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("coupon", "user")
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class JobLock(models.Model):
+    """
+    Named lock for long-running jobs, shared by every process through the DB
+    (the cache may be per-process). Taken by inserting the row, released by
+    deleting it; expires_at lets a crashed holder's lock be taken over.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    acquired_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} (until {self.expires_at})"
@@ -0,0 +1,40 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class StoredBlob(models.Model):
+    """
+    Content-addressed upload registry: one row per distinct file (SHA-256)
+    under each key prefix, so a blob never resurfaces in another folder.
+    ref_count tracks how many rows (BookingDocument, BookingPayment proof)
+    point at file_url; unreferenced blobs are removed by `gc_blobs`.
+    """
+
+    sha256 = models.CharField(max_length=64)
+    prefix = models.CharField(max_length=255, default="")
+    key = models.CharField(max_length=1024)
+    file_url = models.URLField(max_length=1024, db_index=True)
+    size = models.BigIntegerField(default=0)
+    content_type = models.CharField(max_length=255, blank=True, null=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sha256", "prefix"], name="storedblob_sha256_prefix_uniq"),
+        ]
+
+    @classmethod
+    def retain(cls, file_url):
+        if file_url:
+            cls.objects.filter(file_url=file_url).update(ref_count=F("ref_count") + 1, last_used_at=timezone.now())
+
+    @classmethod
+    def release(cls, file_url):
+        if file_url:
+            cls.objects.filter(file_url=file_url, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
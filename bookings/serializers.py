@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from decimal import Decimal
+from django.db.models import Count
+from drpathcare.fast_rows import RowMapper
 from .models import (
     Cart, CartItem, Coupon, CouponRedemption, 
     Booking, BookingItem, BookingActionTracker,BookingDocument
@@ -8,7 +10,10 @@ from payments.models import BookingPayment
 from users.serializers import (
     PatientSerializer, AddressSerializer, UserSerializer,UserMiniSerializer
 )
-from lab.serializers import LabTestSerializer, ProfileSerializer, PackageSerializer
+from lab.serializers import (
+    LabTestSerializer, ProfileSerializer, PackageSerializer,
+    ProfileMiniSerializer, PackageMiniSerializer,
+)
 
 
 
@@ -62,10 +67,12 @@ class BookingFastListSerializer(serializers.ModelSerializer):
 
 
     def get_view_stack(self,obj):
-        return [i.full_name + " - " + i.role.name  for i in obj.assigned_users.all()]
+        return [i.full_name + " - " + (i.role.name if i.role else "User") for i in obj.assigned_users.all()]
 
     def get_created_by_str(self,obj):
         action = obj.actions.order_by("created_at").first()
+        if action is None or action.user is None:
+            return ''
         return action.user.full_name + " - " + (action.user.role.name if action.user.role else "User")
 
     def get_address_str(self,obj):
@@ -98,6 +105,110 @@ class BookingFastListSerializer(serializers.ModelSerializer):
 
         return f"{full_name} ({masked})"
 
+class BookingFastListRowMapper(RowMapper):
+    """
+    `?fast=1` renderer for BookingFastListViewSet, same output as
+    BookingFastListSerializer but from .values() rows + two batched lookups.
+    """
+    serializer_class = BookingFastListSerializer
+    annotated = ("payment_count", "document_count")
+    annotations = {"total_tests": Count("items", distinct=True)}
+    computed_values = (
+        "total_tests",
+        "user__first_name", "user__last_name", "user__mobile",
+        "address__line1", "address__line2",
+        "address__location__city", "address__location__state", "address__location__pincode",
+    )
+    computed = {
+        "user_str": "get_user_str",
+        "assigned_users": "get_assigned_users",
+        "location_str": "get_location_str",
+        "address_str": "get_address_str",
+        "created_by_str": "get_created_by_str",
+        "view_stack": "get_view_stack",
+        "total_tests": "get_total_tests",
+    }
+
+    @staticmethod
+    def _full_name(first, last):
+        return f"{first or ''} {last or ''}".strip()
+
+    def prefetch(self, rows):
+        ids = [row["id"] for row in rows]
+
+        assigned = {}
+        for link in (
+            Booking.assigned_users.through.objects
+            .filter(booking_id__in=ids)
+            .order_by("id")
+            .values("booking_id", "user_id", "user__first_name", "user__last_name",
+                    "user__mobile", "user__role__name")
+        ):
+            assigned.setdefault(link["booking_id"], []).append(link)
+
+        # First action per booking (DISTINCT ON booking_id)
+        creators = {
+            action["booking_id"]: action
+            for action in (
+                BookingActionTracker.objects
+                .filter(booking_id__in=ids)
+                .order_by("booking_id", "created_at")
+                .distinct("booking_id")
+                .values("booking_id", "user_id", "user__first_name", "user__last_name", "user__role__name")
+            )
+        }
+        return {"assigned": assigned, "creators": creators}
+
+    def get_user_str(self, row, ctx):
+        mobile = row["user__mobile"] or ""
+        full_name = f"{row['user__first_name'] or ''} {row['user__last_name'] or ''}".strip()
+        return f"{full_name or mobile} ({mobile})"
+
+    def get_assigned_users(self, row, ctx):
+        return [
+            {
+                "id": u["user_id"],
+                "name": self._full_name(u["user__first_name"], u["user__last_name"])
+                if (u["user__first_name"] or u["user__last_name"]) else u["user__mobile"],
+                "mobile": u["user__mobile"],
+            }
+            for u in ctx["assigned"].get(row["id"], [])
+        ]
+
+    def get_view_stack(self, row, ctx):
+        return [
+            self._full_name(u["user__first_name"], u["user__last_name"]) + " - " + (u["user__role__name"] or "User")
+            for u in ctx["assigned"].get(row["id"], [])
+        ]
+
+    def get_created_by_str(self, row, ctx):
+        action = ctx["creators"].get(row["id"])
+        if action is None or action["user_id"] is None:
+            return ''
+        return (
+            self._full_name(action["user__first_name"], action["user__last_name"])
+            + " - " + (action["user__role__name"] or "User")
+        )
+
+    def get_address_str(self, row, ctx):
+        try:
+            return row["address__line1"] + ', ' + row["address__line2"]
+        except TypeError:
+            return ''
+
+    def get_location_str(self, row, ctx):
+        try:
+            return (
+                row["address__location__city"] + ', ' + row["address__location__state"]
+                + ' - ' + row["address__location__pincode"]
+            )
+        except TypeError:
+            return ''
+
+    def get_total_tests(self, row, ctx):
+        return row["total_tests"]
+
+
 # -------------------------
 # Coupon Serializers
 # -------------------------
@@ -107,9 +218,9 @@ class CouponSerializer(serializers.ModelSerializer):
         fields = [
             "id", "code", "description", "discount_type", "discount_value",
             "max_discount_amount", "valid_from", "valid_to",
-            "usage_limit", "per_user_limit", "active", "created_at"
+            "usage_limit", "per_user_limit", "active", "used_count", "created_at"
         ]
-        read_only_fields = ("created_at",)
+        read_only_fields = ("created_at", "used_count")
 
 
 class CouponRedemptionSerializer(serializers.ModelSerializer):
@@ -154,6 +265,30 @@ class BookingItemSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ClientBookingItemSerializer(serializers.ModelSerializer):
+    """
+    Read-only item payload for the client app. Same keys as BookingItemSerializer,
+    but profiles/packages nest slim tests. Relies on ClientBookingViewSet's
+    prefetch plan (no per-item queries).
+    """
+    patient_detail = PatientSerializer(source="patient", read_only=True)
+    lab_test_detail = LabTestSerializer(source="lab_test", read_only=True)
+    profile_detail = ProfileMiniSerializer(source="profile", read_only=True)
+    package_detail = PackageMiniSerializer(source="package", read_only=True)
+
+    class Meta:
+        model = BookingItem
+        fields = [
+            "id", "booking", "patient", "patient_detail",
+            "lab_test", "lab_test_detail",
+            "profile", "profile_detail",
+            "package", "package_detail",
+            "base_price", "offer_price",
+            "created_at", "updated_at",
+        ]
+        read_only_fields = fields
+
+
 # -------------------------
 # BookingActionTracker Serializer
 # -------------------------
@@ -179,7 +314,7 @@ class ClientDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookingDocument
         fields = [
-            "id", "name", "file_url", "doc_type", "created_at"
+            "id", "name", "file_url", "doc_type", "status", "created_at"
         ]
 
 
@@ -187,7 +322,7 @@ class ClientBookingSerializer(serializers.ModelSerializer):
     user_detail = UserSerializer(source="user", read_only=True)
     address_detail = AddressSerializer(source="address", read_only=True)
 
-    items = BookingItemSerializer(many=True, read_only=True)
+    items = ClientBookingItemSerializer(many=True, read_only=True)
 
     # 🔥 FIX: removed redundant `source='payments'`
     payments = ClientPaymentSerializer(many=True, read_only=True)
@@ -361,6 +496,9 @@ class BookingDocumentSerializer(serializers.ModelSerializer):
             "doc_type",
             "uploaded_by",
             "uploaded_by_name",
+            "status",
+            "attempts",
+            "error_message",
             "created_at",
         ]
          # ✅ file_url is now READ-ONLY
@@ -370,6 +508,9 @@ class BookingDocumentSerializer(serializers.ModelSerializer):
             "uploaded_by_name",
             "created_at",
             "booking_code",
+            "status",
+            "attempts",
+            "error_message",
             "file_url",
         ]
 
@@ -1,11 +1,15 @@
 import threading
 import logging
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.db import transaction
-from .models import Booking
+from .models import Booking, BookingDocument, StoredBlob, Coupon
+from payments.models import BookingPayment
 from notifications.utils.booking_notifications import send_booking_notifications
+from bookings.utils.coupons import bump_coupon_version, release_booking_coupons
+from bookings.utils.cart import schedule_cart_repricing
+from lab.models import LabTest, Profile, Package
 
 logger = logging.getLogger(__name__)
 
@@ -137,3 +141,78 @@ def post_save_booking_handler(sender, instance: Booking, created, **kwargs):
 
     # Run after commit, async (so no blocking)
     transaction.on_commit(lambda: threading.Thread(target=_process_after_commit, daemon=True).start())
+
+
+# ============================================================
+# 🔹 StoredBlob reference counting (rows holding a file_url)
+# ============================================================
+def _capture_old_file_url(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and "file_url" not in update_fields):
+        return
+    instance._old_file_url = sender.objects.filter(pk=instance.pk).values_list("file_url", flat=True).first()
+
+
+def _count_file_url_refs(sender, instance, created, **kwargs):
+    if created:
+        StoredBlob.retain(instance.file_url)
+        return
+    if not hasattr(instance, "_old_file_url"):
+        return
+    old_url = instance.__dict__.pop("_old_file_url")
+    if old_url != instance.file_url:
+        StoredBlob.release(old_url)
+        StoredBlob.retain(instance.file_url)
+
+
+def _release_file_url_ref(sender, instance, **kwargs):
+    StoredBlob.release(instance.file_url)
+
+
+for _model in (BookingDocument, BookingPayment):
+    _label = _model._meta.model_name
+    pre_save.connect(_capture_old_file_url, sender=_model, dispatch_uid=f"{_label}_blob_capture")
+    post_save.connect(_count_file_url_refs, sender=_model, dispatch_uid=f"{_label}_blob_refs")
+    post_delete.connect(_release_file_url_ref, sender=_model, dispatch_uid=f"{_label}_blob_release")
+
+
+# ============================================================
+# 🔹 Coupon table version (in-process coupon caches reload)
+# ============================================================
+@receiver(post_save, sender=Coupon, dispatch_uid="coupon_bump_version_on_save")
+@receiver(post_delete, sender=Coupon, dispatch_uid="coupon_bump_version_on_delete")
+def coupon_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_coupon_version)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid="booking_release_coupon_on_cancel")
+def release_coupon_on_cancel(sender, instance: Booking, created, **kwargs):
+    # Gives the use back to the coupon limits (client cancel, CRM status updates)
+    if created or instance.status != "cancelled" or getattr(instance, "_old_status", None) == "cancelled":
+        return
+    release_booking_coupons(instance.pk)
+
+
+# ============================================================
+# 🔹 Catalog price changes → re-price cart snapshots
+# ============================================================
+PRICED_FIELDS = ("price", "offer_price", "name")
+
+
+def _capture_old_price(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    instance._old_priced = sender.objects.filter(pk=instance.pk).values_list(*PRICED_FIELDS).first()
+
+
+def _reprice_carts_on_change(sender, instance, created, **kwargs):
+    old = instance.__dict__.pop("_old_priced", None)
+    if created or old is None:
+        return
+    if old != tuple(getattr(instance, f) for f in PRICED_FIELDS):
+        schedule_cart_repricing(sender.__name__, instance.pk)
+
+
+for _model in (LabTest, Profile, Package):
+    _label = _model._meta.model_name
+    pre_save.connect(_capture_old_price, sender=_model, dispatch_uid=f"{_label}_cart_price_capture")
+    post_save.connect(_reprice_carts_on_change, sender=_model, dispatch_uid=f"{_label}_cart_reprice")
@@ -1,3 +1,362 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import (
+    Booking, BookingActionTracker, BookingItem, Cart, CartItem, ConfirmedUpload, Coupon, CouponRedemption,
+    CouponUsage, JobLock,
+)
+from bookings.utils.coupons import CouponUnavailable, bump_coupon_version, rank_coupons, redeem_coupon
+from bookings.utils.cart import reprice_cart_items
+from bookings.utils.invoice_batch import INVOICE_BATCH_LOCK_KEY, acquire_batch_lock, release_batch_lock
+from content_management.models import ContentManager
+from drpathcare.storage import LocalStorageBackend, UploadRejected, confirm_upload, presign_upload
+from lab.models import LabCategory, LabTest, Package, Profile
+from users.models import Address, Location, Patient, Role, User
+
+
+class BookingFixturesMixin:
+    """A customer with an address, a patient and a small catalog."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email="customer@example.com", mobile="9000000001", first_name="Asha", last_name="Rao"
+        )
+        cls.location = Location.objects.create(pincode="560001", city="Bengaluru", state="Karnataka")
+        cls.address = Address.objects.create(
+            user=cls.customer, line1="12 MG Road", line2="Near Metro", location=cls.location
+        )
+        cls.patient = Patient.objects.create(user=cls.customer, first_name="Asha", last_name="Rao")
+
+        category = LabCategory.objects.create(name="General", entity_type="lab_test")
+        cls.tests = [
+            LabTest.objects.create(name=f"Test {n}", category=category, price=Decimal("300")) for n in range(3)
+        ]
+        cls.image = ContentManager.objects.create(title="Cover", file_url="https://cdn.example.com/cover.png")
+        cls.profile = Profile.objects.create(
+            name="Basic Profile", category=category, price=Decimal("900"),
+            description="Catalog description", image=cls.image,
+        )
+        cls.profile.tests.set(cls.tests[:2])
+        cls.package = Package.objects.create(
+            name="Full Package", category=category, price=Decimal("1500"),
+            description="Catalog description", image=cls.image,
+        )
+        cls.package.tests.set(cls.tests)
+
+    @classmethod
+    def make_booking(cls, **kwargs):
+        booking = Booking.objects.create(user=cls.customer, address=cls.address, **kwargs)
+        for product in ({"lab_test": cls.tests[0]}, {"profile": cls.profile}, {"package": cls.package}):
+            BookingItem.objects.create(
+                booking=booking, patient=cls.patient, base_price=Decimal("100"), offer_price=Decimal("90"), **product
+            )
+        return booking
+
+
+class ClientBookingQueryBudgetTests(BookingFixturesMixin, TestCase):
+    """ClientBookingViewSet list/detail run a fixed number of queries, however many bookings/items."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def _count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        self.make_booking()
+        baseline = self._count("/api/client/bookings/")
+
+        for _ in range(4):
+            self.make_booking()
+        with self.assertNumQueries(baseline):
+            response = self.client.get("/api/client/bookings/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_query_count_is_constant(self):
+        small = self.make_booking()
+        baseline = self._count(f"/api/client/bookings/{small.pk}/")
+
+        large = self.make_booking()
+        for _ in range(5):
+            BookingItem.objects.create(
+                booking=large, patient=self.patient, package=self.package, base_price=Decimal("100")
+            )
+        with self.assertNumQueries(baseline):
+            response = self.client.get(f"/api/client/bookings/{large.pk}/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_item_details_keep_catalog_fields(self):
+        booking = self.make_booking()
+        response = self.client.get(f"/api/client/bookings/{booking.pk}/")
+        items = response.json()["items"]
+        profile = next(item["profile_detail"] for item in items if item["profile"])
+        package = next(item["package_detail"] for item in items if item["package"])
+        for detail in (profile, package):
+            self.assertEqual(detail["description"], "Catalog description")
+            self.assertEqual(detail["image"], self.image.pk)
+
+
+class BookingFastRowsParityTests(BookingFixturesMixin, TestCase):
+    """?fast=1 on the CRM booking list renders exactly what BookingFastListSerializer does."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.role = Role.objects.create(name="Admin", view_all=True)
+        cls.agent = User.objects.create_user(
+            email="agent@example.com", mobile="9000000002", role=cls.role, first_name="Ravi"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def _booking(self, **kwargs):
+        booking = self.make_booking(**kwargs)
+        booking.assigned_users.add(self.agent)
+        BookingActionTracker.objects.create(booking=booking, user=self.agent, action="create")
+        return booking
+
+    def test_fast_list_matches_serializer(self):
+        self._booking(final_amount=Decimal("1234.50"), scheduled_date="2026-10-21")
+        bare = self._booking()
+        Booking.objects.filter(pk=bare.pk).update(address=None)
+        customer_created = self.make_booking()
+        customer_created.assigned_users.add(self.agent)
+        BookingActionTracker.objects.create(booking=customer_created, user=self.customer, action="create")
+
+        regular = self.client.get("/api/bookings-list/")
+        fast = self.client.get("/api/bookings-list/?fast=1")
+        self.assertEqual(regular.status_code, 200)
+        self.assertEqual(fast.json(), regular.json())
+
+    def test_missing_roles_and_creators_render(self):
+        roleless = User.objects.create_user(email="helper@example.com", mobile="9000000003", first_name="Kiran")
+        no_creator = self.make_booking()
+        no_creator.assigned_users.add(roleless)
+        anonymous = self.make_booking()
+        BookingActionTracker.objects.create(booking=anonymous, user=None, action="create")
+
+        regular = self.client.get("/api/bookings-list/")
+        fast = self.client.get("/api/bookings-list/?fast=1")
+        self.assertEqual(regular.status_code, 200)
+        self.assertEqual(fast.json(), regular.json())
+
+        rows = {row["id"]: row for row in fast.json()["results"]}
+        self.assertEqual(rows[str(no_creator.pk)]["view_stack"], ["Kiran - User"])
+        self.assertEqual(rows[str(no_creator.pk)]["created_by_str"], "")
+        self.assertEqual(rows[str(anonymous.pk)]["created_by_str"], "")
+
+class InvoiceBatchLockTests(TestCase):
+    """The batch lock lives in the DB, so the API and the command process share it."""
+
+    def test_one_holder_at_a_time(self):
+        self.assertTrue(acquire_batch_lock())
+        self.assertFalse(acquire_batch_lock())
+        release_batch_lock()
+        self.assertTrue(acquire_batch_lock())
+
+    def test_expired_lock_is_taken_over(self):
+        JobLock.objects.create(name=INVOICE_BATCH_LOCK_KEY, expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_batch_lock())
+        self.assertGreater(JobLock.objects.get(name=INVOICE_BATCH_LOCK_KEY).expires_at, timezone.now())
+
+
+class DirectUploadConfirmTests(TestCase):
+    """An upload token confirms once, recorded in the DB rather than the (maybe per-process) cache."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.backend = LocalStorageBackend(root=root)
+        self.backend.presign = lambda key, *args, **kwargs: {"url": "file://" + root, "fields": {}}
+
+    def upload(self):
+        target = presign_upload("documents/", "report.pdf", "application/pdf", 1024, backend=self.backend)
+        self.backend.save(BytesIO(b"%PDF-1.4"), target["key"], "application/pdf")
+        return target
+
+    def test_token_confirms_once(self):
+        target = self.upload()
+        self.assertEqual(confirm_upload(target["upload_token"], "documents/", backend=self.backend), target["file_url"])
+        self.assertTrue(ConfirmedUpload.objects.filter(key=target["key"]).exists())
+
+        with self.assertRaisesMessage(UploadRejected, "already used"):
+            confirm_upload(target["upload_token"], "documents/", backend=self.backend)
+
+    def test_missing_object_is_not_recorded(self):
+        target = presign_upload("documents/", "report.pdf", "application/pdf", 1024, backend=self.backend)
+        with self.assertRaisesMessage(UploadRejected, "not been uploaded"):
+            confirm_upload(target["upload_token"], "documents/", backend=self.backend)
+        self.assertFalse(ConfirmedUpload.objects.exists())
+
+
+class CouponRedemptionConcurrencyTests(TransactionTestCase):
+    """Concurrent redeem_coupon() calls never overrun usage_limit / per_user_limit."""
+
+    THREADS = 12
+
+    def _redeem_concurrently(self, coupon, users):
+        barrier = threading.Barrier(len(users))
+        outcomes = []
+
+        def worker(user):
+            try:
+                barrier.wait()
+                redeem_coupon(coupon.pk, user.pk)
+                outcomes.append(True)
+            except CouponUnavailable:
+                outcomes.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes.count(True)
+
+    def test_usage_limit_is_never_exceeded(self):
+        coupon = Coupon.objects.create(code="LIMIT3", discount_type="flat", discount_value=Decimal("50"), usage_limit=3)
+        users = [
+            User.objects.create_user(email=f"buyer{n}@example.com", mobile=f"90000010{n:02d}")
+            for n in range(self.THREADS)
+        ]
+
+        self.assertEqual(self._redeem_concurrently(coupon, users), 3)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 3)
+        self.assertEqual(CouponRedemption.objects.filter(coupon=coupon).count(), 3)
+
+    def test_per_user_limit_is_never_exceeded(self):
+        coupon = Coupon.objects.create(code="ONCE", discount_type="flat", discount_value=Decimal("50"), per_user_limit=1)
+        user = User.objects.create_user(email="repeat@example.com", mobile="9000001100")
+
+        self.assertEqual(self._redeem_concurrently(coupon, [user] * self.THREADS), 1)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+        self.assertEqual(CouponUsage.objects.get(coupon=coupon, user=user).count, 1)
+
+
+class CouponRankingTests(TestCase):
+    """rank_coupons() over 1,000 active coupons: one usage query, limits and caps applied per coupon."""
+
+    COUPONS = 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="shopper@example.com", mobile="9000001200")
+        coupons = []
+        for n in range(cls.COUPONS):
+            kind = n % 4
+            coupons.append(Coupon(
+                code=f"C{n:04d}",
+                discount_type="percent" if n % 2 else "flat",
+                discount_value=Decimal(n % 40 + 1),
+                max_discount_amount=Decimal("150") if n % 2 else None,
+                usage_limit=10 if kind == 1 else None,
+                used_count=10 if kind == 1 and n % 8 == 1 else 0,  # half of the limited ones are exhausted
+                per_user_limit=1 if kind == 2 else None,
+            ))
+        Coupon.objects.bulk_create(coupons)
+        # This user already used every per-user coupon with n % 16 == 2
+        CouponUsage.objects.bulk_create(
+            CouponUsage(coupon=coupon, user=cls.user, count=1) for n, coupon in enumerate(coupons) if n % 16 == 2
+        )
+        # Expired and inactive coupons never show up
+        Coupon.objects.create(code="EXPIRED", discount_type="flat", discount_value=Decimal("999"),
+                              valid_to=timezone.now() - timedelta(days=1))
+        Coupon.objects.create(code="OFF", discount_type="flat", discount_value=Decimal("999"), active=False)
+
+    def setUp(self):
+        bump_coupon_version()
+        rank_coupons(Decimal("1000"), Decimal("800"), self.user.pk)  # load the in-process table
+
+    def test_one_query_for_all_coupons(self):
+        with self.assertNumQueries(1):
+            options = rank_coupons(Decimal("1000"), Decimal("800"), self.user.pk)
+
+        exhausted = len(range(1, self.COUPONS, 8))
+        used_by_user = len(range(2, self.COUPONS, 16))
+        self.assertEqual(len(options), self.COUPONS - exhausted - used_by_user)
+        codes = {option["code"] for option in options}
+        self.assertNotIn("C0001", codes)  # global limit reached
+        self.assertIn("C0005", codes)  # limited, not exhausted
+        self.assertNotIn("C0002", codes)  # per-user limit reached
+        self.assertIn("C0006", codes)
+        self.assertFalse({"EXPIRED", "OFF"} & codes)
+
+    def test_best_first_with_caps(self):
+        options = rank_coupons(Decimal("1000"), Decimal("800"), self.user.pk)
+
+        # 39% of 1000 hits the 150 cap; flat coupons top out at 40
+        self.assertEqual(options[0]["discount"], "150.00")
+        self.assertEqual(options[0]["final_amount"], "650.00")
+        savings = [Decimal(option["discount"]) for option in options]
+        self.assertEqual(savings, sorted(savings, reverse=True))
+
+
+class CartRepricingTests(TestCase):
+    """reprice_cart_items() is one statement whatever the number of carts and items."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = LabCategory.objects.create(name="General", entity_type="lab_test")
+        cls.tests = [
+            LabTest.objects.create(name=f"Test {n}", category=category, price=Decimal("300"), offer_price=Decimal("250"))
+            for n in range(5)
+        ]
+
+    def make_carts(self, count, first=0):
+        for n in range(first, first + count):
+            cart = Cart.objects.create(
+                user=User.objects.create_user(email=f"cart{n}@example.com", mobile=f"90000020{n:02d}")
+            )
+            CartItem.objects.bulk_create(
+                CartItem(cart=cart, product_type="LabTest", product_id=test.pk, product_name="old",
+                         base_price=Decimal("1"))
+                for test in self.tests
+            )
+
+    def test_query_count_does_not_grow(self):
+        self.make_carts(2)
+        with self.assertNumQueries(1):
+            self.assertEqual(reprice_cart_items(), (10, 2))
+
+        self.make_carts(20, first=2)
+        with self.assertNumQueries(1):
+            self.assertEqual(reprice_cart_items(), (100, 20))  # the first two carts are already current
+
+        self.assertFalse(CartItem.objects.exclude(base_price=Decimal("300"), offer_price=Decimal("250")).exists())
+        self.assertEqual(reprice_cart_items(), (0, 0))
+
+    def test_price_edit_reprices_that_product_only(self):
+        self.make_carts(3)
+        reprice_cart_items()
+
+        test = LabTest.objects.get(pk=self.tests[0].pk)
+        test.price = Decimal("350")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            test.save()
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(
+            set(CartItem.objects.filter(product_id=test.pk).values_list("base_price", flat=True)), {Decimal("350")}
+        )
+        self.assertEqual(CartItem.objects.filter(base_price=Decimal("300")).count(), 12)
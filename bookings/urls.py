@@ -16,6 +16,7 @@ from bookings.apis import (
     DashboardAPIView,
     BookingBulkUpdateViewSet,
     CallConnectAPIView,
+    InvoiceBatchAPIView,
 )
 
 # -----------------------------------------------------
@@ -53,6 +54,7 @@ router.register(r'coupon-redemptions', CouponRedemptionViewSet, basename='coupon
 urlpatterns = [
     path('', include(router.urls)),
     path("calls/connect/", CallConnectAPIView.as_view()),
+    path("invoices/batch/", InvoiceBatchAPIView.as_view(), name="invoice-batch"),
     path(
         'crm/dashboard/',
         DashboardAPIView.as_view(),
@@ -1,12 +1,45 @@
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.apps import apps
+from bookings.utils.coupons import get_active_coupon, compute_discount
 
 Coupon = apps.get_model("bookings", "Coupon")
 LabTest = apps.get_model("lab", "LabTest")
 Profile = apps.get_model("lab", "Profile")
 Package = apps.get_model("lab", "Package")
 
+# Cart items use model names, booking payloads use product types
+PRODUCT_MODELS = {
+    "lab_test": LabTest, "LabTest": LabTest,
+    "lab_profile": Profile, "Profile": Profile, "profile": Profile,
+    "lab_package": Package, "Package": Package, "package": Package,
+}
+
+
+def get_price_totals(items):
+    """
+    (base_total, offer_total) for [{"product_type", "product_id"}, ...]
+    with one query per product type.
+    """
+    ids_by_model = {}
+    for item in items:
+        model = PRODUCT_MODELS.get(item.get("product_type"))
+        if model is None:
+            raise ValidationError(f"Invalid product type: {item.get('product_type')}")
+        ids_by_model.setdefault(model, []).append(item.get("product_id"))
+
+    base_total = Decimal("0.00")
+    offer_total = Decimal("0.00")
+    for model, ids in ids_by_model.items():
+        prices = {pk: (price, offer) for pk, price, offer in model.objects.filter(id__in=ids).values_list("id", "price", "offer_price")}
+        for product_id in ids:
+            if int(product_id) not in prices:
+                raise ValidationError(f"Product {model.__name__} with ID {product_id} not found")
+            price, offer = prices[int(product_id)]
+            base_total += Decimal(price or 0)
+            offer_total += Decimal(offer or price or 0)
+    return base_total, offer_total
+
 
 def get_booking_calculations(client_data, items, coupon_id=None):
     """
@@ -77,18 +110,14 @@ def get_booking_calculations(client_data, items, coupon_id=None):
     # ✅ Step 2: Apply coupon (if valid)
     coupon_discount = Decimal("0.00")
     if coupon_id:
-        coupon = Coupon.objects.filter(id=coupon_id).first()
+        coupon = get_active_coupon(coupon_id=coupon_id)
         if not coupon:
-            return False, "Coupon not found."
-        if not coupon.is_valid_now():
+            if not Coupon.objects.filter(id=coupon_id).exists():
+                return False, "Coupon not found."
             return False, "Coupon is expired or inactive."
 
-        if coupon.discount_type == "percent":
-            coupon_discount = base_total * (coupon.discount_value / Decimal("100"))
-            if coupon.max_discount_amount:
-                coupon_discount = min(coupon_discount, coupon.max_discount_amount)
-        else:
-            coupon_discount = coupon.discount_value
+        # Usage limits are enforced atomically when the booking redeems it
+        coupon_discount = compute_discount(coupon, base_total)
 
     # ✅ Step 3: Admin discount
     admin_discount = Decimal(str(client_data.get("admin_discount") or 0))
@@ -0,0 +1,215 @@
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bookings.models import Cart, CartItem
+from lab.models import LabTest, Profile, Package
+
+
+# CartItem.product_type values (as written by CartViewSet.create)
+CART_PRODUCT_MODELS = {
+    "LabTest": LabTest,
+    "Profile": Profile,
+    "Package": Package,
+}
+
+# CartItem.product_type → BookingItem / get_booking_calculations product_type
+CART_TO_BOOKING_TYPE = {
+    "LabTest": "lab_test",
+    "Profile": "lab_profile",
+    "Package": "lab_package",
+}
+
+
+class CartError(Exception):
+    pass
+
+
+def resolve_products(keys):
+    """
+    {(product_type, product_id): product_row} for the given keys, one query
+    per product type. product_row = {"id", "name", "price", "offer_price"}.
+    Raises CartError for unknown types or missing products.
+    """
+    ids_by_type = {}
+    for product_type, product_id in keys:
+        if product_type not in CART_PRODUCT_MODELS:
+            raise CartError(f"Invalid product_type: {product_type}")
+        ids_by_type.setdefault(product_type, set()).add(product_id)
+
+    resolved = {}
+    for product_type, ids in ids_by_type.items():
+        model = CART_PRODUCT_MODELS[product_type]
+        for row in model.objects.filter(id__in=ids).values("id", "name", "price", "offer_price"):
+            resolved[(product_type, row["id"])] = row
+
+    missing = [key for key in keys if key not in resolved]
+    if missing:
+        product_type, product_id = missing[0]
+        raise CartError(f"{product_type} with id {product_id} not found.")
+    return resolved
+
+
+def parse_cart_items(items):
+    """[{"product_type", "product_id"}, ...] → ordered, de-duplicated keys."""
+    if not isinstance(items, list):
+        raise CartError("'items' must be a list.")
+
+    keys = []
+    seen = set()
+    for item in items:
+        try:
+            key = (item["product_type"], int(item["product_id"]))
+        except (KeyError, TypeError, ValueError):
+            raise CartError("Each item needs 'product_type' and an integer 'product_id'.")
+        if key not in seen:
+            seen.add(key)
+            keys.append(key)
+    return keys
+
+
+@transaction.atomic
+def sync_cart(user, items, replace=True):
+    """
+    Makes the user's cart hold `items` (replace=True) or adds them to it.
+    Products are resolved in batches, the diff is applied with one DELETE
+    and one bulk INSERT. Returns (cart, added, removed).
+    """
+    keys = parse_cart_items(items)
+    products = resolve_products(keys)
+
+    cart, _ = Cart.objects.get_or_create(user=user)
+    existing = {
+        (product_type, product_id): pk
+        for pk, product_type, product_id in cart.items.values_list("id", "product_type", "product_id")
+    }
+
+    removed = 0
+    if replace:
+        stale = [pk for key, pk in existing.items() if key not in products]
+        if stale:
+            removed, _ = CartItem.objects.filter(id__in=stale).delete()
+
+    new_items = [
+        CartItem(
+            cart=cart,
+            product_type=product_type,
+            product_id=product_id,
+            product_name=products[(product_type, product_id)]["name"],
+            base_price=products[(product_type, product_id)]["price"] or Decimal("0.00"),
+            offer_price=products[(product_type, product_id)]["offer_price"],
+        )
+        for product_type, product_id in keys
+        if (product_type, product_id) not in existing
+    ]
+    # unique (cart, product_type, product_id) → a concurrent add is simply skipped
+    CartItem.objects.bulk_create(new_items, ignore_conflicts=True)
+
+    Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now())
+    return cart, len(new_items), removed
+
+
+# ============================================================
+# 🔹 Re-pricing (catalog price changes → CartItem snapshots)
+# ============================================================
+def _reprice_cte(alias, product_type, model, ids):
+    item = CartItem._meta
+    col = lambda name: item.get_field(name).column  # noqa: E731
+    where_ids = "AND p.id = ANY(%s)" if ids is not None else ""
+    sql = f"""
+    {alias} AS (
+        UPDATE {item.db_table} AS ci
+        SET {col("base_price")} = COALESCE(p.price, 0),
+            {col("offer_price")} = p.offer_price,
+            {col("product_name")} = p.name
+        FROM {model._meta.db_table} AS p
+        WHERE ci.{col("product_type")} = %s
+          AND ci.{col("product_id")} = p.id
+          {where_ids}
+          AND (
+              ci.{col("base_price")} IS DISTINCT FROM COALESCE(p.price, 0)
+              OR ci.{col("offer_price")} IS DISTINCT FROM p.offer_price
+              OR ci.{col("product_name")} IS DISTINCT FROM p.name
+          )
+        RETURNING ci.{col("cart")}
+    )"""
+    params = [product_type] + ([list(ids)] if ids is not None else [])
+    return sql, params
+
+
+def reprice_cart_items(lab_test_ids=None, profile_ids=None, package_ids=None):
+    """
+    Refreshes CartItem price/name snapshots from the catalog with one
+    UPDATE ... FROM join per product type, all in a single statement.
+    No ids at all → every cart item is checked.
+    Returns (items_changed, carts_changed).
+    """
+    full = lab_test_ids is None and profile_ids is None and package_ids is None
+    targets = [
+        ("t", "LabTest", LabTest, None if full else lab_test_ids),
+        ("p", "Profile", Profile, None if full else profile_ids),
+        ("k", "Package", Package, None if full else package_ids),
+    ]
+    # Partial run: only types that actually have changed products
+    targets = [t for t in targets if full or t[3]]
+    if not targets:
+        return 0, 0
+
+    ctes, params = [], []
+    for alias, product_type, model, ids in targets:
+        sql, cte_params = _reprice_cte(alias, product_type, model, ids)
+        ctes.append(sql)
+        params.extend(cte_params)
+
+    cart_col = CartItem._meta.get_field("cart").column
+    changed_carts = " UNION ".join(f"SELECT {cart_col} FROM {alias}" for alias, *_ in targets)
+    changed_items = " + ".join(f"(SELECT count(*) FROM {alias})" for alias, *_ in targets)
+    cart = Cart._meta
+
+    sql = f"""
+    WITH {",".join(ctes)},
+    touched AS (
+        UPDATE {cart.db_table} SET {cart.get_field("updated_at").column} = now()
+        WHERE {cart.pk.column} IN ({changed_carts})
+        RETURNING {cart.pk.column}
+    )
+    SELECT {changed_items}, (SELECT count(*) FROM touched)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        items_changed, carts_changed = cursor.fetchone()
+    return items_changed, carts_changed
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def defer_cart_repricing():
+    """Collects price changes made inside the block and re-prices once at the end (bulk imports)."""
+    if getattr(_deferred, "ids", None) is not None:
+        yield
+        return
+    _deferred.ids = {"LabTest": set(), "Profile": set(), "Package": set()}
+    try:
+        yield
+    finally:
+        ids, _deferred.ids = _deferred.ids, None
+        if any(ids.values()):
+            reprice_cart_items(ids["LabTest"], ids["Profile"], ids["Package"])
+
+
+def schedule_cart_repricing(product_type, product_id):
+    pending = getattr(_deferred, "ids", None)
+    if pending is not None:
+        pending[product_type].add(product_id)
+        return
+    kwargs = {
+        "LabTest": "lab_test_ids",
+        "Profile": "profile_ids",
+        "Package": "package_ids",
+    }
+    transaction.on_commit(lambda: reprice_cart_items(**{kwargs[product_type]: [product_id]}))
@@ -0,0 +1,132 @@
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from bookings.models import Booking, BookingItem, BookingActionTracker, Cart, CartItem
+from bookings.utils.cart import CART_TO_BOOKING_TYPE, CartError, resolve_products
+from bookings.utils.coupons import CouponUnavailable, compute_discount, get_active_coupon, redeem_coupon
+from users.models import Address, Patient
+
+# Assigned to bookings created by customers themselves (same as BookingViewSet.perform_create)
+SYSTEM_USER_ID = 40
+
+
+# BookingItem product_type → FK column
+_PRODUCT_FIELDS = {
+    "lab_test": "lab_test_id",
+    "lab_profile": "profile_id",
+    "lab_package": "package_id",
+}
+
+
+@transaction.atomic
+def checkout_cart(user, data, actor):
+    """
+    Turns `user`'s cart into a Booking with a fixed number of queries:
+    cart items, catalog prices (one per product type), patients, address,
+    booking insert, bulk items insert, coupon redemption, tracker, cart clear.
+
+    data:
+        address, scheduled_date, scheduled_time_slot, remarks
+        patient            → default patient for every item
+        patients           → {cart_item_id: patient_id} overrides
+        coupon / coupon_code
+    Raises CartError / CouponUnavailable / ValidationError.
+    """
+    cart = Cart.objects.filter(user=user).first()
+    if cart is None:
+        raise CartError("Cart is empty.")
+    cart_items = list(cart.items.values("id", "product_type", "product_id"))
+    if not cart_items:
+        raise CartError("Cart is empty.")
+
+    # ✅ Authoritative prices, batched per product type
+    products = resolve_products([(i["product_type"], i["product_id"]) for i in cart_items])
+
+    # ✅ Patients (default + per item) must belong to the customer
+    overrides = data.get("patients") or {}
+    if not isinstance(overrides, dict):
+        raise ValidationError({"patients": "Expected an object of {cart_item_id: patient_id}."})
+    overrides = {str(k): v for k, v in overrides.items()}
+    default_patient = data.get("patient")
+    patient_for = {}
+    for item in cart_items:
+        patient_id = overrides.get(str(item["id"]), default_patient)
+        try:
+            patient_for[item["id"]] = int(patient_id)
+        except (TypeError, ValueError):
+            raise CartError("A patient is required for every item.")
+    valid_patients = set(
+        Patient.objects.filter(user=user, id__in=set(patient_for.values())).values_list("id", flat=True)
+    )
+    if set(patient_for.values()) - valid_patients:
+        raise CartError("Invalid patient.")
+
+    address_id = data.get("address")
+    if address_id and not Address.objects.filter(id=address_id, user=user).exists():
+        raise CartError("Invalid address.")
+
+    # ✅ Totals (same rules as get_booking_calculations)
+    base_total = Decimal("0.00")
+    offer_total = Decimal("0.00")
+    for item in cart_items:
+        product = products[(item["product_type"], item["product_id"])]
+        base_price = Decimal(product["price"] or 0)
+        base_total += base_price
+        offer_total += Decimal(product["offer_price"] or base_price)
+
+    coupon = None
+    coupon_discount = Decimal("0.00")
+    if data.get("coupon") or data.get("coupon_code"):
+        coupon = get_active_coupon(code=data.get("coupon_code"), coupon_id=data.get("coupon"))
+        if coupon is None:
+            raise CouponUnavailable("Coupon is expired or inactive.")
+        coupon_discount = compute_discount(coupon, base_total)
+
+    total_discount = (base_total - offer_total) + coupon_discount
+    final_amount = max(base_total - total_discount, Decimal("0.00"))
+
+    # ✅ Booking + items
+    booking = Booking.objects.create(
+        user=user,
+        address_id=address_id or None,
+        coupon=coupon,
+        scheduled_date=data.get("scheduled_date") or None,
+        scheduled_time_slot=data.get("scheduled_time_slot") or None,
+        remarks=data.get("remarks") or None,
+        base_total=base_total,
+        offer_total=offer_total,
+        coupon_discount=coupon_discount,
+        discount_amount=total_discount,
+        final_amount=final_amount,
+        initial_amount=final_amount,
+        total_savings=base_total - final_amount,
+    )
+    booking.assigned_users.add(SYSTEM_USER_ID if actor.role is None else actor.pk)
+
+    booking_items = []
+    for item in cart_items:
+        product = products[(item["product_type"], item["product_id"])]
+        base_price = Decimal(product["price"] or 0)
+        booking_items.append(BookingItem(
+            booking=booking,
+            patient_id=patient_for[item["id"]],
+            base_price=base_price,
+            offer_price=Decimal(product["offer_price"] or base_price),
+            **{_PRODUCT_FIELDS[CART_TO_BOOKING_TYPE[item["product_type"]]]: item["product_id"]},
+        ))
+    BookingItem.objects.bulk_create(booking_items)
+
+    if coupon is not None:
+        redeem_coupon(coupon.pk, user.pk, booking.pk)
+
+    BookingActionTracker.objects.create(
+        booking=booking,
+        user=actor,
+        action="create",
+        notes="Booking created from cart checkout",
+    )
+
+    CartItem.objects.filter(cart=cart).delete()
+    return booking
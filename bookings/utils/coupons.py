@@ -0,0 +1,209 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, OuterRef, Subquery
+from django.utils import timezone
+
+from bookings.models import Coupon, CouponRedemption, CouponUsage
+from drpathcare.versioned_registry import VersionedRegistry
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+COUPON_VERSION_KEY = "coupons:version"
+COUPON_CACHE_TTL = getattr(settings, "COUPON_CACHE_TTL", 60)  # seconds, staleness bound (VersionedRegistry)
+
+
+class CouponUnavailable(Exception):
+    pass
+
+
+# ============================================================
+# 🔹 Version-keyed in-process table of active coupons
+# ============================================================
+def _load_active_coupons():
+    now = timezone.now()
+    coupons = list(
+        Coupon.objects.filter(active=True).filter(Q(valid_to__isnull=True) | Q(valid_to__gte=now))
+    )
+    return {c.code.lower(): c for c in coupons}, {str(c.pk): c for c in coupons}
+
+
+_table = VersionedRegistry(COUPON_VERSION_KEY, COUPON_CACHE_TTL, _load_active_coupons)
+
+
+def bump_coupon_version():
+    """Called whenever a coupon row changes; every process reloads on next access."""
+    _table.bump()
+
+
+def active_coupons():
+    """Currently active coupons (instances are shared, treat them as read-only)."""
+    _, by_id = _table.get()
+    return list(by_id.values())
+
+
+def get_active_coupon(code=None, coupon_id=None):
+    by_code, by_id = _table.get()
+    coupon = by_code.get(code.lower()) if code else by_id.get(str(coupon_id))
+    if coupon is None or not coupon.is_valid_now():
+        return None
+    return coupon
+
+
+# ============================================================
+# 🔹 Discount + limits
+# ============================================================
+def compute_discount(coupon, base_total):
+    if coupon.discount_type == "percent":
+        discount = base_total * (coupon.discount_value / Decimal("100"))
+        if coupon.max_discount_amount:
+            discount = min(discount, coupon.max_discount_amount)
+        return discount
+    return coupon.discount_value
+
+
+def limit_error(coupon, user):
+    """
+    Fresh global + per-user usage in one query (skipped for unlimited coupons).
+    Returns an error message or None.
+    """
+    if coupon.usage_limit is None and coupon.per_user_limit is None:
+        return None
+
+    used_count, user_count = Coupon.objects.filter(pk=coupon.pk).values_list(
+        "used_count",
+        Subquery(CouponUsage.objects.filter(coupon=OuterRef("pk"), user=user).values("count")[:1]),
+    ).first() or (0, None)
+
+    if coupon.usage_limit is not None and used_count >= coupon.usage_limit:
+        return "Coupon usage limit reached"
+    if coupon.per_user_limit is not None and (user_count or 0) >= coupon.per_user_limit:
+        return "You have already used this coupon"
+    return None
+
+
+# ============================================================
+# 🔹 Redemption (atomic counters)
+# ============================================================
+def redeem_coupon(coupon_id, user_id, booking_id=None):
+    """
+    Consumes one use of the coupon for `user_id`. Both counters move with
+    conditional UPDATEs, so concurrent checkouts can never overrun
+    usage_limit / per_user_limit: the row lock serialises them and the
+    WHERE clause is re-checked against the committed count.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = (
+            Coupon.objects
+            .filter(pk=coupon_id, active=True)
+            .filter(Q(valid_from__isnull=True) | Q(valid_from__lte=now))
+            .filter(Q(valid_to__isnull=True) | Q(valid_to__gte=now))
+            .filter(Q(usage_limit__isnull=True) | Q(used_count__lt=F("usage_limit")))
+            .update(used_count=F("used_count") + 1)
+        )
+        if not updated:
+            coupon = Coupon.objects.filter(pk=coupon_id).first()
+            if coupon is None or not coupon.is_valid_now():
+                raise CouponUnavailable("Coupon is expired or inactive.")
+            raise CouponUnavailable("Coupon usage limit reached")
+
+        per_user_limit = Coupon.objects.filter(pk=coupon_id).values_list("per_user_limit", flat=True).first()
+
+        CouponUsage.objects.bulk_create([CouponUsage(coupon_id=coupon_id, user_id=user_id)], ignore_conflicts=True)
+        usage = CouponUsage.objects.filter(coupon_id=coupon_id, user_id=user_id)
+        if per_user_limit is not None:
+            usage = usage.filter(count__lt=per_user_limit)
+        if not usage.update(count=F("count") + 1):
+            # rolls back the global increment too
+            raise CouponUnavailable("You have already used this coupon")
+
+        return CouponRedemption.objects.create(coupon_id=coupon_id, user_id=user_id, booking_id=booking_id)
+
+
+def release_booking_coupons(booking_id):
+    """Undo redemptions recorded for a booking (coupon removed or replaced)."""
+    with transaction.atomic():
+        redemptions = list(CouponRedemption.objects.filter(booking_id=booking_id).values_list("id", "coupon_id", "user_id"))
+        for redemption_id, coupon_id, user_id in redemptions:
+            Coupon.objects.filter(pk=coupon_id, used_count__gt=0).update(used_count=F("used_count") - 1)
+            CouponUsage.objects.filter(coupon_id=coupon_id, user_id=user_id, count__gt=0).update(count=F("count") - 1)
+        CouponRedemption.objects.filter(id__in=[r[0] for r in redemptions]).delete()
+
+
+def sync_booking_coupon(booking, coupon_id):
+    """
+    Makes the booking's redemption match `coupon_id` (None → no coupon).
+    Raises CouponUnavailable if the new coupon can't be redeemed.
+    """
+    current = set(
+        str(cid) for cid in CouponRedemption.objects.filter(booking_id=booking.pk).values_list("coupon_id", flat=True)
+    )
+    wanted = str(coupon_id) if coupon_id else None
+    if current == ({wanted} if wanted else set()):
+        return
+
+    with transaction.atomic():
+        release_booking_coupons(booking.pk)
+        if wanted:
+            redeem_coupon(wanted, booking.user_id, booking.pk)
+
+
+# ============================================================
+# 🔹 Best-coupon evaluation
+# ============================================================
+def usage_snapshot(coupons, user):
+    """
+    {coupon_id: (used_count, user_count)} for the limited coupons only,
+    in a single grouped query.
+    """
+    limited = [c.pk for c in coupons if c.usage_limit is not None or c.per_user_limit is not None]
+    if not limited:
+        return {}
+    rows = Coupon.objects.filter(pk__in=limited).values_list(
+        "pk",
+        "used_count",
+        Subquery(CouponUsage.objects.filter(coupon=OuterRef("pk"), user=user).values("count")[:1]),
+    )
+    return {pk: (used, user_count or 0) for pk, used, user_count in rows}
+
+
+def rank_coupons(base_total, offer_total, user):
+    """
+    Every currently valid coupon the user can still redeem, best first.
+    Discounts follow get_booking_calculations(): percent on base_total,
+    capped by max_discount_amount, final amount never below zero. Ranked by
+    the effective saving, so a discount larger than offer_total counts only
+    up to what is actually payable.
+    """
+    coupons = [c for c in active_coupons() if c.is_valid_now()]
+    usage = usage_snapshot(coupons, user)
+
+    options = []
+    for coupon in coupons:
+        used, user_count = usage.get(coupon.pk, (0, 0))
+        if coupon.usage_limit is not None and used >= coupon.usage_limit:
+            continue
+        if coupon.per_user_limit is not None and user_count >= coupon.per_user_limit:
+            continue
+
+        discount = compute_discount(coupon, base_total)
+        final_amount = max(offer_total - discount, Decimal("0.00"))
+        options.append({
+            "coupon_id": str(coupon.pk),
+            "code": coupon.code,
+            "description": coupon.description,
+            "discount_type": coupon.discount_type,
+            "discount": discount.quantize(Decimal("0.01")),
+            "final_amount": final_amount.quantize(Decimal("0.01")),
+        })
+
+    # Effective saving: what the coupon takes off the payable offer_total
+    options.sort(key=lambda o: (-min(o["discount"], offer_total), o["code"]))
+    for option in options:
+        option["discount"] = str(option["discount"])
+        option["final_amount"] = str(option["final_amount"])
+    return options
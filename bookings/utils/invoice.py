@@ -1,6 +1,7 @@
 from io import BytesIO
 from decimal import Decimal
 from collections import defaultdict
+from functools import lru_cache
 from django.utils import timezone
 from django.conf import settings
 import os
@@ -29,16 +30,55 @@ LOGO_PATH = os.path.join(settings.BASE_DIR, "staticfiles/logo1.png")
 SIGN_PATH = os.path.join(settings.BASE_DIR, "staticfiles/sign.jpeg")
 GST_NUMBER = "09AAMCR4918B1ZA"
 CURRENCY = "Rs."
+INVOICE_PREFETCH = ("items__lab_test", "items__profile", "items__package")
 
 
-def generate_invoice_pdf(booking_id):
-    booking = (
+# -------------------------
+# PER-PROCESS CACHES
+# -------------------------
+@lru_cache(maxsize=None)
+def _invoice_styles():
+    """Stylesheet is only read while building, so one per process is enough."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name="Right",
+        alignment=TA_RIGHT,
+    ))
+    styles.add(ParagraphStyle(
+        name="CenterBlock",
+        alignment=1,  # TA_CENTER
+        fontSize=11,
+        leading=16,
+        spaceAfter=12,
+    ))
+    return styles
+
+
+@lru_cache(maxsize=None)
+def _image_bytes(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def _image(path, **kwargs):
+    # Fresh file object per document, the bytes themselves are read from disk once
+    return Image(BytesIO(_image_bytes(path)), **kwargs)
+
+
+def load_invoice_booking(booking_id):
+    return (
         Booking.objects
-        .select_related("user", "address")
-        .prefetch_related("items")
+        .select_related("user", "address__location")
+        .prefetch_related(*INVOICE_PREFETCH)
         .get(id=booking_id)
     )
 
+
+def render_invoice_pdf(booking):
+    """
+    Builds the invoice PDF for an already-loaded booking.
+    Returns (invoice_no, buffer) — buffer is ready for upload_to_s3().
+    """
     timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
     invoice_no = f"INV-{booking.ref_id}-{timestamp}"
 
@@ -54,12 +94,7 @@ def generate_invoice_pdf(booking_id):
         bottomMargin=24,
     )
 
-    styles = getSampleStyleSheet()
-
-    styles.add(ParagraphStyle(
-        name="Right",
-        alignment=TA_RIGHT,
-    ))
+    styles = _invoice_styles()
 
     elements = []
 
@@ -69,7 +104,7 @@ def generate_invoice_pdf(booking_id):
     header_table = Table(
         [
             [
-                Image(LOGO_PATH, width=160, height=80),
+                _image(LOGO_PATH, width=160, height=80),
                 Paragraph(
                     f"""
                     <font size="14"><b>ROUTINE PATHLAB PVT. LTD.</b></font><br/>
@@ -96,14 +131,6 @@ def generate_invoice_pdf(booking_id):
     elements.append(header_table)
     elements.append(Spacer(1, 12))
 
-    styles.add(ParagraphStyle(
-        name="CenterBlock",
-        alignment=1,  # TA_CENTER
-        fontSize=11,
-        leading=16,
-        spaceAfter=12,
-    ))
-
     invoice_center_block = f"""
     <b>SUPPLY INVOICE</b><br/>
     Invoice No: {invoice_no}<br/>
@@ -243,7 +270,7 @@ def generate_invoice_pdf(booking_id):
     elements.append(Spacer(1, 12))
 
     elements.append(
-        Image(
+        _image(
             SIGN_PATH,
             width=90,
             height=60,
@@ -260,6 +287,16 @@ def generate_invoice_pdf(booking_id):
 
     buffer.name = f"{invoice_no}.pdf"
     buffer.content_type = "application/pdf"
+    return invoice_no, buffer
+
+
+def generate_invoice_pdf(booking_id):
+    """
+    Synchronous render + upload. Request paths should use
+    bookings.utils.invoice_jobs.enqueue_invoice() instead.
+    """
+    booking = load_invoice_booking(booking_id)
+    invoice_no, buffer = render_invoice_pdf(booking)
 
     file_url = upload_to_s3(
         buffer,
@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from bookings.models import Booking, BookingDocument, JobLock, StoredBlob
+from bookings.utils.invoice import INVOICE_PREFETCH, render_invoice_pdf
+from drpathcare.storage import LocalStorageBackend, upload
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+# Statuses from which a booking carries an invoice (set on sample_collected)
+INVOICE_STATUSES = [
+    "sample_collected",
+    "report_uploaded",
+    "health_manger_assigned",
+    "dietitian_assigned",
+    "completed",
+]
+INVOICE_BATCH_WORKERS = getattr(settings, "INVOICE_BATCH_WORKERS", None)  # None → os.cpu_count()
+INVOICE_UPLOAD_WORKERS = getattr(settings, "INVOICE_UPLOAD_WORKERS", 8)
+INVOICE_BATCH_CHUNK = getattr(settings, "INVOICE_BATCH_CHUNK", 200)
+INVOICE_BATCH_LOCK_TTL = getattr(settings, "INVOICE_BATCH_LOCK_TTL", 2 * 60 * 60)  # seconds, stale-lock safety net
+
+INVOICE_BATCH_LOCK_KEY = "invoice_batch:running"
+
+
+def acquire_batch_lock():
+    """
+    True if no other batch is running; the caller must release_batch_lock()
+    when done. The lock is a JobLock row, so the API process can take it and
+    the `generate_invoices` process it launches can release it.
+    """
+    now = timezone.now()
+    JobLock.objects.filter(name=INVOICE_BATCH_LOCK_KEY, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            JobLock.objects.create(
+                name=INVOICE_BATCH_LOCK_KEY, expires_at=now + timedelta(seconds=INVOICE_BATCH_LOCK_TTL)
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_batch_lock():
+    JobLock.objects.filter(name=INVOICE_BATCH_LOCK_KEY).delete()
+
+
+def invoice_booking_ids(booking_ids=None, month=None):
+    """
+    Bookings to (re)generate: explicit ids, or every invoiceable booking
+    created in `month` ("YYYY-MM").
+    """
+    qs = Booking.objects.all()
+    if booking_ids:
+        qs = qs.filter(id__in=booking_ids)
+    else:
+        qs = qs.filter(status__in=INVOICE_STATUSES)
+    if month:
+        year, mon = (int(part) for part in month.split("-"))
+        qs = qs.filter(created_at__year=year, created_at__month=mon)
+    return list(qs.order_by("created_at").values_list("id", flat=True))
+
+
+def load_invoice_bookings(booking_ids):
+    """Whole chunk in four queries: bookings (+user/address) and items with their products."""
+    return list(
+        Booking.objects
+        .filter(id__in=booking_ids)
+        .select_related("user", "address__location")
+        .prefetch_related(*INVOICE_PREFETCH)
+    )
+
+
+# -------------------------
+# PROCESS POOL (rendering)
+# -------------------------
+def _init_worker():
+    # No-op under fork; needed when the pool spawns fresh interpreters
+    import django
+    django.setup()
+
+
+def _render_one(booking):
+    """Runs in a worker process; the booking arrives fully prefetched, no DB access."""
+    try:
+        invoice_no, buffer = render_invoice_pdf(booking)
+        return booking.id, invoice_no, buffer.getvalue(), None
+    except Exception as exc:
+        return booking.id, None, None, str(exc)
+
+
+INVOICE_BLOB_PREFIX = "booking_docs/invoices/"
+
+
+def _blob_key(data):
+    sha256 = hashlib.sha256(data).hexdigest()
+    return sha256, f"{INVOICE_BLOB_PREFIX}{sha256}.pdf"
+
+
+class _PDFUpload:
+    """Minimal file object storage.upload() accepts, so bytes can cross the process boundary."""
+
+    content_type = "application/pdf"
+
+    def __init__(self, invoice_no, data):
+        self.name = f"{invoice_no}.pdf"
+        self._data = data
+        self._pos = 0
+        self.size = len(data)
+
+    def seek(self, pos):
+        self._pos = pos
+
+    def read(self, size=-1):
+        end = len(self._data) if size is None or size < 0 else self._pos + size
+        chunk = self._data[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+
+# -------------------------
+# ENGINE
+# -------------------------
+def generate_invoices(booking_ids, workers=INVOICE_BATCH_WORKERS, upload_workers=INVOICE_UPLOAD_WORKERS,
+                      chunk_size=INVOICE_BATCH_CHUNK, output_dir=None):
+    """
+    Renders invoices for `booking_ids` across a process pool and uploads them
+    through a thread pool. Each chunk is loaded with bulk prefetches and its
+    BookingDocument rows are replaced in one transaction.
+
+    With `output_dir` the PDFs are written there and no documents are saved
+    (dry run / throughput check without S3).
+    """
+    backend = LocalStorageBackend(root=output_dir) if output_dir else None
+    stats = {"total": len(booking_ids), "rendered": 0, "uploaded": 0, "failed": 0}
+    started = time.monotonic()
+
+    # Forked workers must not share the parent's DB sockets
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as renderers, \
+            ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="invoice-upload") as uploaders:
+        for start in range(0, len(booking_ids), chunk_size):
+            bookings = load_invoice_bookings(booking_ids[start:start + chunk_size])
+
+            uploads = {}
+            for booking_id, invoice_no, data, error in renderers.map(_render_one, bookings, chunksize=8):
+                if error:
+                    stats["failed"] += 1
+                    logger.error("Invoice render failed for booking %s: %s", booking_id, error)
+                    continue
+                stats["rendered"] += 1
+                # Content-addressed like upload_to_s3(); registered below in one query
+                sha256, key = _blob_key(data)
+                future = uploaders.submit(upload, _PDFUpload(invoice_no, data), key=key, backend=backend)
+                uploads[booking_id] = (invoice_no, sha256, key, len(data), future)
+
+            documents = []
+            blobs = []
+            for booking_id, (invoice_no, sha256, key, size, future) in uploads.items():
+                try:
+                    file_url = future.result()
+                except Exception:
+                    stats["failed"] += 1
+                    logger.exception("Invoice upload failed for booking %s", booking_id)
+                    continue
+                stats["uploaded"] += 1
+                blobs.append(StoredBlob(
+                    sha256=sha256, prefix=INVOICE_BLOB_PREFIX, key=key, file_url=file_url, size=size, content_type=_PDFUpload.content_type,
+                ))
+                documents.append(BookingDocument(
+                    booking_id=booking_id,
+                    name=f"{invoice_no}.pdf",
+                    file_url=file_url,
+                    doc_type="invoice",
+                    status="ready",
+                ))
+
+            if documents and not output_dir:
+                with transaction.atomic():
+                    BookingDocument.objects.filter(
+                        booking_id__in=[doc.booking_id for doc in documents], doc_type="invoice"
+                    ).delete()
+                    BookingDocument.objects.bulk_create(documents)
+                    # bulk_create skips the file_url signals → count references here
+                    StoredBlob.objects.bulk_create(blobs, ignore_conflicts=True)
+                    StoredBlob.objects.filter(file_url__in=[doc.file_url for doc in documents]).update(
+                        ref_count=F("ref_count") + 1
+                    )
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["per_second"] = round(stats["rendered"] / elapsed, 2) if elapsed else 0
+    return stats
@@ -0,0 +1,143 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.utils import timezone
+
+from bookings.models import BookingDocument, StoredBlob
+from bookings.utils.invoice import load_invoice_booking, render_invoice_pdf
+from bookings.utils.s3_utils import upload_to_s3
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+INVOICE_WORKERS = getattr(settings, "INVOICE_WORKERS", 2)
+INVOICE_MAX_ATTEMPTS = getattr(settings, "INVOICE_MAX_ATTEMPTS", 3)
+INVOICE_RETRY_DELAY = getattr(settings, "INVOICE_RETRY_DELAY", 5)  # seconds, doubled per attempt
+INVOICE_STALE_AFTER = getattr(settings, "INVOICE_STALE_AFTER", 15)  # minutes untouched in pending/processing
+
+# Bounded pool: a burst of status updates queues up instead of spawning threads
+_executor = ThreadPoolExecutor(max_workers=INVOICE_WORKERS, thread_name_prefix="invoice")
+
+
+def enqueue_invoice(booking_id):
+    """
+    Marks the booking's invoice document as pending and schedules generation
+    once the surrounding transaction commits. Safe to call repeatedly: there is
+    a single invoice row per booking and a running job is simply re-queued.
+    """
+    docs = BookingDocument.objects.filter(booking_id=booking_id, doc_type="invoice").order_by("-created_at")
+    doc = docs.first()
+
+    if doc is None:
+        doc = BookingDocument.objects.create(
+            booking_id=booking_id,
+            name="invoice.pdf",
+            file_url="",  # filled in by the worker
+            doc_type="invoice",
+            status="pending",
+        )
+    else:
+        # Keep the previous file visible until the new one is uploaded
+        docs.exclude(pk=doc.pk).delete()
+        BookingDocument.objects.filter(pk=doc.pk).update(
+            status="pending", attempts=0, error_message=None, updated_at=timezone.now()
+        )
+
+    transaction.on_commit(lambda: _submit(doc.pk))
+    return doc
+
+
+def _submit(doc_id):
+    _executor.submit(_run, doc_id)
+
+
+def _run(doc_id):
+    close_old_connections()
+    try:
+        _process(doc_id)
+    finally:
+        close_old_connections()
+
+
+def _process(doc_id):
+    # Claim the job; a concurrent worker or a deleted row leaves nothing to do
+    claimed = BookingDocument.objects.filter(pk=doc_id, status="pending").update(
+        status="processing", updated_at=timezone.now()
+    )
+    if not claimed:
+        return
+
+    doc = BookingDocument.objects.only("id", "booking_id", "attempts", "file_url").get(pk=doc_id)
+
+    try:
+        booking = load_invoice_booking(doc.booking_id)
+        invoice_no, buffer = render_invoice_pdf(booking)
+        file_url = upload_to_s3(buffer, prefix="booking_docs/invoices/")
+    except Exception as exc:
+        _fail(doc, exc)
+        return
+
+    done = BookingDocument.objects.filter(pk=doc_id, status="processing").update(
+        status="ready",
+        name=f"{invoice_no}.pdf",
+        file_url=file_url,
+        error_message=None,
+        updated_at=timezone.now(),
+    )
+    if done:
+        # .update() bypasses the file_url signals, move the blob reference by hand
+        StoredBlob.release(doc.file_url)
+        StoredBlob.retain(file_url)
+    elif BookingDocument.objects.filter(pk=doc_id, status="pending").exists():
+        # Booking changed while rendering → build again with fresh data
+        _submit(doc_id)
+
+
+def _fail(doc, exc):
+    attempts = doc.attempts + 1
+    retry = attempts < INVOICE_MAX_ATTEMPTS
+    logger.exception("Invoice generation failed for booking %s (attempt %s)", doc.booking_id, attempts)
+
+    BookingDocument.objects.filter(pk=doc.pk, status="processing").update(
+        status="pending" if retry else "failed",
+        attempts=attempts,
+        error_message=str(exc)[:1000],
+        updated_at=timezone.now(),
+    )
+
+    if retry:
+        timer = threading.Timer(INVOICE_RETRY_DELAY * 2 ** (attempts - 1), _submit, args=[doc.pk])
+        timer.daemon = True
+        timer.start()
+
+
+def requeue_stale_invoices(stale_after=INVOICE_STALE_AFTER, wait=False):
+    """
+    Recovers invoice jobs lost with a restarted worker: rows left pending
+    (including a retry whose timer died) or processing for more than
+    `stale_after` minutes are reset to pending and run again. `wait=True`
+    runs them in the caller's thread (management command). Returns the ids.
+    """
+    cutoff = timezone.now() - timedelta(minutes=stale_after)
+    stale = BookingDocument.objects.filter(
+        doc_type="invoice", status__in=["pending", "processing"], updated_at__lt=cutoff
+    )
+    doc_ids = list(stale.values_list("id", flat=True))
+    # Same filter again: a job that moved on meanwhile is left alone
+    BookingDocument.objects.filter(id__in=doc_ids).filter(
+        status__in=["pending", "processing"], updated_at__lt=cutoff
+    ).update(status="pending", updated_at=timezone.now())
+
+    for doc_id in doc_ids:
+        if wait:
+            _run(doc_id)
+        else:
+            _submit(doc_id)
+    return doc_ids
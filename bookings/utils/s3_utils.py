@@ -1,8 +1,14 @@
 # utils/s3_utils.py
-import boto3
-import uuid
-from io import BytesIO
-from django.conf import settings
+import hashlib
+import os
+import tempfile
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from drpathcare.storage import normalize_upload, upload
+
+CHUNK_SIZE = 1024 * 1024
 
 
 def upload_to_s3(file_obj, prefix="uploads/"):
@@ -14,55 +20,79 @@ def upload_to_s3(file_obj, prefix="uploads/"):
     - Django UploadedFile
     - BytesIO
     - raw bytes
+
+    Content-addressed: identical files map to the same object, see upload_blob().
     """
+    return upload_blob(file_obj, prefix=prefix).file_url
+
+
+def _seekable(file_obj):
+    if hasattr(file_obj, "seekable"):
+        return file_obj.seekable()
+    return hasattr(file_obj, "seek")
+
+
+def _hash_stream(file_obj, sink=None):
+    """SHA-256 + size in fixed-size chunks; optionally copies the bytes to `sink`."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = file_obj.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest(), size
+
+
+def upload_blob(file_obj, prefix="uploads/"):
+    """
+    Hashes the upload in a first pass, then either returns the StoredBlob
+    already holding those bytes under `prefix` (no upload) or rewinds,
+    stores it under "<prefix><sha256><ext>" and registers it. Dedupe is per
+    prefix: the same bytes under another prefix get their own object.
+
+    Non-seekable streams are spooled (memory, then disk) during the hashing pass.
+    References are counted by the rows that save the URL, not here.
+    """
+    from bookings.models import StoredBlob
+
+    file_obj, name, content_type, _ = normalize_upload(file_obj)
+
+    spool = None
+    if not _seekable(file_obj):
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE)
+        sha256, size = _hash_stream(file_obj, sink=spool)
+        file_obj = spool
+    else:
+        sha256, size = _hash_stream(file_obj)
+    file_obj.seek(0)
+
+    try:
+        blob = StoredBlob.objects.filter(sha256=sha256, prefix=prefix).first()
+        if blob is not None:
+            StoredBlob.objects.filter(pk=blob.pk).update(last_used_at=timezone.now())
+            return blob
+
+        ext = os.path.splitext(name)[1].lower()
+        key = f"{prefix}{sha256}{ext}"
+        file_url = upload(file_obj, key=key, content_type=content_type)
 
-    if not file_obj:
-        raise ValueError("No file object provided for upload.")
-
-    s3 = boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME,
-    )
-
-    # -------------------------
-    # Normalize input
-    # -------------------------
-    content_type = "application/octet-stream"
-    name = "file"
-
-    # Case 1: raw bytes
-    if isinstance(file_obj, (bytes, bytearray)):
-        file_obj = BytesIO(file_obj)
-
-    # Case 2: Django UploadedFile
-    if hasattr(file_obj, "content_type"):
-        content_type = file_obj.content_type or content_type
-
-    if hasattr(file_obj, "name"):
-        name = file_obj.name
-
-    # Ensure file pointer is at start
-    if hasattr(file_obj, "seek"):
-        file_obj.seek(0)
-
-    if not hasattr(file_obj, "read"):
-        raise ValueError("File object must implement read()")
-
-    filename = f"{prefix}{uuid.uuid4()}_{name}"
-
-    # -------------------------
-    # Upload
-    # -------------------------
-    s3.upload_fileobj(
-        file_obj,
-        settings.AWS_STORAGE_BUCKET_NAME,
-        filename,
-        ExtraArgs={"ContentType": content_type},
-    )
-
-    return (
-        f"https://{settings.AWS_STORAGE_BUCKET_NAME}"
-        f".s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{filename}"
-    )
+        try:
+            with transaction.atomic():
+                return StoredBlob.objects.create(
+                    sha256=sha256,
+                    prefix=prefix,
+                    key=key,
+                    file_url=file_url,
+                    size=size,
+                    content_type=content_type,
+                )
+        except IntegrityError:
+            # Same bytes uploaded concurrently; the object is identical either way
+            return StoredBlob.objects.get(sha256=sha256, prefix=prefix)
+    finally:
+        if spool is not None:
+            spool.close()
@@ -1,20 +1,27 @@
-import boto3
 import uuid
 import json
-from django.conf import settings
 from rest_framework import viewsets, status,filters
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+
+from drpathcare.storage import upload
+from drpathcare.direct_uploads import DirectUploadMixin, MB
 
 from .models import ContentManager
 from .serializers import ContentManagerSerializer
 
 
-class ContentManagerViewSet(viewsets.ModelViewSet):
+class ContentManagerViewSet(DirectUploadMixin, viewsets.ModelViewSet):
     queryset = ContentManager.objects.all().order_by("-created_at")
     serializer_class = ContentManagerSerializer
     parser_classes = (MultiPartParser, FormParser)
+    upload_prefix = "content/"
+    upload_max_size = 200 * MB  # videos
+    upload_content_types = None
+    upload_extra_args = {"ACL": "public-read"}
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "title", "description"]
@@ -61,6 +68,18 @@ class ContentManagerViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    # ---------------------------------------
+    # CONFIRM → register a presigned upload
+    # ---------------------------------------
+    @action(detail=False, methods=["post"], url_path="confirm", parser_classes=api_settings.DEFAULT_PARSER_CLASSES)
+    def confirm(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file_url = self.confirm_direct_upload(request.data.get("upload_token"))
+        serializer.save(file_url=file_url)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     # ---------------------------------------
     # Shared S3 upload helper
     # ---------------------------------------
@@ -69,29 +88,11 @@ class ContentManagerViewSet(viewsets.ModelViewSet):
         if not file_obj:
             raise ValueError("No file uploaded")
 
-        s3 = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_S3_REGION_NAME,
-        )
-
         ext = file_obj.name.split(".")[-1]
-        filename = f"content/{uuid.uuid4()}.{ext}"
-
-        s3.upload_fileobj(
+        return upload(
             file_obj,
-            settings.AWS_STORAGE_BUCKET_NAME,
-            filename,
-            ExtraArgs={
-                "ContentType": file_obj.content_type,
-                "ACL": "public-read",  # important for read access
-            },
-        )
-
-        return (
-            f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3."
-            f"{settings.AWS_S3_REGION_NAME}.amazonaws.com/{filename}"
+            key=f"content/{uuid.uuid4()}.{ext}",
+            extra_args={"ACL": "public-read"},  # important for read access
         )
 
 
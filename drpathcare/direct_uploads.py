@@ -0,0 +1,82 @@
+from django.conf import settings
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from drpathcare.storage import UploadRejected, confirm_upload, presign_upload
+
+MB = 1024 * 1024
+
+DOCUMENT_CONTENT_TYPES = [
+    "application/pdf",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "image/heic",
+]
+
+
+class DirectUploadMixin:
+    """
+    Two-step uploads that never pass file bytes through Django:
+
+    1. POST <list>/presign/  { file_name, content_type, size, method? }
+       → signed POST (default) or PUT target + `upload_token`; PUT needs `size`
+    2. client uploads straight to storage, then sends `upload_token` to a
+       confirm endpoint; the view calls confirm_direct_upload() to get the URL.
+
+    Views set `upload_prefix`, `upload_max_size` and `upload_content_types`
+    (None allows any type).
+    """
+
+    upload_prefix = "uploads/"
+    upload_max_size = getattr(settings, "DIRECT_UPLOAD_MAX_SIZE", 20 * MB)
+    upload_content_types = DOCUMENT_CONTENT_TYPES
+    upload_extra_args = None
+
+    # JSON bodies are accepted even when the view itself only parses multipart
+    @action(detail=False, methods=["post"], url_path="presign", parser_classes=api_settings.DEFAULT_PARSER_CLASSES)
+    def presign(self, request):
+        file_name = request.data.get("file_name")
+        content_type = request.data.get("content_type")
+        size = request.data.get("size")
+        method = (request.data.get("method") or "post").lower()
+
+        if not file_name or not content_type:
+            raise ValidationError({"detail": "file_name and content_type are required."})
+        if self.upload_content_types is not None and content_type not in self.upload_content_types:
+            raise ValidationError({"content_type": f"Allowed: {', '.join(self.upload_content_types)}"})
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                raise ValidationError({"size": "Must be an integer."})
+            if size <= 0 or size > self.upload_max_size:
+                raise ValidationError({"size": f"Max {self.upload_max_size // MB} MB."})
+        if method not in ("post", "put"):
+            raise ValidationError({"method": "Use post or put."})
+        if method == "put" and size is None:
+            raise ValidationError({"size": "Required for PUT uploads (signed into the URL)."})
+
+        try:
+            target = presign_upload(
+                self.upload_prefix,
+                file_name,
+                content_type,
+                self.upload_max_size,
+                method=method,
+                extra_args=self.upload_extra_args,
+                size=size,
+            )
+        except (NotImplementedError, UploadRejected) as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(target)
+
+    def confirm_direct_upload(self, token):
+        if not token:
+            raise ValidationError({"upload_token": "This field is required."})
+        try:
+            return confirm_upload(token, self.upload_prefix)
+        except UploadRejected as exc:
+            raise ValidationError({"upload_token": str(exc)})
@@ -0,0 +1,137 @@
+import logging
+import smtplib
+import ssl
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+EMAIL_POOL_SIZE = getattr(settings, "EMAIL_POOL_SIZE", 4)  # idle connections kept per server/login
+EMAIL_POOL_IDLE_TIMEOUT = getattr(settings, "EMAIL_POOL_IDLE_TIMEOUT", 120)  # mail hosts drop idle sessions
+EMAIL_POOL_HEALTHCHECK_AFTER = getattr(settings, "EMAIL_POOL_HEALTHCHECK_AFTER", 5)  # NOOP only if idle longer
+# The current mail host presents a certificate that doesn't verify
+EMAIL_SSL_VERIFY = getattr(settings, "EMAIL_SSL_VERIFY", False)
+
+
+def _discard(connection):
+    try:
+        connection.quit()
+    except Exception:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+# ============================================================
+# 🔹 Pool of authenticated SMTP connections (per process)
+# ============================================================
+class SMTPConnectionPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = {}  # (host, port, username) → [(connection, last_used)]
+
+    def checkout(self, key):
+        while True:
+            with self.lock:
+                bucket = self.idle.get(key)
+                if not bucket:
+                    return None
+                connection, last_used = bucket.pop()
+
+            idle_for = time.monotonic() - last_used
+            if idle_for > EMAIL_POOL_IDLE_TIMEOUT:
+                _discard(connection)
+                continue
+            if idle_for > EMAIL_POOL_HEALTHCHECK_AFTER:
+                try:
+                    if connection.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except (smtplib.SMTPException, OSError):
+                    _discard(connection)
+                    continue
+            return connection
+
+    def checkin(self, key, connection):
+        with self.lock:
+            bucket = self.idle.setdefault(key, [])
+            if len(bucket) >= EMAIL_POOL_SIZE:
+                return False
+            bucket.append((connection, time.monotonic()))
+            return True
+
+
+_pool = SMTPConnectionPool()
+
+
+class PooledEmailBackend(EmailBackend):
+    """
+    SMTP backend whose close() parks the authenticated connection in a
+    process-wide pool instead of quitting, so the next message skips the
+    TLS handshake and login. Pooled connections idle for a while are
+    NOOP-checked; a connection that drops mid-batch is replaced once.
+    """
+
+    @cached_property
+    def ssl_context(self):
+        if EMAIL_SSL_VERIFY:
+            return super().ssl_context
+        return ssl._create_unverified_context()
+
+    @property
+    def pool_key(self):
+        return (self.host, self.port, self.username)
+
+    def open(self):
+        if self.connection:
+            return False
+        connection = _pool.checkout(self.pool_key)
+        if connection is not None:
+            self.connection = connection
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        if not _pool.checkin(self.pool_key, connection):
+            _discard(connection)
+
+    def _reconnect(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            _discard(connection)
+        return super().open()
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        with self._lock:
+            new_conn_created = self.open()
+            if not self.connection or new_conn_created is None:
+                return 0
+            num_sent = 0
+            try:
+                for message in email_messages:
+                    try:
+                        sent = self._send(message)
+                    except (smtplib.SMTPServerDisconnected, ConnectionError):
+                        # Stale pooled session: one fresh connection, one retry
+                        logger.info("SMTP connection dropped, reconnecting")
+                        self._reconnect()
+                        sent = self._send(message)
+                    if sent:
+                        num_sent += 1
+            finally:
+                if new_conn_created:
+                    self.close()
+        return num_sent
@@ -0,0 +1,172 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+# Fields whose to_representation() is a no-op for values coming out of the DB
+_PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+_SKIP = object()
+
+
+class RowMapper:
+    """
+    Renders `.values()` rows into dicts identical to `serializer_class` output,
+    without building model instances or walking DRF fields per row.
+
+    The plan is compiled once per mapper class from the serializer's own fields:
+    - model columns / FK paths (e.g. "category.name") are read from the row
+      and formatted with the field's to_representation()
+    - a missing intermediate object (category is NULL) omits the key, the same
+      way DRF skips read-only fields whose source can't be resolved
+    - sources that aren't model fields at all (e.g. "image.url") are omitted
+    - method / nested / M2M fields must be supplied through `computed`
+
+    Subclasses set:
+        serializer_class  → serializer whose output is mirrored
+        annotations       → {name: expression} added before .values()
+        annotated         → names the view's queryset already annotates
+        computed_values   → extra columns needed by computed fields
+        computed          → {field_name: "method_name"} for fields built by hand
+    and may override `prefetch(rows)` to batch-load related data once per page.
+    """
+
+    serializer_class = None
+    annotations = {}
+    annotated = ()
+    computed_values = ()
+    computed = {}
+
+    _compiled = None
+
+    @classmethod
+    def compile(cls):
+        if cls.__dict__.get("_compiled") is not None:
+            return cls._compiled
+
+        serializer = cls.serializer_class()
+        model = serializer.Meta.model
+        value_keys = list(cls.computed_values)
+        plan = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if name in cls.computed:
+                plan.append((name, None, (), cls.computed[name], None))
+                continue
+
+            if field.source == "*" or isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: field '{name}' needs an entry in `computed`."
+                )
+
+            path = cls._resolve_path(model, field.source_attrs, name)
+            if path is _SKIP:
+                continue
+
+            key = "__".join(path)
+            # Every intermediate FK must be non-null for the key to be rendered
+            null_checks = tuple("__".join(path[:i]) for i in range(1, len(path)))
+            value_keys.append(key)
+            value_keys.extend(null_checks)
+
+            formatter = None if isinstance(field, _PASSTHROUGH_FIELDS) else field.to_representation
+            plan.append((name, key, null_checks, None, formatter))
+
+        cls._compiled = (sorted(set(value_keys)), plan)
+        return cls._compiled
+
+    @classmethod
+    def _resolve_path(cls, model, attrs, name):
+        current = model
+        for idx, attr in enumerate(attrs):
+            if idx == 0 and (attr in cls.annotations or attr in cls.annotated):
+                return [attr]
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                if hasattr(current, attr):
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}: '{name}' reads a model attribute; add it to `computed`."
+                    )
+                # attribute DRF can never resolve → the key is always skipped
+                return _SKIP
+
+            if model_field.many_to_many or model_field.one_to_many:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: '{name}' spans a multi-valued relation; add it to `computed`."
+                )
+            if model_field.is_relation and idx < len(attrs) - 1:
+                current = model_field.related_model
+        return list(attrs)
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def values_queryset(self, queryset):
+        value_keys, _ = self.compile()
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset.values(*value_keys)
+
+    def prefetch(self, rows):
+        """Hook: batch-load whatever computed fields need. Returns a context dict."""
+        return {}
+
+    def render(self, rows):
+        _, plan = self.compile()
+        rows = list(rows)
+        ctx = self.prefetch(rows)
+        out = []
+        for row in rows:
+            item = {}
+            for name, key, null_checks, method, formatter in plan:
+                if method is not None:
+                    item[name] = getattr(self, method)(row, ctx)
+                    continue
+                if null_checks and any(row[k] is None for k in null_checks):
+                    continue
+                value = row[key]
+                item[name] = value if value is None or formatter is None else formatter(value)
+            out.append(item)
+        return out
+
+
+class FastRowsListMixin:
+    """
+    Opt-in `?fast=1` list path: the filtered/paginated queryset is evaluated
+    with .values() and rendered by `fast_row_mapper_class` instead of the
+    ModelSerializer. Output is the same; falls back to the regular path when
+    sparse fields are requested.
+    """
+
+    fast_row_mapper_class = None
+
+    def use_fast_rows(self):
+        params = self.request.query_params
+        return (
+            self.fast_row_mapper_class is not None
+            and params.get("fast") in ("1", "true")
+            and not params.get("fields")
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_rows():
+            return super().list(request, *args, **kwargs)
+
+        mapper = self.fast_row_mapper_class()
+        queryset = mapper.values_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(mapper.render(page))
+        return Response(mapper.render(queryset))
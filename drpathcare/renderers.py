@@ -0,0 +1,71 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import renderers, parsers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is used without it
+    orjson = None
+
+
+# Datetimes / dataclasses go through DRF's encoder so their output stays
+# byte-for-byte what JSONRenderer produced ("...Z" for UTC, Decimal → float, etc.)
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson else 0
+)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer backed by orjson when available.
+
+    Falls back to the stdlib implementation when orjson is missing, when an
+    indented response is requested (browsable API / ?indent) or when orjson
+    can't encode a value (e.g. ints beyond 64 bits).
+    """
+
+    _default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping JSONRenderer applies for JS-embedding safety
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser backed by orjson for UTF-8 bodies.
+
+    Anything orjson rejects (invalid JSON, NaN/Infinity, huge ints) is handed
+    to the stdlib parser so errors and edge cases behave exactly as before.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
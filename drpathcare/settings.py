@@ -13,11 +13,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-import ssl
-import smtplib
-
-from django.core.mail.backends.smtp import EmailBackend
-
 load_dotenv()
 
 #all env variables
@@ -25,6 +20,8 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = "drpathcare-prod"
 AWS_S3_REGION_NAME = "ap-south-1"
+# S3-compatible stand-in (MinIO, LocalStack) for local dev / CI; unset → AWS
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None
 AWS_S3_SIGNATURE_VERSION = "s3v4"
 AWS_S3_ADDRESSING_STYLE = "path"
 
@@ -40,6 +37,18 @@ MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/"
 AWS_S3_VERIFY = True
 MEDIA_URL = f"https://{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_REGION_NAME}.amazonaws.com/"
 
+# Upload service (drpathcare/storage.py) → LocalStorageBackend for tests / local dev
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "drpathcare.storage.S3StorageBackend")
+
+# Shared cache (OTPs, throttles, coupon version) → Redis when REDIS_URL is set,
+# otherwise per-process memory (fine for a single worker / local dev; live OTPs
+# then fall back to the OTP table so they verify on any worker)
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 
 # Media settings
 AWS_DEFAULT_REGION=os.getenv('AWS_DEFAULT_REGION')
@@ -48,6 +57,9 @@ SMS_USERNAME = os.getenv('SMS_USERNAME')
 SMS_API_KEY = os.getenv('SMS_API_KEY')
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID')
 RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')
+RAZORPAY_WEBHOOK_SECRET = os.getenv('RAZORPAY_WEBHOOK_SECRET')
+# payments/gateway.py → "payments.gateway.FakeGateway" for local runs
+PAYMENT_GATEWAY_CLIENT = os.getenv("PAYMENT_GATEWAY_CLIENT", "payments.gateway.RazorpayGateway")
 GETA_API_KEY = os.getenv('GETA_API_KEY')
 BASE_URL = os.getenv('BASE_URL')
 
@@ -59,18 +71,11 @@ EXOTEL_API_TOKEN = os.getenv('EXOTEL_API_TOKEN')
 EXOTEL_CALLER_ID = os.getenv('EXOTEL_CALLER_ID')
 
 
-class TrustAllEmailBackend(EmailBackend):
-    def open(self):
-        self.connection = smtplib.SMTP_SSL(
-            self.host,
-            self.port,
-            timeout=self.timeout,
-            context=ssl._create_unverified_context()
-        )
-        self.connection.login(self.username, self.password)
-        return True
-
-EMAIL_BACKEND = "drpathcare.settings.TrustAllEmailBackend"
+# Pooled SMTP connections (drpathcare/email_backend.py); certificate check off
+# as before (EMAIL_SSL_VERIFY)
+EMAIL_BACKEND = "drpathcare.email_backend.PooledEmailBackend"
+EMAIL_SSL_VERIFY = False
+EMAIL_POOL_SIZE = 4
 
 
 # EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -97,6 +102,14 @@ SECRET_KEY = 'django-insecure-er6@!xzr1*jp11xv(sjy@xj23nthk8i*(8b4u**6lzvyg(#d$y
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+if not REDIS_URL and not DEBUG:
+    import warnings
+    warnings.warn(
+        "REDIS_URL is not set: the cache is per-process, so OTP/login throttles and cached "
+        "state are not shared between workers. Set REDIS_URL in production.",
+        RuntimeWarning,
+    )
+
 ALLOWED_HOSTS = ['*']
 
 # CORS_ALLOWED_ORIGINS = [
@@ -268,13 +281,24 @@ SIMPLE_JWT = {
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # simplejwt + in-process user/role cache (users/authentication.py)
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,  # default items per page
+    # orjson-backed JSON (falls back to stdlib json when orjson isn't installed)
+    "DEFAULT_RENDERER_CLASSES": (
+        "drpathcare.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "drpathcare.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 # ==== STATIC FILES ====
@@ -0,0 +1,133 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _split_param(value):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for read endpoints:
+
+    - ?fields=id,name,price        → only these top-level keys are rendered
+    - ?expand=tests                → nested fields listed in `expandable_fields`
+                                     are rendered in full; without it they
+                                     collapse to primary keys when ?fields= is used
+
+    The queryset is narrowed with .only() to the columns backing the selected
+    fields. Fields whose columns can't be inferred (method fields, properties)
+    must be declared in `sparse_field_columns`, otherwise .only() is skipped
+    and the full row is loaded as before.
+
+    Without ?fields= nothing changes.
+    """
+
+    expandable_fields = []
+    # {"serializer_field": ["model__column", ...]} for method/computed fields
+    sparse_field_columns = {}
+
+    def _sparse_enabled(self):
+        return self.request is not None and self.request.method == "GET"
+
+    def get_sparse_fields(self):
+        if not self._sparse_enabled():
+            return None
+        fields = _split_param(self.request.query_params.get("fields"))
+        return set(fields) if fields else None
+
+    def get_expanded_fields(self):
+        expand = _split_param(self.request.query_params.get("expand"))
+        return set(expand) & set(self.expandable_fields)
+
+    # -------------------------
+    # Serializer narrowing
+    # -------------------------
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        selected = self.get_sparse_fields()
+        if selected is None:
+            return serializer
+
+        target = getattr(serializer, "child", serializer)
+        expanded = self.get_expanded_fields()
+
+        for name in list(target.fields):
+            if name not in selected and name not in expanded:
+                target.fields.pop(name)
+            elif name in self.expandable_fields and name not in expanded:
+                target.fields[name] = self._collapsed_field(target.fields[name])
+        return serializer
+
+    @staticmethod
+    def _collapsed_field(field):
+        """Nested serializer → primary key(s) of the related object(s)."""
+        many = isinstance(field, serializers.ListSerializer)
+        # DRF rejects source= equal to the field name it gets bound to
+        source = {} if field.source == field.field_name else {"source": field.source}
+        return serializers.PrimaryKeyRelatedField(many=many, read_only=True, **source)
+
+    # -------------------------
+    # Column narrowing
+    # -------------------------
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selected = self.get_sparse_fields()
+        if selected is None or self.action not in ("list", "retrieve"):
+            return queryset
+        return self._apply_only(queryset, selected | self.get_expanded_fields())
+
+    def _apply_only(self, queryset, selected):
+        # select_related=True means "follow everything", no safe column list
+        if queryset.query.select_related is True:
+            return queryset
+
+        model = queryset.model
+        serializer_fields = self.get_serializer_class()().fields
+        columns = set()
+        related = set()
+        prefetch = set()
+
+        for name in selected:
+            field = serializer_fields.get(name)
+            if field is None or field.write_only:
+                continue
+
+            if name in self.sparse_field_columns:
+                columns.update(self.sparse_field_columns[name])
+                continue
+
+            source = field.source
+            if source == "*" or isinstance(field, serializers.SerializerMethodField):
+                return queryset
+
+            root = source.split(".")[0]
+            if root in queryset.query.annotations:
+                continue
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                # property / attribute we know nothing about
+                return queryset
+
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetch.add(root)  # reverse / M2M → no column; one query per page instead of per row
+                continue
+            if model_field.auto_created:
+                continue
+
+            columns.add(root)
+            if model_field.is_relation and ("." in source or isinstance(field, serializers.BaseSerializer)):
+                related.add(root)
+
+        # Anything the view already select_related() must stay loaded
+        if isinstance(queryset.query.select_related, dict):
+            columns.update(queryset.query.select_related.keys())
+
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            # Leave lookups the view already prefetches (possibly with a custom Prefetch) alone
+            seen = {getattr(lookup, "prefetch_to", lookup) for lookup in queryset._prefetch_related_lookups}
+            queryset = queryset.prefetch_related(*(prefetch - seen))
+        return queryset.only(*columns) if columns else queryset.only(model._meta.pk.name)
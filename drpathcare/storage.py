@@ -0,0 +1,343 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+# ============================================================
+# 🔹 Backends
+# ============================================================
+class S3StorageBackend:
+    """
+    One boto3 client per process, created lazily under a lock (client
+    construction resolves endpoints and walks the credential chain, and the
+    default session isn't thread-safe). Clients themselves are thread-safe, so
+    request threads and upload pools share it.
+
+    Large bodies go through TransferConfig as concurrent multipart uploads.
+    """
+
+    def __init__(self):
+        self.bucket = settings.AWS_STORAGE_BUCKET_NAME
+        self.region = settings.AWS_S3_REGION_NAME
+        self.endpoint_url = getattr(settings, "AWS_S3_ENDPOINT_URL", None)
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self._transfer_config = None
+
+    @property
+    def client(self):
+        # Forked workers (invoice batch pool) must not reuse the parent's connections
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    import boto3
+                    from boto3.s3.transfer import TransferConfig
+
+                    session = boto3.session.Session()
+                    self._client = session.client(
+                        "s3",
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                        region_name=self.region,
+                        endpoint_url=self.endpoint_url,  # S3-compatible stand-in (MinIO etc.)
+                    )
+                    self._transfer_config = TransferConfig(
+                        multipart_threshold=getattr(settings, "STORAGE_MULTIPART_THRESHOLD", 8 * MB),
+                        multipart_chunksize=getattr(settings, "STORAGE_MULTIPART_CHUNKSIZE", 8 * MB),
+                        max_concurrency=getattr(settings, "STORAGE_MAX_CONCURRENCY", 8),
+                        use_threads=True,
+                    )
+                    self._pid = os.getpid()
+        return self._client
+
+    def save(self, file_obj, key, content_type, extra_args=None):
+        client = self.client
+        client.upload_fileobj(
+            file_obj,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type, **(extra_args or {})},
+            Config=self._transfer_config,
+        )
+        return self.url(key)
+
+    def url(self, key):
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+    def presign(self, key, content_type, max_size, expires, method="post", extra_args=None, size=None):
+        extra_args = extra_args or {}
+        if method == "put":
+            # PUT has no content-length-range; signing the declared length pins the body size
+            url = self.client.generate_presigned_url(
+                "put_object",
+                Params={
+                    "Bucket": self.bucket, "Key": key, "ContentType": content_type,
+                    "ContentLength": size, **extra_args,
+                },
+                ExpiresIn=expires,
+            )
+            headers = {"Content-Type": content_type, "Content-Length": str(size)}
+            return {"method": "PUT", "url": url, "fields": {}, "headers": headers}
+
+        fields = {"Content-Type": content_type}
+        conditions = [
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ]
+        if "ACL" in extra_args:
+            fields["acl"] = extra_args["ACL"]
+            conditions.append({"acl": extra_args["ACL"]})
+
+        post = self.client.generate_presigned_post(
+            self.bucket, key, Fields=fields, Conditions=conditions, ExpiresIn=expires,
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+    def stat(self, key):
+        """(size, content_type) of a stored object, None if it doesn't exist."""
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head["ContentLength"], head.get("ContentType")
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+class LocalStorageBackend:
+    """Writes to a directory on disk; for tests, local dev and throughput runs."""
+
+    def __init__(self, root=None, base_url=None):
+        self.root = root or getattr(settings, "STORAGE_LOCAL_ROOT", os.path.join(settings.BASE_DIR, "local_storage"))
+        self.base_url = base_url or getattr(settings, "STORAGE_LOCAL_URL", None)
+
+    def save(self, file_obj, key, content_type, extra_args=None):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            while True:
+                chunk = file_obj.read(MB)
+                if not chunk:
+                    break
+                fh.write(chunk)
+        return self.url(key)
+
+    def url(self, key):
+        if self.base_url:
+            return f"{self.base_url.rstrip('/')}/{key}"
+        return f"file://{os.path.join(self.root, key)}"
+
+    def presign(self, key, content_type, max_size, expires, method="post", extra_args=None, size=None):
+        raise NotImplementedError(
+            "LocalStorageBackend can't sign direct uploads; point AWS_S3_ENDPOINT_URL at a local S3 stand-in."
+        )
+
+    def stat(self, key):
+        path = os.path.join(self.root, key)
+        if not os.path.isfile(path):
+            return None
+        return os.path.getsize(path), None
+
+    def delete(self, key):
+        path = os.path.join(self.root, key)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+# ============================================================
+# 🔹 Metrics
+# ============================================================
+class UploadMetrics:
+    """In-process totals; every upload is also logged with its own timing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.failures = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def record(self, size, seconds, ok=True):
+        with self._lock:
+            self.count += 1
+            self.failures += 0 if ok else 1
+            self.bytes += size or 0
+            self.seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "failures": self.failures,
+                "bytes": self.bytes,
+                "seconds": round(self.seconds, 3),
+                "avg_ms": round(self.seconds * 1000 / self.count, 1) if self.count else 0,
+            }
+
+
+upload_metrics = UploadMetrics()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_storage():
+    """Backend from settings.STORAGE_BACKEND (dotted path), S3 by default."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "STORAGE_BACKEND", "drpathcare.storage.S3StorageBackend")
+                _backend = import_string(path)()
+    return _backend
+
+
+# ============================================================
+# 🔹 Public API
+# ============================================================
+def normalize_upload(file_obj):
+    """
+    Accepts a Django UploadedFile, any file-like object or raw bytes.
+    Returns (file_obj, name, content_type, size).
+    """
+    if not file_obj:
+        raise ValueError("No file object provided for upload.")
+
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = BytesIO(file_obj)
+
+    if not hasattr(file_obj, "read"):
+        raise ValueError("File object must implement read()")
+
+    content_type = getattr(file_obj, "content_type", None) or "application/octet-stream"
+    name = getattr(file_obj, "name", None) or "file"
+    size = getattr(file_obj, "size", None)
+    if size is None and isinstance(file_obj, BytesIO):
+        size = file_obj.getbuffer().nbytes
+
+    # Ensure file pointer is at start
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+
+    return file_obj, name, content_type, size
+
+
+def build_key(prefix, name):
+    return f"{prefix}{uuid.uuid4()}_{name}"
+
+
+def upload(file_obj, prefix="uploads/", key=None, extra_args=None, backend=None, content_type=None):
+    """
+    Stores `file_obj` and returns its public URL.
+    Key defaults to "<prefix><uuid>_<original name>".
+    """
+    backend = backend or get_storage()
+    file_obj, name, detected_type, size = normalize_upload(file_obj)
+    content_type = content_type or detected_type
+    key = key or build_key(prefix, name)
+
+    started = time.perf_counter()
+    try:
+        url = backend.save(file_obj, key, content_type, extra_args)
+    except Exception:
+        upload_metrics.record(size, time.perf_counter() - started, ok=False)
+        raise
+
+    elapsed = time.perf_counter() - started
+    upload_metrics.record(size, elapsed)
+    logger.info("storage upload key=%s bytes=%s ms=%.1f", key, size, elapsed * 1000)
+    return url
+
+
+# ============================================================
+# 🔹 Direct (presigned) uploads
+# ============================================================
+UPLOAD_TOKEN_SALT = "drpathcare.storage.direct-upload"
+DIRECT_UPLOAD_EXPIRES = getattr(settings, "DIRECT_UPLOAD_EXPIRES", 15 * 60)
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def presign_upload(prefix, filename, content_type, max_size, method="post", extra_args=None, backend=None,
+                   size=None):
+    """
+    Signs a browser → storage upload. The returned `upload_token` pins the key
+    and limits; confirm_upload() only accepts keys issued here. PUT uploads
+    need the exact `size`, which is signed into the URL.
+    """
+    if method == "put" and not size:
+        raise UploadRejected("size is required for PUT uploads.")
+    backend = backend or get_storage()
+    key = build_key(prefix, os.path.basename(filename) or "file")
+    target = backend.presign(
+        key, content_type, max_size, DIRECT_UPLOAD_EXPIRES, method=method, extra_args=extra_args, size=size,
+    )
+    token = signing.dumps({"key": key, "prefix": prefix, "max_size": max_size}, salt=UPLOAD_TOKEN_SALT)
+    return {
+        **target,
+        "key": key,
+        "file_url": backend.url(key),
+        "upload_token": token,
+        "expires_in": DIRECT_UPLOAD_EXPIRES,
+    }
+
+
+def confirm_upload(token, prefix, backend=None):
+    """
+    Verifies a direct upload landed and returns its public URL. Each token
+    confirms once; an oversized object is deleted on rejection.
+    Raises UploadRejected for forged/expired/reused tokens, missing or oversized objects.
+    """
+    backend = backend or get_storage()
+    try:
+        # Generous max_age: the upload itself may finish right at expiry
+        payload = signing.loads(token, salt=UPLOAD_TOKEN_SALT, max_age=DIRECT_UPLOAD_EXPIRES * 2)
+    except signing.BadSignature:
+        raise UploadRejected("Invalid or expired upload token.")
+
+    if payload["prefix"] != prefix:
+        raise UploadRejected("Upload token was issued for a different target.")
+
+    stat = backend.stat(payload["key"])
+    if stat is None:
+        raise UploadRejected("File has not been uploaded yet.")
+    if stat[0] > payload["max_size"]:
+        backend.delete(payload["key"])
+        raise UploadRejected("Uploaded file is too large.")
+
+    # One confirm per token (the key is unique per token), recorded in the DB
+    # so a replay is refused on every worker
+    from bookings.models import ConfirmedUpload
+
+    try:
+        with transaction.atomic():
+            ConfirmedUpload.objects.create(key=payload["key"])
+    except IntegrityError:
+        raise UploadRejected("Upload token was already used.")
+
+    return backend.url(payload["key"])
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+
+class VersionedRegistry:
+    """
+    In-process snapshot of rarely changing rows (active coupons, SMS
+    templates), rebuilt by `loader()` when:
+    - the version number under `version_key` in the shared cache moves
+      (bump() after a row change), or
+    - the snapshot is older than `ttl` seconds. With a per-process cache
+      (LocMem) a bump is only seen by the process that made it, so `ttl`
+      is the upper bound on staleness elsewhere.
+
+    get() returns whatever loader() built; the snapshot is replaced in one
+    assignment, so readers never see a half-built one. Treat it as read-only.
+    """
+
+    def __init__(self, version_key, ttl, loader):
+        self.version_key = version_key
+        self.ttl = ttl
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.version = None
+        self.loaded_at = 0
+        self.snapshot = None
+
+    def bump(self):
+        """Every process reloads on its next get()."""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, time.time_ns(), None)
+
+    def current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, time.time_ns(), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def _stale(self, version):
+        return version != self.version or time.monotonic() - self.loaded_at > self.ttl
+
+    def get(self):
+        version = self.current_version()
+        if self._stale(version):
+            with self.lock:
+                if self._stale(version):
+                    self.snapshot = self.loader()
+                    self.version = version
+                    self.loaded_at = time.monotonic()
+        return self.snapshot
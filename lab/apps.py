@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LabConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lab'
+
+    def ready(self):
+        import lab.signals  # keeps denormalized test counts in sync
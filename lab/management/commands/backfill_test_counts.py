@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lab.utils import (
+    backfill_labtest_test_counts,
+    refresh_profile_test_counts,
+    refresh_package_test_counts,
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized test_count on LabTest, Profile and Package."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tests = backfill_labtest_test_counts(batch_size=options["batch_size"])
+            profiles = refresh_profile_test_counts()
+            packages = refresh_package_test_counts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {tests} lab tests, refreshed {profiles} profiles and {packages} packages."
+        ))
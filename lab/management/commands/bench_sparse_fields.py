@@ -0,0 +1,87 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from lab.models import LabCategory, LabTest, Package
+from lab.views import PackageCRMViewSet
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Payload size and render time of one CRM package page, full vs ?fields= / ?expand=. "
+        "Seeded rows are rolled back."
+    )
+
+    VARIANTS = (
+        ("full", ""),
+        ("?fields=id,name,price,test_count", "&fields=id,name,price,test_count"),
+        ("?fields=id,name,tests", "&fields=id,name,tests"),
+        ("?fields=id,name,tests&expand=tests", "&fields=id,name,tests&expand=tests"),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--tests-per-package", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        with transaction.atomic():
+            user = self._seed(page_size, options["tests_per_package"])
+            view = PackageCRMViewSet.as_view({"get": "list"})
+            factory = APIRequestFactory()
+
+            results = []
+            for label, query in self.VARIANTS:
+                url = f"/api/crm/lab-packages/?page_size={page_size}{query}"
+
+                def run():
+                    request = factory.get(url)
+                    force_authenticate(request, user=user)
+                    response = view(request)
+                    response.render()
+                    return response
+
+                size = len(run().content)
+                best = min(self._timed(run) for _ in range(options["repeat"]))
+                results.append((label, size, best))
+
+            transaction.set_rollback(True)
+
+        full_size = results[0][1]
+        self.stdout.write(f"{page_size} packages x {options['tests_per_package']} tests")
+        for label, size, best in results:
+            self.stdout.write(
+                f"{label:<38}: {size / 1024:8.1f} KiB ({size / full_size:5.1%})  {best * 1000:7.1f} ms"
+            )
+
+    @staticmethod
+    def _seed(packages, tests_per_package):
+        category = LabCategory.objects.create(name="bench-sparse", entity_type="package")
+        tests = LabTest.objects.bulk_create(
+            LabTest(
+                name=f"bench-sparse-test-{n}", test_code=f"BST{n:04d}", price=Decimal("250"),
+                sample_type="Blood", method="ELISA", reported_on="Same day",
+                special_instruction="Fasting 8-10 hours", category=category,
+            )
+            for n in range(tests_per_package)
+        )
+        through = Package.tests.through
+        for n in range(packages):
+            package = Package.objects.create(
+                name=f"bench-sparse-package-{n}", category=category, price=Decimal("1999"),
+                description="Comprehensive package covering the routine panels. " * 4,
+                test_count=len(tests),  # the bulk through-row insert below sends no m2m_changed
+            )
+            through.objects.bulk_create(through(package=package, labtest=test) for test in tests)
+        return User.objects.create_user(email="bench-sparse@example.com", mobile="9999999900")
+
+    @staticmethod
+    def _timed(run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0010_alter_labtest_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labtest',
+            name='test_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='test_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='test_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _tests_total(model, owner_field):
+    total = (
+        model.tests.through.objects
+        .filter(**{owner_field: OuterRef("pk")})
+        .values(owner_field)
+        .annotate(total=Sum("labtest__test_count"))
+        .values("total")[:1]
+    )
+    return Coalesce(Subquery(total), Value(0))
+
+
+def backfill_test_counts(apps, schema_editor):
+    """Same as `manage.py backfill_test_counts`, on the historical models."""
+    LabTest = apps.get_model("lab", "LabTest")
+    Profile = apps.get_model("lab", "Profile")
+    Package = apps.get_model("lab", "Package")
+
+    changed = []
+    for test in LabTest.objects.only("id", "child_tests", "test_count").iterator(chunk_size=500):
+        count = len(test.child_tests) if test.child_tests else 1
+        if test.test_count != count:
+            test.test_count = count
+            changed.append(test)
+    LabTest.objects.bulk_update(changed, ["test_count"], batch_size=500)
+
+    Profile.objects.update(test_count=_tests_total(Profile, "profile"))
+    Package.objects.update(test_count=_tests_total(Package, "package"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0011_labtest_test_count_package_test_count_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_test_counts, migrations.RunPython.noop),
+    ]
@@ -50,6 +50,9 @@ class LabTest(models.Model):
 
     is_featured = models.BooleanField(default=False)
 
+    # Denormalized leaf count: len(child_tests) or 1 (kept in sync by lab.signals)
+    test_count = models.PositiveIntegerField(default=1)
+
     def __str__(self):
         return f"{self.test_code} - {self.name}" if self.test_code else self.name
 
@@ -69,6 +72,9 @@ class Profile(models.Model):
 
     is_featured = models.BooleanField(default=False)
 
+    # Denormalized sum of tests' leaf counts (kept in sync by lab.signals)
+    test_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.name
 
@@ -88,5 +94,8 @@ class Package(models.Model):
 
     is_featured = models.BooleanField(default=False)
 
+    # Denormalized sum of tests' leaf counts (kept in sync by lab.signals)
+    test_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from drpathcare.fast_rows import RowMapper
 from .models import LabCategory, LabTest, Profile, Package
 
 
@@ -11,17 +12,11 @@ class LabCategorySerializer(serializers.ModelSerializer):
 class LabTestSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
     image_url = serializers.CharField(source="image.url", read_only=True)
-    test_count = serializers.SerializerMethodField()
-
-    def get_test_count(self,obj):
-        if obj.child_tests:
-            return len(obj.child_tests)
-        return 1
-
 
     class Meta:
         model = LabTest
         fields = '__all__'
+        read_only_fields = ["test_count"]  # maintained by lab.signals
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -35,7 +30,8 @@ class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = ["id", "name", "description", "category", "category_name","offer_price",
-                  "price", "image", "image_url", "tests", "test_ids"]
+                  "price", "image", "image_url", "tests", "test_ids", "test_count"]
+        read_only_fields = ["test_count"]
 
 
 class PackageSerializer(serializers.ModelSerializer):
@@ -51,32 +47,87 @@ class PackageSerializer(serializers.ModelSerializer):
         queryset=LabTest.objects.all(), many=True, write_only=True, source="tests"
     )
 
-    package_total_test = serializers.SerializerMethodField()
+    # Precomputed by lab.signals (sum of leaf tests)
+    package_total_test = serializers.IntegerField(source="test_count", read_only=True)
 
-    def get_package_total_test(self, obj):
-        """
-        Returns total number of tests inside a package.
-        - If a test has child_tests → count child tests
-        - Else → count the test as 1
-        """
-        total = 0
+    class Meta:
+        model = Package
+        fields = ["id", "name", "description", "category", "category_name",
+                  "price", "image", "image_url", "tests",
+                   "test_ids","offer_price","package_total_test","is_featured"]
 
-        tests = getattr(obj, "tests", None)
-        if not tests:
-            return 0
+# -------------------------
+# Slim catalog serializers (nested inside client booking payloads)
+# -------------------------
+class LabTestMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LabTest
+        fields = ["id", "name", "test_code", "sample_type", "test_count"]
 
-        for test in tests.all():
-            child_tests = test.child_tests or []
-            if child_tests:
-                total += len(child_tests)
-            else:
-                total += 1
 
-        return total
+class ProfileMiniSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    image_url = serializers.CharField(source="image.url", read_only=True)
+    tests = LabTestMiniSerializer(many=True, read_only=True)
 
+    class Meta:
+        model = Profile
+        fields = ["id", "name", "description", "category", "category_name", "price", "offer_price",
+                  "image", "image_url", "tests", "test_count"]
+
+
+class PackageMiniSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    image_url = serializers.CharField(source="image.url", read_only=True)
+    tests = LabTestMiniSerializer(many=True, read_only=True)
+    package_total_test = serializers.IntegerField(source="test_count", read_only=True)
 
     class Meta:
         model = Package
-        fields = ["id", "name", "description", "category", "category_name",
-                  "price", "image", "image_url", "tests",
-                   "test_ids","offer_price","package_total_test","is_featured"]
\ No newline at end of file
+        fields = ["id", "name", "description", "category", "category_name", "price", "offer_price",
+                  "image", "image_url", "tests", "package_total_test"]
+
+
+# -------------------------
+# Fast-path row mappers (?fast=1 on catalog lists)
+# -------------------------
+class LabTestRowMapper(RowMapper):
+    serializer_class = LabTestSerializer
+
+
+class _TestsRowMapper(RowMapper):
+    """Profile / Package rows with their nested tests rendered in one batch."""
+    owner_field = None
+    computed = {"tests": "get_tests"}
+
+    def prefetch(self, rows):
+        through = self.serializer_class.Meta.model.tests.through
+        links = list(
+            through.objects
+            .filter(**{f"{self.owner_field}_id__in": [row["id"] for row in rows]})
+            .order_by("id")
+            .values_list(f"{self.owner_field}_id", "labtest_id")
+        )
+        test_mapper = LabTestRowMapper()
+        tests = test_mapper.render(
+            test_mapper.values_queryset(LabTest.objects.filter(id__in={t for _, t in links}))
+        )
+        by_id = {test["id"]: test for test in tests}
+
+        tests_by_owner = {}
+        for owner_id, test_id in links:
+            tests_by_owner.setdefault(owner_id, []).append(by_id[test_id])
+        return {"tests": tests_by_owner}
+
+    def get_tests(self, row, ctx):
+        return ctx["tests"].get(row["id"], [])
+
+
+class ProfileRowMapper(_TestsRowMapper):
+    serializer_class = ProfileSerializer
+    owner_field = "profile"
+
+
+class PackageRowMapper(_TestsRowMapper):
+    serializer_class = PackageSerializer
+    owner_field = "package"
@@ -0,0 +1,97 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from lab.models import LabTest, Profile, Package
+from lab.utils import (
+    leaf_test_count,
+    owner_ids_for_tests,
+    refresh_profile_test_counts,
+    refresh_package_test_counts,
+    refresh_counts_for_tests,
+    tests_total,
+)
+
+
+# ============================================================
+# 🔹 LabTest leaf count
+# ============================================================
+@receiver(pre_save, sender=LabTest, dispatch_uid="labtest_set_test_count")
+def set_labtest_test_count(sender, instance: LabTest, update_fields=None, **kwargs):
+    if update_fields is not None and not {"test_count", "child_tests"} & update_fields:
+        # Neither written by this save → nothing to recompute or propagate
+        instance._test_count_changed = False
+        return
+    count = leaf_test_count(instance.child_tests)
+    instance._test_count_changed = instance.test_count != count
+    instance.test_count = count
+    # save(update_fields=["child_tests"]) won't write test_count, post_save does
+    instance._test_count_unsaved = update_fields is not None and "test_count" not in update_fields
+
+
+@receiver(post_save, sender=LabTest, dispatch_uid="labtest_propagate_test_count")
+def propagate_labtest_test_count(sender, instance: LabTest, created, **kwargs):
+    if getattr(instance, "_test_count_unsaved", False) and instance._test_count_changed:
+        LabTest.objects.filter(pk=instance.pk).update(test_count=instance.test_count)
+    # A brand-new test is not part of any profile/package yet
+    if created or not getattr(instance, "_test_count_changed", False):
+        return
+    refresh_counts_for_tests([instance.pk])
+
+
+@receiver(pre_delete, sender=LabTest, dispatch_uid="labtest_collect_test_count_owners")
+def collect_labtest_owners(sender, instance: LabTest, **kwargs):
+    # The cascade removes the M2M rows without m2m_changed, remember the owners first
+    instance._test_count_owners = owner_ids_for_tests([instance.pk])
+
+
+@receiver(post_delete, sender=LabTest, dispatch_uid="labtest_refresh_owner_test_counts")
+def refresh_labtest_owners(sender, instance: LabTest, **kwargs):
+    profile_ids, package_ids = getattr(instance, "_test_count_owners", ([], []))
+    refresh_profile_test_counts(profile_ids)
+    refresh_package_test_counts(package_ids)
+
+
+# ============================================================
+# 🔹 Profile / Package tests M2M
+# ============================================================
+@receiver(pre_save, sender=Profile, dispatch_uid="profile_keep_test_count")
+@receiver(pre_save, sender=Package, dispatch_uid="package_keep_test_count")
+def keep_owner_test_count(sender, instance, update_fields=None, **kwargs):
+    # The M2M handlers update the row, not other in-memory copies; never write a stale count back
+    if instance.pk is None or (update_fields is not None and "test_count" not in update_fields):
+        return
+    instance.test_count = tests_total(instance)
+
+
+def _sync_on_tests_changed(instance, action, reverse, pk_set, related_name, refresh):
+    """
+    Forward (profile.tests.add(...)) → instance is the owner.
+    Reverse (test.profiles.add(...)) → pk_set holds owner ids.
+    """
+    if reverse and action == "pre_clear":
+        # pk_set is None on clear, remember owners before the rows disappear
+        setattr(instance, f"_cleared_{related_name}_ids", list(
+            getattr(instance, related_name).values_list("id", flat=True)
+        ))
+        return
+
+    if action in ("post_add", "post_remove"):
+        refresh(list(pk_set) if reverse else [instance.pk])
+    elif action == "post_clear":
+        refresh(getattr(instance, f"_cleared_{related_name}_ids", []) if reverse else [instance.pk])
+    else:
+        return
+
+    if not reverse:
+        # Serializers / admin render this instance right after tests.set()
+        instance.refresh_from_db(fields=["test_count"])
+
+
+@receiver(m2m_changed, sender=Profile.tests.through, dispatch_uid="profile_tests_test_count")
+def profile_tests_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    _sync_on_tests_changed(instance, action, reverse, pk_set, "profiles", refresh_profile_test_counts)
+
+
+@receiver(m2m_changed, sender=Package.tests.through, dispatch_uid="package_tests_test_count")
+def package_tests_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    _sync_on_tests_changed(instance, action, reverse, pk_set, "packages", refresh_package_test_counts)
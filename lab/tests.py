@@ -1,3 +1,119 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lab.models import LabCategory, LabTest, Package, Profile
+from users.models import User
+
+
+class TestCountSyncTests(TestCase):
+    """Profile/Package.test_count follows every way their tests can change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = LabCategory.objects.create(name="General", entity_type="lab_test")
+        cls.single = LabTest.objects.create(name="Glucose", category=category, price=Decimal("100"))
+        cls.panel = LabTest.objects.create(
+            name="Lipid Panel", category=category, price=Decimal("500"), child_tests=["HDL", "LDL", "TG"]
+        )
+        cls.extra = LabTest.objects.create(name="HbA1c", category=category, price=Decimal("400"))
+
+    def setUp(self):
+        self.profile = Profile.objects.create(name="Basic", price=Decimal("900"))
+        self.package = Package.objects.create(name="Full", price=Decimal("1500"))
+
+    def assertCounts(self, profile, package):
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).test_count, profile)
+        self.assertEqual(Package.objects.get(pk=self.package.pk).test_count, package)
+
+    def test_forward_actions(self):
+        self.profile.tests.add(self.single, self.panel)
+        self.assertEqual(self.profile.test_count, 4)  # in-memory copy is refreshed too
+        self.profile.tests.remove(self.panel)
+        self.assertCounts(1, 0)
+        self.profile.tests.set([self.panel, self.extra])
+        self.assertCounts(4, 0)
+        self.profile.tests.clear()
+        self.assertCounts(0, 0)
+        self.assertEqual(self.profile.test_count, 0)
+
+    def test_reverse_actions(self):
+        self.panel.profiles.add(self.profile)
+        self.panel.packages.add(self.package)
+        self.assertCounts(3, 3)
+        self.single.packages.set([self.package])
+        self.assertCounts(3, 4)
+        self.panel.packages.remove(self.package)
+        self.assertCounts(3, 1)
+        self.panel.profiles.clear()
+        self.assertCounts(0, 1)
+
+    def test_stale_owner_save_keeps_the_count(self):
+        stale = Profile.objects.get(pk=self.profile.pk)
+        self.profile.tests.add(self.panel)
+
+        stale.price = Decimal("850")
+        stale.save()
+        self.assertCounts(3, 0)
+
+    def test_partial_labtest_save_propagates(self):
+        self.package.tests.add(self.panel, self.single)
+        self.assertCounts(0, 4)
+
+        self.panel.child_tests = ["HDL", "LDL"]
+        self.panel.save(update_fields=["child_tests"])
+        self.assertEqual(LabTest.objects.get(pk=self.panel.pk).test_count, 2)
+        self.assertCounts(0, 3)
+
+    def test_labtest_delete_updates_owners(self):
+        self.profile.tests.add(self.panel, self.single)
+        self.package.tests.add(self.panel)
+        LabTest.objects.get(pk=self.panel.pk).delete()
+        self.assertCounts(1, 0)
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= / ?expand= on a catalog list: smaller payload, page-constant queries."""
+
+    URL = "/api/crm/lab-packages/?page_size=100&ordering=id"
+
+    @classmethod
+    def setUpTestData(cls):
+        category = LabCategory.objects.create(name="General", entity_type="package")
+        cls.tests = [
+            LabTest.objects.create(
+                name=f"Test {n}", test_code=f"T{n:03d}", price=Decimal("250"), category=category,
+                sample_type="Blood", method="ELISA", special_instruction="Fasting 8-10 hours",
+            )
+            for n in range(10)
+        ]
+        for n in range(20):
+            Package.objects.create(name=f"Package {n}", price=Decimal("1999"), category=category).tests.set(cls.tests)
+        cls.user = User.objects.create_user(email="crm@example.com", mobile="9000000601")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_collapsed_tests_render_as_ids(self):
+        response = self.client.get(self.URL + "&fields=id,name,tests")
+        self.assertEqual(response.status_code, 200)
+        row = response.json()["results"][0]
+        self.assertEqual(set(row), {"id", "name", "tests"})
+        self.assertEqual(sorted(row["tests"]), sorted(test.pk for test in self.tests))
+
+    def test_collapsed_tests_are_prefetched(self):
+        # COUNT, the page, one prefetch for every package's tests (force_authenticate → no auth query)
+        with self.assertNumQueries(3):
+            self.client.get(self.URL + "&fields=id,name,tests")
+
+    def test_payload_size(self):
+        full = len(self.client.get(self.URL).content)
+        sparse = len(self.client.get(self.URL + "&fields=id,name,price,test_count").content)
+        collapsed = len(self.client.get(self.URL + "&fields=id,name,tests").content)
+        expanded = self.client.get(self.URL + "&fields=id,name,tests&expand=tests").json()["results"][0]
 
-# Create your tests here.
+        self.assertLess(sparse * 20, full)
+        self.assertLess(collapsed * 5, full)
+        self.assertEqual(expanded["tests"][0]["test_code"], "T000")
@@ -0,0 +1,123 @@
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from lab.models import LabTest, Profile, Package
+
+
+def leaf_test_count(child_tests) -> int:
+    """
+    Number of leaf tests a LabTest stands for.
+    - If a test has child_tests → count child tests
+    - Else → count the test as 1
+    """
+    return len(child_tests) if child_tests else 1
+
+
+def _tests_total_subquery(model, owner_field):
+    """
+    Correlated SUM(labtest.test_count) over the model's `tests` M2M table.
+    """
+    through = model.tests.through
+    total = (
+        through.objects
+        .filter(**{owner_field: OuterRef("pk")})
+        .values(owner_field)
+        .annotate(total=Sum("labtest__test_count"))
+        .values("total")[:1]
+    )
+    return Coalesce(Subquery(total), Value(0))
+
+
+def refresh_profile_test_counts(profile_ids=None) -> int:
+    """
+    Recompute Profile.test_count in a single UPDATE.
+    profile_ids=None → all profiles.
+    """
+    qs = Profile.objects.all()
+    if profile_ids is not None:
+        if not profile_ids:
+            return 0
+        qs = qs.filter(pk__in=profile_ids)
+    return qs.update(test_count=_tests_total_subquery(Profile, "profile"))
+
+
+def refresh_package_test_counts(package_ids=None) -> int:
+    """
+    Recompute Package.test_count in a single UPDATE.
+    package_ids=None → all packages.
+    """
+    qs = Package.objects.all()
+    if package_ids is not None:
+        if not package_ids:
+            return 0
+        qs = qs.filter(pk__in=package_ids)
+    return qs.update(test_count=_tests_total_subquery(Package, "package"))
+
+
+def tests_total(instance) -> int:
+    """
+    Current SUM(labtest.test_count) over a saved Profile/Package's tests.
+    """
+    model = type(instance)
+    owner_field = model._meta.model_name
+    return (
+        model.objects.filter(pk=instance.pk)
+        .annotate(total=_tests_total_subquery(model, owner_field))
+        .values_list("total", flat=True)
+        .first()
+    ) or 0
+
+
+def owner_ids_for_tests(test_ids):
+    """
+    (profile_ids, package_ids) containing any of the given tests.
+    """
+    if not test_ids:
+        return [], []
+    profile_ids = list(
+        Profile.tests.through.objects
+        .filter(labtest_id__in=test_ids)
+        .values_list("profile_id", flat=True)
+        .distinct()
+    )
+    package_ids = list(
+        Package.tests.through.objects
+        .filter(labtest_id__in=test_ids)
+        .values_list("package_id", flat=True)
+        .distinct()
+    )
+    return profile_ids, package_ids
+
+
+def refresh_counts_for_tests(test_ids) -> None:
+    """
+    Recompute counters of every profile/package containing any of the given tests.
+    """
+    profile_ids, package_ids = owner_ids_for_tests(test_ids)
+    refresh_profile_test_counts(profile_ids)
+    refresh_package_test_counts(package_ids)
+
+
+def backfill_labtest_test_counts(batch_size=500) -> int:
+    """
+    Recompute LabTest.test_count from child_tests for rows that drifted.
+    Returns the number of updated tests.
+    """
+    changed = []
+    updated = 0
+    for test in LabTest.objects.only("id", "child_tests", "test_count").iterator(chunk_size=batch_size):
+        count = leaf_test_count(test.child_tests)
+        if test.test_count != count:
+            test.test_count = count
+            changed.append(test)
+
+        if len(changed) >= batch_size:
+            LabTest.objects.bulk_update(changed, ["test_count"])
+            updated += len(changed)
+            changed = []
+
+    if changed:
+        LabTest.objects.bulk_update(changed, ["test_count"])
+        updated += len(changed)
+
+    return updated
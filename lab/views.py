@@ -2,8 +2,13 @@
 from rest_framework import viewsets, mixins,status
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from .models import LabTest, Profile, Package,LabCategory
-from .serializers import LabTestSerializer, ProfileSerializer, PackageSerializer, LabCategorySerializer
+from .serializers import (
+    LabTestSerializer, ProfileSerializer, PackageSerializer, LabCategorySerializer,
+    LabTestRowMapper, ProfileRowMapper, PackageRowMapper,
+)
 from drpathcare.pagination import StandardResultsSetPagination
+from drpathcare.sparse_fields import SparseFieldsMixin
+from drpathcare.fast_rows import FastRowsListMixin
 import pandas as pd
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -14,26 +19,34 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from openpyxl import load_workbook
 from decimal import Decimal
+from bookings.utils.cart import defer_cart_repricing
 
 
 
 
-class BaseLabViewSet(viewsets.GenericViewSet):
-    """Common filtering logic shared by CRM & Client"""
+class BaseLabViewSet(SparseFieldsMixin, FastRowsListMixin, viewsets.GenericViewSet):
+    """Common filtering logic shared by CRM & Client (supports ?fields= / ?expand= / ?fast=1)"""
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["name"]
-    ordering_fields = ["id","name", "category__name", "price","offer_price", "created_at"]
+    ordering_fields = ["id","name", "category__name", "price","offer_price", "created_at", "test_count"]
 
     def get_queryset(self):
         qs = super().get_queryset()
         category = self.request.query_params.get("category")
         is_featured = self.request.query_params.get("is_featured")
+        min_tests = self.request.query_params.get("min_tests")
+        max_tests = self.request.query_params.get("max_tests")
         if is_featured:
             qs = qs.filter(is_featured=True)
         if category:
             qs = qs.filter(category_id=category)
+        # e.g. ?min_tests=50 → packages with 50+ tests (reads denormalized column)
+        if min_tests and min_tests.isdigit():
+            qs = qs.filter(test_count__gte=int(min_tests))
+        if max_tests and max_tests.isdigit():
+            qs = qs.filter(test_count__lte=int(max_tests))
         return qs
 
 
@@ -42,6 +55,7 @@ class BaseLabViewSet(viewsets.GenericViewSet):
 class LabTestCRMViewSet(BaseLabViewSet, viewsets.ModelViewSet):
     queryset = LabTest.objects.all()
     serializer_class = LabTestSerializer
+    fast_row_mapper_class = LabTestRowMapper
 
     @action(detail=False, methods=["post"], url_path="bulk-upload")
     def bulk_upload(self, request):
@@ -94,11 +108,15 @@ class LabTestCRMViewSet(BaseLabViewSet, viewsets.ModelViewSet):
 class ProfileCRMViewSet(BaseLabViewSet, viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
+    fast_row_mapper_class = ProfileRowMapper
+    expandable_fields = ["tests"]
 
 
 class PackageCRMViewSet(BaseLabViewSet, viewsets.ModelViewSet):
     queryset = Package.objects.all()
     serializer_class = PackageSerializer
+    fast_row_mapper_class = PackageRowMapper
+    expandable_fields = ["tests"]
 
 class LabCategoryCRMViewSet(BaseLabViewSet, viewsets.ModelViewSet):
     queryset = LabCategory.objects.all()
@@ -115,6 +133,7 @@ class LabCategoryClientViewSet(BaseLabViewSet, mixins.ListModelMixin, mixins.Ret
 class LabTestClientViewSet(BaseLabViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
     queryset = LabTest.objects.all()
     serializer_class = LabTestSerializer
+    fast_row_mapper_class = LabTestRowMapper
     permission_classes = [AllowAny]
     search_fields = ["name"]
 
@@ -122,13 +141,17 @@ class LabTestClientViewSet(BaseLabViewSet, mixins.ListModelMixin, mixins.Retriev
 class ProfileClientViewSet(BaseLabViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
+    fast_row_mapper_class = ProfileRowMapper
     permission_classes = [AllowAny]
+    expandable_fields = ["tests"]
 
 
 class PackageClientViewSet(BaseLabViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
     queryset = Package.objects.all()
     serializer_class = PackageSerializer
+    fast_row_mapper_class = PackageRowMapper
     permission_classes = [AllowAny]
+    expandable_fields = ["tests"]
     search_fields = ["name"]
 
 
@@ -266,11 +289,27 @@ class LabTestBulkUploadAPIView(APIView):
         # Mapping column → index
         col_map = {col: header.index(col) for col in header}
 
+        errors = []
+
+        # --- Process rows (cart prices refreshed once, after the loop) ---
+        with defer_cart_repricing():
+            created_count, updated_count = self._import_rows(ws, col_map, errors)
+
+        # --- Final response ---
+        return Response(
+            {
+                "status": "Bulk upload completed",
+                "created": created_count,
+                "updated": updated_count,
+                "errors": errors,
+            },
+            status=200,
+        )
+
+    def _import_rows(self, ws, col_map, errors):
         created_count = 0
         updated_count = 0
-        errors = []
 
-        # --- Process rows ---
         for idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
 
             def get(col):
@@ -358,13 +397,4 @@ class LabTestBulkUploadAPIView(APIView):
             else:
                 updated_count += 1
 
-        # --- Final response ---
-        return Response(
-            {
-                "status": "Bulk upload completed",
-                "created": created_count,
-                "updated": updated_count,
-                "errors": errors,
-            },
-            status=200,
-        )
\ No newline at end of file
+        return created_count, updated_count
\ No newline at end of file
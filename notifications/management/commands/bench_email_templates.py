@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from notifications.utils.email_templates import get_email_template
+
+
+class Command(BaseCommand):
+    help = "Rendering time per 1,000 emails (html + text) for an email template, compiled vs render_to_string."
+
+    def add_arguments(self, parser):
+        parser.add_argument("template", nargs="?", default="emails/booking_created.html")
+        parser.add_argument("--count", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        name, count = options["template"], options["count"]
+        contexts = [
+            {"user_name": f"Customer {i}", "booking_id": f"dp{i:08d}", "remarks": "Fasting required"}
+            for i in range(count)
+        ]
+
+        start = time.perf_counter()
+        for context in contexts:
+            strip_tags(render_to_string(name, context))
+        baseline = time.perf_counter() - start
+
+        template = get_email_template(name)
+        start = time.perf_counter()
+        template.render_many(contexts)
+        compiled = time.perf_counter() - start
+
+        per_1000 = 1000 / count
+        self.stdout.write(f"render_to_string + strip_tags : {baseline * per_1000 * 1000:.1f} ms / 1,000 emails")
+        self.stdout.write(f"compiled                      : {compiled * per_1000 * 1000:.1f} ms / 1,000 emails")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up x{baseline / compiled:.2f}"))
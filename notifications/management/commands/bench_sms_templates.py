@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.utils.sms_templates import get_sms_template
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark: messages/second rendered from an SMS template (compiled vs str.format)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("template", help="SMSTemplate name, e.g. OTP")
+        parser.add_argument("--count", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        template = get_sms_template(options["template"])
+        if template is None:
+            raise CommandError(f"No active SMSTemplate named {options['template']!r}")
+
+        count = options["count"]
+        contexts = [{name: f"{name}{i}" for name in template.placeholders} for i in range(count)]
+
+        start = time.perf_counter()
+        for context in contexts:
+            template.message.format(**context)
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        messages, errors = template.render_many(contexts)
+        compiled = time.perf_counter() - start
+
+        self.stdout.write(f"str.format : {count / baseline:,.0f} msg/s")
+        self.stdout.write(f"compiled   : {count / compiled:,.0f} msg/s ({len(errors)} errors)")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up x{baseline / compiled:.2f}"))
@@ -71,3 +71,15 @@ class EnquiryToUserSerializer(serializers.Serializer):
     def update(self, instance, validated_data):
         # Not used for convert()
         pass
+
+
+class BroadcastEmailSerializer(serializers.Serializer):
+    subject = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    role = serializers.PrimaryKeyRelatedField(queryset=Role.objects.all(), required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("user_ids") and not attrs.get("role"):
+            raise serializers.ValidationError("user_ids or role is required.")
+        return attrs
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Enquiry
+from .models import Enquiry, SMSTemplate
+from notifications.utils.sms_templates import bump_sms_template_version
 from notifications.utils.push_service import send_expo_push_notification # Ensure this matches your util filename
 
 User = get_user_model()
@@ -35,4 +37,10 @@ def notify_staff_on_new_enquiry(sender, instance, created, **kwargs):
             title=title,
             body=message,
             extra_data=extra_data
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_save, sender=SMSTemplate, dispatch_uid="sms_template_bump_version_on_save")
+@receiver(post_delete, sender=SMSTemplate, dispatch_uid="sms_template_bump_version_on_delete")
+def sms_template_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_sms_template_version)
@@ -1,3 +1,93 @@
+from unittest import mock
+
+from django.core import mail
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from notifications.models import Notification, SMSTemplate
+from notifications.utils.email_utils import broadcast_email, send_templated_emails
+from notifications.utils.sms_templates import get_sms_template
+from users.models import Role, User
+
+
+class SMSTemplateRegistryTests(TestCase):
+    """Template edits reach get_sms_template() through the version bump, not the TTL."""
+
+    def create_template(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            return SMSTemplate.objects.create(name="login_otp", message=message, peid="1", template_id="1")
+
+    def test_edit_is_picked_up_after_commit(self):
+        template = self.create_template("Your OTP is {otp}")
+        self.assertEqual(get_sms_template("login_otp").render({"otp": "1234"}), "Your OTP is 1234")
+
+        template.message = "OTP {otp} for DrPathCare"
+        with self.captureOnCommitCallbacks(execute=True):
+            template.save()
+        self.assertEqual(get_sms_template("login_otp").render({"otp": "1234"}), "OTP 1234 for DrPathCare")
+
+    def test_deactivated_template_disappears(self):
+        template = self.create_template("Your OTP is {otp}")
+        self.assertIsNotNone(get_sms_template("login_otp"))
+
+        template.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            template.save()
+        self.assertIsNone(get_sms_template("login_otp"))
+
+
+class BroadcastEmailTests(TestCase):
+    """Broadcasts go through the batch path: one SMTP session and one Notification insert per batch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_role = Role.objects.create(name="Admin", view_all=True)
+        cls.agent_role = Role.objects.create(name="Agent")
+        cls.admin = User.objects.create_user(email="admin@example.com", mobile="9000000401", role=cls.admin_role)
+        cls.agents = [
+            User.objects.create_user(
+                email=f"agent{n}@example.com", mobile=f"90000005{n:02d}", first_name=f"Agent{n}", role=cls.agent_role
+            )
+            for n in range(5)
+        ]
+        User.objects.create_user(email="gone@example.com", mobile="9000000499", role=cls.agent_role, is_active=False)
+
+    def test_mismatched_lists_are_rejected(self):
+        with self.assertRaises(ValueError):
+            send_templated_emails(self.agents, "Hello", "emails/base.html", [{}])
+
+    @mock.patch("notifications.utils.email_utils.BROADCAST_BATCH_SIZE", 2)
+    def test_broadcast_sends_one_email_per_user(self):
+        sent = broadcast_email([user.pk for user in self.agents], "Holiday hours", "Closed on <Friday>.")
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.agents))
+        html = mail.outbox[0].alternatives[0][0]
+        self.assertIn("Hi Agent0,", html)
+        self.assertIn("Closed on &lt;Friday&gt;.", html)
+        self.assertEqual(Notification.objects.filter(notification_type="email", status="sent").count(), 5)
+
+    def test_endpoint_queues_broadcast_for_a_role(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with mock.patch("notifications.views.dispatch", side_effect=lambda fn, *args: fn(*args)):
+            response = client.post(
+                "/api/crm/notifications/broadcast-email/",
+                {"subject": "Training", "message": "Monday 10am", "role": self.agent_role.pk},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["count"], 5)  # the inactive agent is skipped
+        self.assertEqual(len(mail.outbox), 5)
 
-# Create your tests here.
+    def test_endpoint_requires_view_all(self):
+        client = APIClient()
+        client.force_authenticate(self.agents[0])
+        response = client.post(
+            "/api/crm/notifications/broadcast-email/",
+            {"subject": "Hi", "message": "x", "user_ids": [self.admin.pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(mail.outbox), 0)
@@ -0,0 +1,39 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+# lane → worker threads. "otp" is the fast lane: it never queues behind
+# bulk booking/marketing notifications waiting on slow gateways.
+NOTIFICATION_LANES = {
+    "otp": 2,
+    "default": 4,
+    **getattr(settings, "NOTIFICATION_LANES", {}),
+}
+
+_lanes = {
+    name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"notify-{name}")
+    for name, workers in NOTIFICATION_LANES.items()
+}
+
+
+def _run(fn, args, kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("Background notification %s failed", getattr(fn, "__name__", fn))
+    finally:
+        close_old_connections()
+
+
+def dispatch(fn, *args, lane="default", **kwargs):
+    """Runs fn(*args, **kwargs) on a background worker of `lane`. Returns the Future."""
+    return _lanes[lane].submit(_run, fn, args, kwargs)
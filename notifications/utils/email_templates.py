@@ -0,0 +1,41 @@
+from functools import lru_cache
+
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+
+class CompiledEmailTemplate:
+    """
+    An email template parsed once per process, plus a text alternative
+    compiled from the tag-stripped source. Rendering the text part is then
+    a template render instead of strip_tags() over every rendered message.
+    Templates that extend/include others keep the strip_tags() fallback.
+    """
+
+    def __init__(self, template_name):
+        self.name = template_name
+        self.html = get_template(template_name)
+        self.text = None
+
+        source = getattr(getattr(self.html, "template", None), "source", "")
+        if source and "{% extends" not in source and "{% include" not in source:
+            try:
+                self.text = self.html.backend.from_string(strip_tags(source))
+            except TemplateSyntaxError:
+                self.text = None
+
+    def render(self, context):
+        """(html, text) for one context."""
+        html = self.html.render(context)
+        text = self.text.render(context) if self.text is not None else strip_tags(html)
+        return html, text
+
+    def render_many(self, contexts):
+        """[(html, text), ...] for a batch of contexts (broadcast sends)."""
+        return [self.render(context) for context in contexts]
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template_name):
+    return CompiledEmailTemplate(template_name)
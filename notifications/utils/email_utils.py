@@ -1,14 +1,45 @@
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.contrib.contenttypes.models import ContentType
-from django.utils.html import strip_tags
 from django.conf import settings
 from notifications.models import Notification
+from notifications.utils.email_templates import get_email_template
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.html import escape, linebreaks
 
 User = get_user_model()
 
 
+# -------------------------
+# CONFIG
+# -------------------------
+# Recipients rendered + sent per batch; bounds memory and the SMTP session length
+BROADCAST_BATCH_SIZE = getattr(settings, "BROADCAST_EMAIL_BATCH_SIZE", 500)
+
+
+def deliver_emails(messages) -> list:
+    """
+    Sends `messages` over one (pooled) SMTP connection.
+    Returns [(status, error_message), ...] in the same order.
+    """
+    results = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        return [("failed", str(e))] * len(messages)
+    try:
+        for message in messages:
+            try:
+                connection.send_messages([message])
+                results.append(("sent", None))
+            except Exception as e:
+                results.append(("failed", str(e)))
+    finally:
+        connection.close()
+    return results
+
+
 def send_templated_email(
     recipient,
     subject: str,
@@ -38,9 +69,8 @@ def send_templated_email(
         email = recipient
         user = None
 
-    # 📧 Render HTML + text fallback
-    html_content = render_to_string(template_name, context)
-    text_content = strip_tags(html_content)
+    # 📧 Render HTML + text fallback (template compiled once per process)
+    html_content, text_content = get_email_template(template_name).render(context)
 
     # ✉️ Create email message
     email_msg = EmailMultiAlternatives(
@@ -51,14 +81,8 @@ def send_templated_email(
     )
     email_msg.attach_alternative(html_content, "text/html")
 
-    # 📤 Send email
-    try:
-        email_msg.send(fail_silently=False)
-        status = "sent"
-        error_message = None
-    except Exception as e:
-        status = "failed"
-        error_message = str(e)
+    # 📤 Send email (pooled connection)
+    [(status, error_message)] = deliver_emails([email_msg])
 
     # 🪵 Log notification
     notification = Notification.objects.create(
@@ -72,3 +96,81 @@ def send_templated_email(
         object_id=related_object.pk if related_object else None,
     )
     return notification
+
+
+def send_templated_emails(
+    recipients: list,
+    subject: str,
+    template_name: str,
+    contexts: list,
+    related_objects: list = None,
+) -> list:
+    """
+    Broadcast version of send_templated_email(): renders every context with
+    the compiled template, sends all messages over one pooled connection and
+    logs the Notifications with a single bulk insert.
+
+    recipients / contexts / related_objects are parallel lists of equal length.
+    """
+    related_objects = related_objects or [None] * len(recipients)
+    if not len(recipients) == len(contexts) == len(related_objects):
+        raise ValueError(
+            f"recipients ({len(recipients)}), contexts ({len(contexts)}) and "
+            f"related_objects ({len(related_objects)}) must have the same length"
+        )
+    template = get_email_template(template_name)
+    from_email = "DrPathCare <" + settings.DEFAULT_FROM_EMAIL + ">"
+
+    messages, texts, users = [], [], []
+    for recipient, (html_content, text_content) in zip(recipients, template.render_many(contexts)):
+        user = recipient if hasattr(recipient, "email") else None
+        email_msg = EmailMultiAlternatives(
+            subject=subject,
+            body=text_content,
+            from_email=from_email,
+            to=[recipient.email if user else recipient],
+        )
+        email_msg.attach_alternative(html_content, "text/html")
+        messages.append(email_msg)
+        texts.append(text_content)
+        users.append(user)
+
+    results = deliver_emails(messages)
+
+    return Notification.objects.bulk_create([
+        Notification(
+            recipient=user,
+            notification_type="email",
+            subject=subject,
+            message=text_content,
+            status=status,
+            error_message=error_message,
+            content_type=ContentType.objects.get_for_model(related) if related else None,
+            object_id=related.pk if related else None,
+        )
+        for user, text_content, (status, error_message), related in zip(users, texts, results, related_objects)
+    ])
+
+
+def broadcast_email(user_ids, subject: str, message: str) -> int:
+    """
+    Sends `message` (plain text, escaped into emails/base.html) to the
+    active users in `user_ids` that have an email address, in batches
+    through send_templated_emails(). Returns the number of emails sent.
+    """
+    body = linebreaks(message, autoescape=True)
+    year = timezone.now().year
+    user_ids = list(user_ids)
+    users = User.objects.filter(is_active=True).exclude(email__isnull=True).exclude(email="").order_by("pk")
+    sent = 0
+    for start in range(0, len(user_ids), BROADCAST_BATCH_SIZE):
+        batch = list(users.filter(pk__in=user_ids[start:start + BROADCAST_BATCH_SIZE]))
+        if not batch:
+            continue
+        contexts = [
+            {"subject": subject, "body": f"<p>Hi {escape(user.first_name or 'there')},</p>{body}", "year": year}
+            for user in batch
+        ]
+        notifications = send_templated_emails(batch, subject, "emails/base.html", contexts)
+        sent += sum(n.status == "sent" for n in notifications)
+    return sent
@@ -0,0 +1,97 @@
+import string
+
+from django.conf import settings
+
+from drpathcare.versioned_registry import VersionedRegistry
+from notifications.models import SMSTemplate
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+SMS_TEMPLATE_VERSION_KEY = "sms_templates:version"
+SMS_TEMPLATE_CACHE_TTL = getattr(settings, "SMS_TEMPLATE_CACHE_TTL", 300)  # seconds
+
+
+# ============================================================
+# 🔹 Compiled template
+# ============================================================
+class CompiledSMSTemplate:
+    """
+    An active SMSTemplate with its message pre-split into literal / field
+    segments, so rendering is a join instead of a str.format() parse.
+    Templates using attribute access, indexing, format specs or conversions
+    fall back to str.format().
+    """
+
+    def __init__(self, template):
+        self.name = template.name
+        self.message = template.message
+        self.sender_name = template.sender_name
+        self.sms_type = template.sms_type
+        self.peid = template.peid
+        self.template_id = template.template_id
+
+        self.parts = []
+        self.placeholders = set()
+        self.fallback = False
+        self.error = None
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(template.message):
+                if field is None:
+                    self.parts.append((literal, None))
+                    continue
+                if not field.isidentifier() or spec or conversion:
+                    self.fallback = True
+                    field = field.split(".")[0].split("[")[0]
+                self.placeholders.add(field)
+                self.parts.append((literal, field))
+        except ValueError as e:
+            # e.g. an unmatched "{" → every send fails with this message
+            self.error = f"Template error: {e}"
+
+    def missing(self, context):
+        return self.placeholders - context.keys()
+
+    def render(self, context):
+        """Same result as message.format(**context); raises KeyError for a missing placeholder."""
+        if self.error:
+            raise ValueError(self.error)
+        if self.fallback:
+            return self.message.format(**context)
+        return "".join(literal + str(context[field]) if field else literal for literal, field in self.parts)
+
+    def render_many(self, contexts):
+        """
+        Renders one message per context. Returns (messages, errors) where
+        messages[i] is None and errors[i] says why when context i can't be rendered.
+        """
+        messages, errors = [], {}
+        for i, context in enumerate(contexts):
+            missing = self.missing(context)
+            if missing or self.error:
+                messages.append(None)
+                errors[i] = self.error or f"Missing placeholder {', '.join(sorted(missing))}"
+                continue
+            messages.append(self.render(context))
+        return messages, errors
+
+
+# ============================================================
+# 🔹 Registry of active templates (version key + TTL)
+# ============================================================
+def _load_templates():
+    return {t.name: CompiledSMSTemplate(t) for t in SMSTemplate.objects.filter(is_active=True)}
+
+
+_registry = VersionedRegistry(SMS_TEMPLATE_VERSION_KEY, SMS_TEMPLATE_CACHE_TTL, _load_templates)
+
+
+def bump_sms_template_version():
+    """Called whenever an SMSTemplate row changes; every process reloads on next access."""
+    _registry.bump()
+
+
+def get_sms_template(name):
+    """Compiled active template called `name`, or None."""
+    return _registry.get().get(name)
@@ -1,7 +1,8 @@
 import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from notifications.models import Notification, SMSTemplate
+from notifications.models import Notification
+from notifications.utils.sms_templates import get_sms_template
 from typing import Tuple, Optional
 
 User = get_user_model()
@@ -16,10 +17,9 @@ def send_otp_sms(mobile: str, otp_code: str) -> Tuple[bool, str, Notification]:
     Send OTP SMS using the 'OTP' SMSTemplate but call the low-level send_sms().
     Returns: (success, response_text, Notification)
     """
-    # 1) Get template
-    try:
-        template = SMSTemplate.objects.get(name="OTP", is_active=True)
-    except SMSTemplate.DoesNotExist:
+    # 1) Get template (in-memory registry, no query)
+    template = get_sms_template("OTP")
+    if template is None:
         # create a failed notification for audit
         notif = Notification.objects.create(
             recipient=None,
@@ -32,7 +32,7 @@ def send_otp_sms(mobile: str, otp_code: str) -> Tuple[bool, str, Notification]:
 
     # 2) Render message
     try:
-        message = template.message.format(otp=otp_code, mobile=mobile)
+        message = template.render({"otp": otp_code, "mobile": mobile})
     except Exception as e:
         notif = Notification.objects.create(
             recipient=None,
@@ -131,9 +131,8 @@ def send_sms_from_template(template_name: str, user: User, context: dict) -> Not
     Returns:
         Notification: Saved notification record (status = sent | failed)
     """
-    try:
-        template = SMSTemplate.objects.get(name=template_name, is_active=True)
-    except SMSTemplate.DoesNotExist:
+    template = get_sms_template(template_name)
+    if template is None:
         return Notification.objects.create(
             recipient=user,
             notification_type="sms",
@@ -144,7 +143,7 @@ def send_sms_from_template(template_name: str, user: User, context: dict) -> Not
 
     # 🧠 Fill message placeholders
     try:
-        message = template.message.format(**context)
+        message = template.render(context)
     except KeyError as e:
         return Notification.objects.create(
             recipient=user,
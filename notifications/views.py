@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import Notification, Enquiry, PushDevice
 from .serializers import (
+    BroadcastEmailSerializer,
     NotificationSerializer,
     EnquirySerializer,
     EnquiryToUserSerializer,
@@ -10,9 +11,12 @@ from drpathcare.pagination import StandardResultsSetPagination
 from rest_framework.decorators import action,api_view,permission_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
 from users.models import User
 from datetime import datetime
 from django.utils.timezone import make_aware
+from notifications.utils.dispatcher import dispatch
+from notifications.utils.email_utils import broadcast_email
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -66,6 +70,33 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    @action(detail=False, methods=["post"], url_path="broadcast-email")
+    def broadcast_email(self, request):
+        """
+        POST /api/crm/notifications/broadcast-email/
+        { "subject", "message", "user_ids": [...] | "role": <role id> }
+        Sends in the background in batches (send_templated_emails); each
+        email is logged as a Notification. View-all CRM roles only.
+        """
+        role = getattr(request.user, "role", None)
+        if not role or not role.view_all:
+            raise PermissionDenied("Only view-all CRM roles can send broadcasts.")
+
+        serializer = BroadcastEmailSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        recipients = User.objects.filter(is_active=True).exclude(email__isnull=True).exclude(email="")
+        if data.get("user_ids"):
+            recipients = recipients.filter(pk__in=data["user_ids"])
+        if data.get("role"):
+            recipients = recipients.filter(role=data["role"])
+        user_ids = list(recipients.values_list("pk", flat=True))
+
+        if user_ids:
+            dispatch(broadcast_email, user_ids, data["subject"], data["message"])
+        return Response({"message": "Broadcast queued.", "count": len(user_ids)}, status=status.HTTP_202_ACCEPTED)
+
 
 class EnquiryViewSet(viewsets.ModelViewSet):
     queryset = Enquiry.objects.all().order_by("-created_at")
@@ -1,9 +1,19 @@
 # payments/admin.py
 from django.contrib import admin
 from .models import BookingPayment
+from .utils import sync_booking_payment_state
 
 @admin.register(BookingPayment)
 class BookingPaymentAdmin(admin.ModelAdmin):
     list_display = ("id", "booking", "amount", "status", "method", "created_at")
     list_filter = ("status", "method", "created_at")
     search_fields = ("transaction_id", "booking__id")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        sync_booking_payment_state([obj.booking_id])
+
+    def delete_model(self, request, obj):
+        booking_id = obj.booking_id
+        super().delete_model(request, obj)
+        sync_booking_payment_state([booking_id])
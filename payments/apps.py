@@ -4,7 +4,5 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
-
-
-    def ready(self):
-        import payments.signals
\ No newline at end of file
+    # No payment signals: callers sync bookings explicitly via
+    # payments.utils.sync_booking_payment_state (set-based, conditional)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class RazorpayGateway:
+    """Payment-link calls against Razorpay (the shared client from payments.utils)."""
+
+    def __init__(self):
+        from payments.utils import client
+        self.client = client
+
+    def create_payment_link(self, data: dict) -> dict:
+        return self.client.payment_link.create(data)
+
+    def fetch_payment_link(self, link_id: str) -> dict:
+        return self.client.payment_link.fetch(link_id)
+
+
+class FakeGateway:
+    """
+    In-memory stand-in for local runs and tests. Links are created as
+    "issued"; set_status() simulates the customer paying / the link expiring.
+    `delay` (seconds) imitates a slow gateway.
+    """
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.links = {}
+        self.counter = 0
+
+    def create_payment_link(self, data: dict) -> dict:
+        time.sleep(self.delay)
+        with self.lock:
+            self.counter += 1
+            link_id = f"plink_fake{self.counter:08d}"
+            link = {
+                **data,
+                "id": link_id,
+                "status": "issued",
+                "short_url": f"https://rzp.example/{link_id}",
+                "payments": None,
+            }
+            self.links[link_id] = link
+        return dict(link)
+
+    def fetch_payment_link(self, link_id: str) -> dict:
+        time.sleep(self.delay)
+        with self.lock:
+            link = self.links.get(link_id) or {"id": link_id, "status": "issued", "payments": None}
+        return dict(link)
+
+    def set_status(self, link_id, status, payment_id=None):
+        with self.lock:
+            link = self.links.setdefault(link_id, {"id": link_id, "payments": None})
+            link["status"] = status
+            if payment_id:
+                link["payments"] = [{"payment_id": payment_id, "status": "captured"}]
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Client from settings.PAYMENT_GATEWAY_CLIENT (dotted path), Razorpay by default."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                path = getattr(settings, "PAYMENT_GATEWAY_CLIENT", "payments.gateway.RazorpayGateway")
+                _gateway = import_string(path)()
+    return _gateway
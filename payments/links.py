@@ -0,0 +1,129 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from payments.gateway import get_gateway
+from payments.models import BookingPayment
+from payments.utils import payment_link_request, sync_booking_payment_state
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+PAYMENT_LINK_WORKERS = getattr(settings, "PAYMENT_LINK_WORKERS", 2)
+# A link claim not completed within this long was lost with its worker
+PAYMENT_LINK_CLAIM_TIMEOUT = getattr(settings, "PAYMENT_LINK_CLAIM_TIMEOUT", 120)  # seconds
+
+_executor = ThreadPoolExecutor(max_workers=PAYMENT_LINK_WORKERS, thread_name_prefix="payment-link")
+
+
+def payment_idempotency_key(booking_id, amount) -> str:
+    """Same booking + same amount → same key."""
+    amount = Decimal(amount).quantize(Decimal("0.01"))
+    return hashlib.sha1(f"{booking_id}:{amount}".encode()).hexdigest()
+
+
+def request_payment_link(booking, amount, email, phone) -> BookingPayment:
+    """
+    Records a pending online BookingPayment inside the caller's transaction
+    and creates the gateway link after commit, so no HTTP round trip runs
+    while the booking row is locked. Repeating the request for the same
+    booking and amount returns the open payment instead of a second link.
+    """
+    if not amount or amount <= 0:
+        raise ValueError("Amount must be a positive decimal")
+
+    key = payment_idempotency_key(booking.pk, amount)
+    payment = BookingPayment.objects.filter(idempotency_key=key, status="initiated").first()
+    if payment is None:
+        try:
+            with transaction.atomic():
+                payment = BookingPayment.objects.create(
+                    booking=booking,
+                    amount=amount,
+                    status="initiated",
+                    method="online",
+                    idempotency_key=key,
+                    remarks="Payment link pending",
+                    metadata={"email": email, "phone": phone},
+                )
+        except IntegrityError:
+            # Concurrent request for the same booking + amount
+            payment = BookingPayment.objects.get(idempotency_key=key, status="initiated")
+        sync_booking_payment_state([booking.pk])
+
+    if not payment.payment_link:
+        transaction.on_commit(lambda: _executor.submit(_run, payment.pk))
+    return payment
+
+
+def _run(payment_id):
+    close_old_connections()
+    try:
+        _fill_payment_link(payment_id)
+    except Exception:
+        logger.exception("Payment link creation failed for payment %s", payment_id)
+    finally:
+        close_old_connections()
+
+
+def _fill_payment_link(payment_id):
+    # Claim the row with one short UPDATE (committed at once): a duplicate
+    # submit running concurrently skips it instead of calling the gateway a
+    # second time. A claim older than PAYMENT_LINK_CLAIM_TIMEOUT belongs to a
+    # worker that died and can be retaken; the per-payment reference_id keeps
+    # the gateway from creating a second link either way.
+    now = timezone.now()
+    claimed = (
+        BookingPayment.objects
+        .filter(pk=payment_id, status="initiated", payment_link__isnull=True)
+        .filter(
+            Q(link_requested_at__isnull=True)
+            | Q(link_requested_at__lt=now - timedelta(seconds=PAYMENT_LINK_CLAIM_TIMEOUT))
+        )
+        .update(link_requested_at=now)
+    )
+    if not claimed:
+        return  # already filled, being filled, or no longer open
+
+    payment = BookingPayment.objects.select_related("booking__user").get(pk=payment_id)
+    contact = payment.metadata or {}
+    data = payment_link_request(
+        payment.booking,
+        payment.amount,
+        contact.get("email") or payment.booking.user.email,
+        contact.get("phone") or payment.booking.user.mobile,
+        # Per payment row: a duplicate submit can't create a second link at the gateway
+        reference_id=payment.pk.hex,
+    )
+
+    # No transaction or row lock is held across the gateway round trip
+    try:
+        link = get_gateway().create_payment_link(data)
+    except Exception as e:
+        # Never fail a payment whose link was filled meanwhile
+        failed = BookingPayment.objects.filter(
+            pk=payment_id, status="initiated", payment_link__isnull=True
+        ).update(
+            status="failed",
+            remarks=f"Payment link creation failed: {e}"[:1000],
+        )
+        if failed:
+            sync_booking_payment_state([payment.booking_id])
+        raise
+
+    BookingPayment.objects.filter(pk=payment_id, payment_link__isnull=True).update(
+        payment_link=link.get("short_url"),
+        gateway_order_id=link.get("id"),
+        gateway_response=link,
+        remarks="Payment link created via Razorpay",
+    )
@@ -0,0 +1,73 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import Booking
+from payments.models import BookingPayment
+from payments.utils import bulk_create_payments
+
+REQUIRED_COLUMNS = {"booking", "amount", "method", "status"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import BookingPayments from a CSV (columns: booking (ref_id), amount, method, status, "
+        "and optional transaction_id, remarks). Every affected booking is synced in one statement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, insert nothing")
+
+    def handle(self, *args, **options):
+        with open(options["path"], newline="", encoding="utf-8-sig") as handle:
+            rows = list(csv.DictReader(handle))
+        if not rows:
+            raise CommandError("No rows to import.")
+        missing = REQUIRED_COLUMNS - rows[0].keys()
+        if missing:
+            raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        # One lookup for every referenced booking
+        booking_ids = dict(
+            Booking.objects.filter(ref_id__in={row["booking"].strip() for row in rows}).values_list("ref_id", "id")
+        )
+        methods = dict(BookingPayment.PAYMENT_METHODS)
+        statuses = dict(BookingPayment.STATUS_CHOICES)
+
+        payments, errors = [], []
+        for line, row in enumerate(rows, start=2):
+            ref_id = row["booking"].strip()
+            try:
+                amount = Decimal(row["amount"])
+            except (InvalidOperation, TypeError):
+                errors.append(f"line {line}: invalid amount {row['amount']!r}")
+                continue
+            if ref_id not in booking_ids:
+                errors.append(f"line {line}: unknown booking {ref_id!r}")
+            elif row["method"] not in methods:
+                errors.append(f"line {line}: invalid method {row['method']!r}")
+            elif row["status"] not in statuses:
+                errors.append(f"line {line}: invalid status {row['status']!r}")
+            else:
+                payments.append(BookingPayment(
+                    booking_id=booking_ids[ref_id],
+                    amount=amount,
+                    method=row["method"],
+                    status=row["status"],
+                    gateway_payment_id=(row.get("transaction_id") or "").strip() or None,
+                    remarks=(row.get("remarks") or "").strip() or "Imported",
+                ))
+
+        if errors:
+            raise CommandError("Nothing imported:\n" + "\n".join(errors))
+        if options["dry_run"]:
+            self.stdout.write(f"{len(payments)} payments valid (dry run).")
+            return
+
+        created = bulk_create_payments(payments, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(created)} payments for {len({p.booking_id for p in created})} bookings."
+        ))
@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.reconcile import (
+    RECONCILE_PAGE_SIZE,
+    RECONCILE_RATE,
+    RECONCILE_STALE_AFTER,
+    RECONCILE_WORKERS,
+    reconcile_payments,
+)
+
+
+class Command(BaseCommand):
+    help = "Re-check payments stuck in 'initiated' against the gateway and sync their bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-after", type=int, default=RECONCILE_STALE_AFTER, help="Minutes in 'initiated'")
+        parser.add_argument("--page-size", type=int, default=RECONCILE_PAGE_SIZE)
+        parser.add_argument("--workers", type=int, default=RECONCILE_WORKERS)
+        parser.add_argument("--rate", type=float, default=RECONCILE_RATE, help="Gateway calls per second")
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--every", type=int, default=0, help="Keep running, one pass every N seconds")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        while True:
+            report = reconcile_payments(
+                stale_after=options["stale_after"],
+                page_size=options["page_size"],
+                workers=options["workers"],
+                rate=options["rate"],
+                dry_run=options["dry_run"],
+            )
+            self._print(report, options["json"])
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
+
+    def _print(self, report, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(report))
+            return
+        updated = ", ".join(f"{status}={count}" for status, count in report["updated"].items()) or "none"
+        self.stdout.write(
+            f"Checked {report['checked']} payments in {report['seconds']}s: "
+            f"updated {updated}, unchanged {report['unchanged']}, "
+            f"bookings synced {report['bookings_synced']}, errors {len(report['errors'])}"
+        )
+        for error in report["errors"][:20]:
+            self.stdout.write(self.style.WARNING(f"  {error['payment']}: {error['error']}"))
@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.webhooks import event_id_for, handle_razorpay_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay recorded Razorpay webhook payloads (JSON files) through the webhook handler, "
+        "without signature checks. Already-processed event ids are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Payload files or directories of *.json files")
+        parser.add_argument("--event-id", help="Event id to use (single file only); default: body hash")
+
+    def handle(self, *args, **options):
+        files = []
+        for path in map(Path, options["paths"]):
+            files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+        if options["event_id"] and len(files) != 1:
+            raise CommandError("--event-id needs exactly one payload file")
+
+        applied_count = 0
+        for file in files:
+            body = file.read_bytes()
+            try:
+                payload = json.loads(body)
+            except ValueError as e:
+                raise CommandError(f"{file}: {e}")
+
+            event, applied = handle_razorpay_event(event_id_for(body, options["event_id"]), payload)
+            applied_count += applied
+            self.stdout.write(f"{file.name}: {event.event_type} → {event.status}{'' if applied else ' (not applied)'}")
+
+        self.stdout.write(self.style.SUCCESS(f"Replayed {len(files)} payloads, {applied_count} applied."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_paymentwebhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingpayment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingpayment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'initiated')), fields=('idempotency_key',), name='uniq_open_payment_idempotency_key'),
+        ),
+    ]
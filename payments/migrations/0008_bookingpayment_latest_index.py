@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_bookingpayment_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingpayment',
+            index=models.Index(fields=['booking', '-created_at'], name='payment_booking_latest_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_bookingpayment_latest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingpayment',
+            name='link_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -44,8 +44,24 @@ class BookingPayment(models.Model):
 
     file_url = models.URLField(max_length=1024,blank=True, null=True)
 
+    # booking + amount; at most one open (initiated) payment link per key
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    # Set when a worker claims the gateway link call (see payments.links)
+    link_requested_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # latest payment per booking (sync_booking_payment_state)
+            models.Index(fields=["booking", "-created_at"], name="payment_booking_latest_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(status="initiated"),
+                name="uniq_open_payment_idempotency_key",
+            ),
+        ]
 
     def __str__(self):
         return f"Payment {self.id} - {self.status} - ₹{self.amount} for Booking {self.booking_id}"
@@ -75,3 +91,34 @@ class AgentIncentive(models.Model):
 
     def __str__(self):
         return f"{self.user} → {self.booking} → {self.amount}"
+
+
+class PaymentWebhookEvent(models.Model):
+    """Gateway webhook deliveries, one row per event id (redeliveries are no-ops)."""
+    STATUS_CHOICES = [
+        ("received", "Received"),
+        ("processed", "Processed"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    ]
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="received")
+    error_message = models.TextField(blank=True, null=True)
+    payment = models.ForeignKey(
+        BookingPayment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="webhook_events",
+    )
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-received_at"]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.event_id}) - {self.status}"
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from payments.gateway import get_gateway
+from payments.models import BookingPayment
+from payments.utils import RAZORPAY_LINK_STATUS, sync_booking_payment_state
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+RECONCILE_STALE_AFTER = getattr(settings, "RECONCILE_STALE_AFTER", 15)  # minutes in "initiated"
+RECONCILE_PAGE_SIZE = getattr(settings, "RECONCILE_PAGE_SIZE", 200)
+RECONCILE_WORKERS = getattr(settings, "RECONCILE_WORKERS", 8)
+RECONCILE_RATE = getattr(settings, "RECONCILE_RATE", 10)  # gateway calls per second, all workers together
+
+UPDATE_FIELDS = ["status", "gateway_response", "gateway_payment_id", "remarks", "updated_at"]
+
+
+class RateLimiter:
+    """Spaces calls evenly at `per_second` across threads."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0
+        self.lock = threading.Lock()
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+def _stale_payments(cutoff):
+    return (
+        BookingPayment.objects
+        .filter(status="initiated", created_at__lt=cutoff, gateway_order_id__isnull=False)
+        .exclude(gateway_order_id="")
+        .order_by("created_at", "id")
+        .only("id", "booking_id", "status", "created_at", "gateway_order_id", "gateway_payment_id")
+    )
+
+
+def _fetch(gateway, limiter, link_id):
+    limiter.wait()
+    try:
+        return gateway.fetch_payment_link(link_id), None
+    except Exception as e:
+        return None, str(e)
+
+
+def reconcile_payments(
+    stale_after=RECONCILE_STALE_AFTER,
+    page_size=RECONCILE_PAGE_SIZE,
+    workers=RECONCILE_WORKERS,
+    rate=RECONCILE_RATE,
+    gateway=None,
+    dry_run=False,
+):
+    """
+    Re-checks every BookingPayment stuck in "initiated" for more than
+    `stale_after` minutes. Pages are walked by (created_at, id); each page is
+    fetched concurrently under the rate limit, applied with one bulk_update
+    and the affected bookings are synced with one set-based UPDATE.
+    Returns a report dict.
+    """
+    gateway = gateway or get_gateway()
+    limiter = RateLimiter(rate)
+    cutoff = timezone.now() - timedelta(minutes=stale_after)
+    started = time.monotonic()
+
+    report = {
+        "checked": 0,
+        "unchanged": 0,
+        "updated": {},  # new status → count
+        "bookings_synced": 0,
+        "errors": [],
+        "dry_run": dry_run,
+    }
+
+    last = None
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        while True:
+            page = _stale_payments(cutoff)
+            if last is not None:
+                page = page.filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], id__gt=last[1]))
+            payments = list(page[:page_size])
+            if not payments:
+                break
+            last = (payments[-1].created_at, payments[-1].id)
+
+            results = pool.map(lambda p: _fetch(gateway, limiter, p.gateway_order_id), payments)
+
+            now = timezone.now()
+            changed = []
+            for payment, (link, error) in zip(payments, results):
+                report["checked"] += 1
+                if error:
+                    report["errors"].append({"payment": str(payment.id), "error": error})
+                    continue
+
+                new_status = RAZORPAY_LINK_STATUS.get(link.get("status"), "initiated")
+                if new_status == payment.status:
+                    report["unchanged"] += 1
+                    continue
+
+                payment.status = new_status
+                payment.gateway_response = link
+                gateway_payments = link.get("payments") or []
+                if gateway_payments:
+                    payment.gateway_payment_id = gateway_payments[0].get("payment_id") or gateway_payments[0].get("id")
+                payment.remarks = f"Status reconciled from Razorpay: {link.get('status')}"
+                payment.updated_at = now  # bulk_update skips auto_now
+                changed.append(payment)
+
+            if changed and not dry_run:
+                with transaction.atomic():
+                    # Only rows still "initiated": a webhook may have won the race
+                    still_open = set(
+                        BookingPayment.objects.select_for_update()
+                        .filter(id__in=[p.id for p in changed], status="initiated")
+                        .values_list("id", flat=True)
+                    )
+                    changed = [p for p in changed if p.id in still_open]
+                    BookingPayment.objects.bulk_update(changed, UPDATE_FIELDS)
+                    report["bookings_synced"] += sync_booking_payment_state({p.booking_id for p in changed})
+
+            for payment in changed:
+                report["updated"][payment.status] = report["updated"].get(payment.status, 0) + 1
+
+    report["seconds"] = round(time.monotonic() - started, 2)
+    logger.info("Payment reconciliation: %s", report)
+    return report
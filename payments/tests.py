@@ -1,3 +1,197 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from payments.gateway import FakeGateway
+from payments.links import _fill_payment_link
+from payments.models import BookingPayment, PaymentWebhookEvent
+from payments.utils import bulk_create_payments
+from payments.webhooks import event_id_for, handle_razorpay_event
+from users.models import User
+
+WEBHOOK_PAYLOADS = Path(__file__).resolve().parent / "fixtures" / "razorpay_webhooks"
+
+
+class PaymentFixturesMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(email="payer@example.com", mobile="9000000101", first_name="Meera")
+
+    def make_payment(self, **kwargs):
+        booking = Booking.objects.create(user=self.customer, final_amount=Decimal("500"))
+        fields = {"booking": booking, "amount": Decimal("500"), "status": "initiated", "method": "online", **kwargs}
+        return BookingPayment.objects.create(**fields)
+
+
+class PaymentLinkFillTests(PaymentFixturesMixin, TestCase):
+    """The gateway call runs after a short claim UPDATE, never under a row lock."""
+
+    def setUp(self):
+        self.gateway = FakeGateway()
+        patcher = mock.patch("payments.links.get_gateway", return_value=self.gateway)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_link_is_created_once(self):
+        payment = self.make_payment()
+        _fill_payment_link(payment.pk)
+        _fill_payment_link(payment.pk)
+
+        payment.refresh_from_db()
+        self.assertEqual(self.gateway.counter, 1)
+        self.assertEqual(payment.payment_link, "https://rzp.example/plink_fake00000001")
+        self.assertEqual(payment.gateway_order_id, "plink_fake00000001")
+
+    def test_claimed_payment_is_skipped(self):
+        payment = self.make_payment(link_requested_at=timezone.now())
+        _fill_payment_link(payment.pk)
+        self.assertEqual(self.gateway.counter, 0)
+
+    def test_stale_claim_is_retaken(self):
+        payment = self.make_payment(link_requested_at=timezone.now() - timedelta(hours=1))
+        _fill_payment_link(payment.pk)
+        self.assertEqual(self.gateway.counter, 1)
+
+    def test_gateway_error_fails_the_payment(self):
+        payment = self.make_payment()
+        with mock.patch.object(self.gateway, "create_payment_link", side_effect=RuntimeError("gateway down")):
+            with self.assertRaises(RuntimeError):
+                _fill_payment_link(payment.pk)
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "failed")
+        self.assertIn("gateway down", payment.remarks)
+        self.assertEqual(Booking.objects.get(pk=payment.booking_id).payment_status, "failed")
+
+
+class RazorpayWebhookReplayTests(PaymentFixturesMixin, TestCase):
+    """Recorded payment_link payloads replayed through payments.webhooks."""
+
+    LINK_ID = "plink_TestLink00001"
+
+    def replay(self, name):
+        body = (WEBHOOK_PAYLOADS / f"{name}.json").read_bytes()
+        return handle_razorpay_event(event_id_for(body), json.loads(body))
+
+    def test_paid_event_settles_payment_and_booking(self):
+        payment = self.make_payment(gateway_order_id=self.LINK_ID)
+        event, applied = self.replay("payment_link_paid")
+
+        self.assertTrue(applied)
+        self.assertEqual(event.status, "processed")
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "success")
+        self.assertEqual(payment.gateway_payment_id, "pay_TestPayment0001")
+        self.assertEqual(Booking.objects.get(pk=payment.booking_id).payment_status, "success")
+
+    def test_redelivery_is_a_no_op(self):
+        self.make_payment(gateway_order_id=self.LINK_ID)
+        self.replay("payment_link_paid")
+        event, applied = self.replay("payment_link_paid")
+
+        self.assertFalse(applied)
+        self.assertEqual(event.status, "processed")
+        self.assertEqual(PaymentWebhookEvent.objects.count(), 1)
+
+    def test_late_expiry_never_downgrades_success(self):
+        payment = self.make_payment(gateway_order_id=self.LINK_ID)
+        self.replay("payment_link_paid")
+        event, applied = self.replay("payment_link_expired")
+
+        self.assertFalse(applied)
+        self.assertEqual(event.status, "ignored")
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "success")
+        self.assertEqual(Booking.objects.get(pk=payment.booking_id).payment_status, "success")
+
+    def test_unknown_payment_stays_retryable(self):
+        event, applied = self.replay("payment_link_paid")
+        self.assertFalse(applied)
+        self.assertEqual(event.status, "failed")
+
+        # The link fill lands, then Razorpay redelivers the same event
+        payment = self.make_payment(gateway_order_id=self.LINK_ID)
+        event, applied = self.replay("payment_link_paid")
+        self.assertTrue(applied)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "success")
+
+
+@override_settings(RAZORPAY_WEBHOOK_SECRET="whsec_test")
+class RazorpayWebhookViewTests(PaymentFixturesMixin, TestCase):
+    def post(self, name):
+        body = (WEBHOOK_PAYLOADS / f"{name}.json").read_bytes()
+        signature = hmac.new(b"whsec_test", body, hashlib.sha256).hexdigest()
+        return APIClient().post(
+            "/api/webhooks/razorpay/", body, content_type="application/json",
+            HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID="evt_TestEvent0001",
+        )
+
+    def test_unmatched_event_asks_for_redelivery(self):
+        self.assertEqual(self.post("payment_link_paid").status_code, 503)
+        self.make_payment(gateway_order_id=RazorpayWebhookReplayTests.LINK_ID)
+
+        response = self.post("payment_link_paid")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["applied"])
+
+    def test_bad_signature_is_rejected(self):
+        body = (WEBHOOK_PAYLOADS / "payment_link_paid.json").read_bytes()
+        response = APIClient().post(
+            "/api/webhooks/razorpay/", body, content_type="application/json", HTTP_X_RAZORPAY_SIGNATURE="bad",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkPaymentImportTests(PaymentFixturesMixin, TestCase):
+    """Bulk imports insert in batches and sync every affected booking in one UPDATE."""
+
+    def test_one_sync_statement_for_all_bookings(self):
+        bookings = [Booking.objects.create(user=self.customer, ref_id=f"DPIMP{n:04d}") for n in range(20)]
+        payments = [
+            BookingPayment(booking=booking, amount=Decimal("250"), method="cash", status="success")
+            for booking in bookings
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            bulk_create_payments(payments, batch_size=10)
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            Booking.objects.filter(pk__in=[b.pk for b in bookings], payment_status="success").count(), 20
+        )
+
+    def test_import_command(self):
+        first = Booking.objects.create(user=self.customer, ref_id="DPIMP0001")
+        second = Booking.objects.create(user=self.customer, ref_id="DPIMP0002")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write("booking,amount,method,status,transaction_id\n")
+            handle.write("DPIMP0001,500,upi,success,UTR123\n")
+            handle.write("DPIMP0002,300,cash,failed,\n")
+
+        call_command("import_payments", handle.name, stdout=mock.MagicMock())
+
+        self.assertEqual(BookingPayment.objects.get(booking=first).gateway_payment_id, "UTR123")
+        self.assertEqual(Booking.objects.get(pk=first.pk).payment_status, "success")
+        self.assertEqual(Booking.objects.get(pk=second.pk).payment_status, "failed")
+
+    def test_import_rejects_unknown_bookings(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write("booking,amount,method,status\nNOPE,100,cash,success\n")
+
+        with self.assertRaisesMessage(CommandError, "unknown booking 'NOPE'"):
+            call_command("import_payments", handle.name)
+        self.assertFalse(BookingPayment.objects.exists())
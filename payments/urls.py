@@ -7,6 +7,7 @@ from .views import (
     BookingPaymentViewSet,
     ClientBookingPaymentViewSet,
     PaymentConfirmationView,
+    RazorpayWebhookView,
 )
 
 # Admin / staff / internal router
@@ -26,6 +27,9 @@ urlpatterns = [
     # Client-facing payment APIs
     path("client/", include(client_router.urls)),
 
+    # Razorpay webhook (signature-verified, idempotent per event id)
+    path("webhooks/razorpay/", RazorpayWebhookView.as_view(), name="razorpay-webhook"),
+
     # Payment-confirmation endpoint
     path("payment-confirmation/<uuid:booking_id>/", 
          PaymentConfirmationView.as_view(), 
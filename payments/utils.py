@@ -2,12 +2,45 @@ import razorpay
 from django.conf import settings
 from decimal import Decimal
 from payments.models import BookingPayment
-from bookings.models import Booking
+from bookings.models import Booking, StoredBlob
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from payments.gateway import get_gateway
 
 # Initialize Razorpay client
 client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
 
+# Razorpay payment-link status → BookingPayment.status
+RAZORPAY_LINK_STATUS = {
+    "created": "initiated",
+    "issued": "initiated",
+    "partially_paid": "initiated",
+    "paid": "success",
+    "cancelled": "failed",
+    "expired": "failed",
+}
+
+
+def payment_link_request(booking: Booking, amount: Decimal, email: str, phone: str, reference_id: str = None) -> dict:
+    """Razorpay payment-link payload for a booking."""
+    data = {
+        "amount": int(amount * 100),  # Razorpay expects amount in paise
+        "currency": "INR",
+        "description": f"Payment for Booking {booking.id}",
+        "customer": {
+            "name": f"{booking.user.first_name} {booking.user.last_name}".strip(),
+            "email": email,
+            "contact": phone,
+        },
+        "notify": {"sms": True, "email": True},
+        "reminder_enable": True,
+        "callback_url": f"{settings.BASE_URL}/api/payment-confirmation/{booking.id}",  # ✅ Use your actual callback URL here
+        "callback_method": "get",
+    }
+    if reference_id:
+        data["reference_id"] = reference_id  # Razorpay rejects a second link with the same reference
+    return data
+
 
 def create_payment_link(booking: Booking, amount: Decimal, email: str, phone: str) -> BookingPayment:
     """
@@ -27,23 +60,8 @@ def create_payment_link(booking: Booking, amount: Decimal, email: str, phone: st
     if not amount or amount <= 0:
         raise ValueError("Amount must be a positive decimal")
 
-    amount_in_paise = int(amount * 100)  # Razorpay expects amount in paise
-
     # 🧾 Create a payment link via Razorpay
-    payment_link_data = client.payment_link.create({
-        "amount": amount_in_paise,
-        "currency": "INR",
-        "description": f"Payment for Booking {booking.id}",
-        "customer": {
-            "name": f"{booking.user.first_name} {booking.user.last_name}".strip(),
-            "email": email,
-            "contact": phone,
-        },
-        "notify": {"sms": True, "email": True},
-        "reminder_enable": True,
-        "callback_url": f"{settings.BASE_URL}/api/payment-confirmation/{booking.id}",  # ✅ Use your actual callback URL here
-        "callback_method": "get",
-    })
+    payment_link_data = get_gateway().create_payment_link(payment_link_request(booking, amount, email, phone))
 
     # 🔐 Extract useful fields from Razorpay response
     payment_link_url = payment_link_data.get("short_url")
@@ -60,6 +78,7 @@ def create_payment_link(booking: Booking, amount: Decimal, email: str, phone: st
         gateway_response=payment_link_data,
         remarks="Payment link created via Razorpay",
     )
+    sync_booking_payment_state([booking.pk])
 
     return payment
 
@@ -72,30 +91,31 @@ def refresh_booking_payment_status(payment: BookingPayment) -> BookingPayment:
         raise ValueError("Payment record does not have a provider_order_id.")
 
     try:
-        # 1️⃣ Fetch payment link from Razorpay
-        payment_link = client.payment_link.fetch(payment.gateway_order_id)
+        # 1️⃣ Fetch payment link through the configured gateway client
+        payment_link = get_gateway().fetch_payment_link(payment.gateway_order_id)
 
         # 2️⃣ Map Razorpay status to internal status
-        status_map = {
-            "created": "initiated",
-            "issued": "initiated",
-            "paid": "success",
-            "cancelled": "failed",
-            "expired": "failed",
-        }
-        new_status = status_map.get(payment_link.get("status"), "initiated")
-
-        # 3️⃣ Update payment fields
-        payment.gateway_response = payment_link
-        payment.status = new_status
-
-        # 4️⃣ If Razorpay returned payment IDs, capture first one
-        payments_list = payment_link.get("payments", [])
-        if payments_list:
-            payment.transaction_id = payments_list[0].get("id")
-
-        payment.remarks = f"Status refreshed from Razorpay: {payment_link.get('status')}"
-        payment.save()
+        new_status = RAZORPAY_LINK_STATUS.get(payment_link.get("status"), "initiated")
+
+        with transaction.atomic():
+            # Re-read under lock: the webhook / reconcile worker may have moved it meanwhile
+            payment = BookingPayment.objects.select_for_update().get(pk=payment.pk)
+            if payment.status == "success" and new_status != "success":
+                # Same rule as webhooks / reconcile: never downgrade a completed payment
+                return payment
+
+            # 3️⃣ Update payment fields
+            payment.gateway_response = payment_link
+            payment.status = new_status
+
+            # 4️⃣ If Razorpay returned payment IDs, capture first one
+            payments_list = payment_link.get("payments") or []
+            if payments_list:
+                payment.gateway_payment_id = payments_list[0].get("payment_id") or payments_list[0].get("id")
+
+            payment.remarks = f"Status refreshed from Razorpay: {payment_link.get('status')}"
+            payment.save(update_fields=["status", "gateway_response", "gateway_payment_id", "remarks", "updated_at"])
+            sync_booking_payment_state([payment.booking_id])
 
         return payment
 
@@ -131,18 +151,60 @@ def sync_booking_from_latest_payment(booking: Booking) -> None:
     """
     Syncs a Booking's payment status and method from its latest BookingPayment.
     - If no payment exists, does nothing.
-    - If latest payment is success/failed, updates Booking accordingly.
+    - Otherwise one conditional UPDATE, skipped when nothing changed.
     """
-    latest_payment = (
-        BookingPayment.objects.filter(booking=booking)
-        .order_by("-created_at")
-        .first()
-    )
+    sync_booking_payment_state([booking.pk])
 
-    if not latest_payment:
-        return
 
-    Booking.objects.filter(pk=booking.pk).update(
-        payment_status=latest_payment.status,
-        payment_method=latest_payment.method
-    )
\ No newline at end of file
+def sync_booking_payment_state(booking_ids) -> int:
+    """
+    Set-based sync_booking_from_latest_payment(): one UPDATE joins each
+    booking to its latest payment (DISTINCT ON) and only touches bookings
+    whose payment_status / payment_method actually differ.
+    Returns the number of bookings changed.
+    """
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return 0
+
+    booking = Booking._meta
+    payment = BookingPayment._meta
+    b_col = lambda name: booking.get_field(name).column  # noqa: E731
+    p_col = lambda name: payment.get_field(name).column  # noqa: E731
+
+    sql = f"""
+    UPDATE {booking.db_table} AS b
+    SET {b_col("payment_status")} = lp.status,
+        {b_col("payment_method")} = lp.method
+    FROM (
+        SELECT DISTINCT ON ({p_col("booking")})
+               {p_col("booking")} AS booking_id,
+               {p_col("status")} AS status,
+               {p_col("method")} AS method
+        FROM {payment.db_table}
+        WHERE {p_col("booking")} = ANY(%s)
+        ORDER BY {p_col("booking")}, {p_col("created_at")} DESC
+    ) AS lp
+    WHERE b.{booking.pk.column} = lp.booking_id
+      AND (
+          b.{b_col("payment_status")} IS DISTINCT FROM lp.status
+          OR b.{b_col("payment_method")} IS DISTINCT FROM lp.method
+      )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [booking_ids])
+        return cursor.rowcount
+
+
+def bulk_create_payments(payments, batch_size=500) -> list:
+    """
+    Bulk import path: inserts BookingPayments in batches, then syncs every
+    affected booking with a single sync_booking_payment_state() statement.
+    bulk_create skips post_save, so proof-file references are counted here.
+    """
+    with transaction.atomic():
+        created = BookingPayment.objects.bulk_create(payments, batch_size=batch_size)
+        for payment in created:
+            StoredBlob.retain(payment.file_url)
+        sync_booking_payment_state({payment.booking_id for payment in created})
+    return created
@@ -10,7 +10,13 @@ from drpathcare.pagination import StandardResultsSetPagination
 from bookings.models import Booking
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
-from payments.utils import refresh_booking_payment_status, refresh_latest_payment_for_booking
+from payments.utils import (
+    client,
+    refresh_booking_payment_status,
+    refresh_latest_payment_for_booking,
+    sync_booking_payment_state,
+)
+from payments.webhooks import event_id_for, handle_razorpay_event
 
 from django.shortcuts import render, redirect
 from django.http import HttpResponse
@@ -20,6 +26,14 @@ import time
 from django.db.models import Sum
 from django.utils.timezone import make_aware
 from datetime import datetime
+import json
+import logging
+
+from django.conf import settings
+from rest_framework.views import APIView
+from razorpay.errors import SignatureVerificationError
+
+logger = logging.getLogger(__name__)
 
 class ClientBookingPaymentViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = BookingPaymentSerializer
@@ -68,28 +82,15 @@ class BookingPaymentViewSet(viewsets.ModelViewSet):
     @transaction.atomic
     def perform_create(self, serializer):
         booking_payment = serializer.save()
-
-        # 🔄 Auto-update booking payment summary
-        booking = booking_payment.booking
-        if booking_payment.status == "success":
-            booking.payment_status = "success"
-            booking.payment_method = booking_payment.method
-            booking.save(update_fields=["payment_status", "payment_method"])
-
-        return payment
+        # 🔄 Booking payment summary follows the latest payment (one conditional UPDATE)
+        sync_booking_payment_state([booking_payment.booking_id])
+        return booking_payment
 
     @transaction.atomic
     def perform_update(self, serializer):
         booking_payment = serializer.save()
         # 🔄 Sync booking if payment status changes
-        booking = booking_payment.booking
-        if booking_payment.status == "success":
-            booking.payment_status = "success"
-            booking.status = "payment_collected"
-            booking.payment_method = booking_payment.method
-        elif booking_payment.status == "failed":
-            booking.payment_status = "failed"
-        booking.save(update_fields=["payment_status", "payment_method"])
+        sync_booking_payment_state([booking_payment.booking_id])
         return booking_payment
 
     @action(detail=True, methods=["post"], url_path="refresh-status")
@@ -130,13 +131,27 @@ class PaymentConfirmationView(View):
         except Booking.DoesNotExist:
             return HttpResponse("Invalid booking reference", status=404)
 
-        # 🧾 Refresh payment status
-        try:
-            payment = refresh_latest_payment_for_booking(booking_id)
-            status = payment.status
-        except Exception as e:
-            status = "failed"
-            # print(f"Payment refresh failed: {e}")
+        # 🧾 Local payment state (kept current by the Razorpay webhook, no gateway call)
+        status = (
+            BookingPayment.objects.filter(booking_id=booking_id)
+            .order_by("-created_at")
+            .values_list("status", flat=True)
+            .first()
+        ) or "failed"
+
+        # Webhook may land after the redirect; a signed "paid" callback is enough to show success
+        if status == "initiated" and request.GET.get("razorpay_payment_link_status") == "paid":
+            try:
+                client.utility.verify_payment_link_signature({
+                    "payment_link_id": request.GET.get("razorpay_payment_link_id", ""),
+                    "payment_link_reference_id": request.GET.get("razorpay_payment_link_reference_id", ""),
+                    "payment_link_status": "paid",
+                    "razorpay_payment_id": request.GET.get("razorpay_payment_id", ""),
+                    "razorpay_signature": request.GET.get("razorpay_signature", ""),
+                })
+                status = "success"
+            except SignatureVerificationError:
+                pass
 
         # ✅ Map status to message
         status_message = {
@@ -154,6 +169,42 @@ class PaymentConfirmationView(View):
         }
         return render(request, self.template_name, context)
 
+class RazorpayWebhookView(APIView):
+    """
+    POST /api/webhooks/razorpay/
+    Payment-link events from Razorpay. The signature is checked against the
+    raw body; each event id is stored once, so redeliveries are no-ops.
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        body = request.body
+        signature = request.headers.get("X-Razorpay-Signature", "")
+        secret = getattr(settings, "RAZORPAY_WEBHOOK_SECRET", None)
+        if not secret:
+            logger.error("RAZORPAY_WEBHOOK_SECRET is not configured")
+            return Response({"detail": "Webhook not configured"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        try:
+            client.utility.verify_webhook_signature(body.decode("utf-8"), signature, secret)
+        except (SignatureVerificationError, UnicodeDecodeError):
+            return Response({"detail": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return Response({"detail": "Invalid JSON"}, status=status.HTTP_400_BAD_REQUEST)
+
+        event_id = event_id_for(body, request.headers.get("X-Razorpay-Event-Id"))
+        event, applied = handle_razorpay_event(event_id, payload)
+        result = {"event_id": event.event_id, "status": event.status, "applied": applied}
+        if event.status == "failed":
+            # Non-2xx → Razorpay redelivers once the payment link is recorded
+            return Response(result, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(result)
+
+
 class AgentIncentiveViewSet(viewsets.ModelViewSet):
     # queryset = (
     #     AgentIncentive.objects
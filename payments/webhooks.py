@@ -0,0 +1,84 @@
+import hashlib
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from payments.models import BookingPayment, PaymentWebhookEvent
+from payments.utils import RAZORPAY_LINK_STATUS, sync_booking_payment_state
+
+logger = logging.getLogger(__name__)
+
+# Events that carry a payment_link entity
+PAYMENT_LINK_EVENTS = {
+    "payment_link.paid",
+    "payment_link.partially_paid",
+    "payment_link.cancelled",
+    "payment_link.expired",
+}
+
+
+def event_id_for(body: bytes, header_event_id: str = None) -> str:
+    """Razorpay sends X-Razorpay-Event-Id; fall back to the body hash for replays without it."""
+    return header_event_id or f"sha256:{hashlib.sha256(body).hexdigest()}"
+
+
+def handle_razorpay_event(event_id: str, payload: dict):
+    """
+    Stores the event (once per event id) and applies it to the matching
+    BookingPayment and its booking in the same transaction. Redelivered or
+    replayed events are no-ops once processed/ignored; an event whose payment
+    isn't known yet is kept as "failed" so a redelivery or replay applies it.
+    Returns (event, applied).
+    """
+    event_type = payload.get("event", "")
+
+    with transaction.atomic():
+        event, _ = PaymentWebhookEvent.objects.get_or_create(
+            event_id=event_id,
+            defaults={"event_type": event_type, "payload": payload},
+        )
+        # Serialise concurrent redeliveries of the same event
+        event = PaymentWebhookEvent.objects.select_for_update().get(pk=event.pk)
+        if event.status in ("processed", "ignored"):
+            return event, False
+
+        event.status, payment, note = _apply_payment_link_event(event_type, payload)
+        applied = event.status == "processed"
+
+        event.error_message = note
+        event.payment = payment
+        event.processed_at = timezone.now()
+        event.save(update_fields=["status", "error_message", "payment", "processed_at"])
+        return event, applied
+
+
+def _apply_payment_link_event(event_type, payload):
+    """Returns (event status, payment, note)."""
+    if event_type not in PAYMENT_LINK_EVENTS:
+        return "ignored", None, f"Unhandled event type {event_type}"
+
+    entities = payload.get("payload") or {}
+    link = (entities.get("payment_link") or {}).get("entity") or {}
+    gateway_payment = (entities.get("payment") or {}).get("entity") or {}
+    if not link.get("id"):
+        return "ignored", None, "Missing payment_link entity"
+
+    payment = BookingPayment.objects.select_for_update().filter(gateway_order_id=link["id"]).first()
+    if payment is None:
+        # The webhook can beat the after-commit link fill (payments.links) → retry later
+        return "failed", None, f"No BookingPayment for {link['id']} yet"
+
+    new_status = RAZORPAY_LINK_STATUS.get(link.get("status"), "initiated")
+    if payment.status == "success" and new_status != "success":
+        # Out-of-order delivery (e.g. expired after paid) never undoes a payment
+        return "ignored", payment, f"Kept success, ignored {link.get('status')}"
+
+    payment.status = new_status
+    payment.gateway_response = link
+    if gateway_payment.get("id"):
+        payment.gateway_payment_id = gateway_payment["id"]
+    payment.remarks = f"Status updated by Razorpay webhook: {link.get('status')}"
+    payment.save(update_fields=["status", "gateway_response", "gateway_payment_id", "remarks", "updated_at"])
+    sync_booking_payment_state([payment.booking_id])
+    return "processed", payment, None
@@ -2,14 +2,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from users.models import OTP
 from users.serializers import SendOTPSerializer, VerifyOTPSerializer
-import random
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.utils.otp import (
+    issue_otp,
+    verify_otp,
+    dispatch_otp,
+    otp_delivery_status,
+    SendOTPMobileThrottle,
+    SendOTPIPThrottle,
+    VerifyOTPMobileThrottle,
+    VerifyOTPIPThrottle,
+)
+from users.authentication import issue_tokens
 from notifications.utils import send_sms_from_template
 
-from notifications.utils import send_otp_sms
-
 User = get_user_model()
 
 # -----------------------------
@@ -18,6 +24,7 @@ User = get_user_model()
 CRM_ROLES = ["Admin", "Staff", "Manager","Agent"]  # update as per your role model
 class SendOTPView(APIView):
     permission_classes = []
+    throttle_classes = [SendOTPIPThrottle, SendOTPMobileThrottle]
 
     def post(self, request):
         """
@@ -26,56 +33,55 @@ class SendOTPView(APIView):
             {
                 "message": "OTP sent successfully",
                 "is_user": true/false,
-                "is_crm_user": true/false
+                "is_crm_user": true/false,
+                "dispatch_id": "...",        # poll /auth/otp-status/<dispatch_id>/
+                "delivery_status": "queued"
             }
         """
         serializer = SendOTPSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         mobile = serializer.validated_data["mobile"]
 
-        # ✅ Generate OTP
-        code = str(random.randint(1000, 9999))
-
         # ✅ Check if user exists
-        user = User.objects.filter(mobile=mobile,is_active=True).first()
+        user = User.objects.select_related("role").filter(mobile=mobile,is_active=True).first()
         is_user = bool(user)
         is_crm_user = bool(user and getattr(user, "role", None) and user.role.name in CRM_ROLES)
 
-        # ✅ Save OTP (linked to user if exists, else None)
-        otp = OTP.objects.create(
-                    user=user if user else None,
-                    mobile=user.mobile if user else mobile,
-                    code=code
-                )
-        # ✅ Send SMS (works even if user=None)
-        success, response_text, _ = send_otp_sms(mobile, code)
+        # ✅ Generate + store OTP (cache with TTL, sampled DB audit)
+        code = issue_otp(mobile, user=user)
 
-        if not success:
-            return Response(
-                {
-                    "error": "Failed to send OTP",
-                    "details": response_text,
-                    "is_user": is_user,
-                    "is_crm_user": is_crm_user,
-                },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        # ✅ Send SMS in the background (works even if user=None)
+        dispatch_id = dispatch_otp(mobile, code)
 
         return Response(
             {
                 "message": f"OTP sent to {mobile}",
                 "is_user": is_user,
                 "is_crm_user": is_crm_user,
+                "dispatch_id": dispatch_id,
+                "delivery_status": "queued",
             },
             status=status.HTTP_200_OK,
         )
 
 
+class OTPStatusView(APIView):
+    """GET /auth/otp-status/<dispatch_id>/ → delivery status of a sent OTP."""
+    permission_classes = []
+
+    def get(self, request, dispatch_id):
+        delivery = otp_delivery_status(dispatch_id)
+        if delivery is None:
+            return Response({"error": "Unknown or expired dispatch id"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"dispatch_id": dispatch_id, **delivery}, status=status.HTTP_200_OK)
+
+
 # -----------------------------
 # Verify OTP
 # -----------------------------
 class VerifyOTPView(APIView):
     permission_classes = []
+    throttle_classes = [VerifyOTPIPThrottle, VerifyOTPMobileThrottle]
 
     def post(self, request):
         from users.serializers import VerifyOTPSerializer  # import here to avoid circular import
@@ -97,17 +103,11 @@ class VerifyOTPView(APIView):
             )
 
         # ✅ Validate OTP
-        otp_obj = (
-            OTP.objects.filter(mobile=mobile, code=otp_code)
-            .order_by("-created_at")
-            .first()
-        )
-
-        if not otp_obj or otp_obj.is_expired():
+        if not verify_otp(mobile, otp_code):
             return Response({"error": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
         # ✅ Issue JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
         return Response(
             {
                 "message": "OTP verified successfully",
@@ -142,6 +142,7 @@ class VerifyCustomerOTPView(APIView):
     """
 
     permission_classes = []
+    throttle_classes = [VerifyOTPIPThrottle, VerifyOTPMobileThrottle]
 
     def post(self, request):
         from users.serializers import VerifyOTPSerializer
@@ -151,14 +152,8 @@ class VerifyCustomerOTPView(APIView):
         mobile = serializer.validated_data["mobile"]
         otp_code = serializer.validated_data["otp"]
 
-        # 🧩 Fetch latest OTP by mobile
-        otp_obj = (
-            OTP.objects.filter(mobile=mobile, code=otp_code)
-            .order_by("-created_at")
-            .first()
-        )
-
-        if not otp_obj or otp_obj.is_expired():
+        # 🧩 Validate OTP
+        if not verify_otp(mobile, otp_code):
             return Response({"error": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
         # 🧩 Check if user exists
@@ -194,7 +189,7 @@ class VerifyCustomerOTPView(APIView):
             created = False
 
         # 🧩 Issue JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
 
         return Response(
             {
@@ -257,7 +252,7 @@ class VerifyMPINView(APIView):
             )
 
         # ✅ Issue JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
 
         return Response(
             {
@@ -0,0 +1,99 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+# Upper bound on staleness in *other* processes; this process drops entries on
+# save. Until it passes, another worker can still authenticate a user who was
+# just deactivated, or serve their previous role.
+AUTH_USER_CACHE_TTL = getattr(settings, "AUTH_USER_CACHE_TTL", 30)
+
+
+def user_version(user):
+    """Changes whenever the user row is saved (auto_now updated_at)."""
+    return int(user.updated_at.timestamp() * 1000) if user.updated_at else 0
+
+
+# ============================================================
+# 🔹 Tokens with the user version claim
+# ============================================================
+def issue_tokens(user):
+    """RefreshToken carrying uv (see CachedJWTAuthentication); access tokens inherit it."""
+    refresh = RefreshToken.for_user(user)
+    refresh["uv"] = user_version(user)
+    return refresh
+
+
+# ============================================================
+# 🔹 In-process user cache (user + role, one query on miss)
+# ============================================================
+class _UserCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # user_id → (expires_at, user)
+
+    def get(self, user_id):
+        entry = self.entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, user):
+        with self.lock:
+            self.entries[user.pk] = (time.monotonic() + AUTH_USER_CACHE_TTL, user)
+
+    def drop(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def drop_role(self, role_id):
+        with self.lock:
+            self.entries = {k: v for k, v in self.entries.items() if v[1].role_id != role_id}
+
+
+user_cache = _UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves request.user (with .role already loaded)
+    from a short-TTL in-process cache, so authenticated requests normally
+    run zero auth queries. A token newer than the cached row (uv claim)
+    forces a reload.
+
+    Saving a user or role only clears this process's cache. Other workers
+    pick up a deactivation or role change when their entry expires, so
+    they can lag by up to AUTH_USER_CACHE_TTL seconds.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None or validated_token.get("uv", 0) > user_version(user):
+            user = User.objects.select_related("role").filter(pk=user_id).first()
+            if user is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.put(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Views may set attributes on request.user; never hand out the shared instance
+        return copy.copy(user)
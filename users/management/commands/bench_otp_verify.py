@@ -0,0 +1,79 @@
+import statistics
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users.models import OTP
+from users.utils import otp as otp_store
+
+
+class Command(BaseCommand):
+    help = (
+        "OTP verify latency with millions of historic OTP rows: the old latest-by-mobile+code "
+        "lookup vs verify_otp() on the cache and OTP-table paths. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Historic OTP rows to seed")
+        parser.add_argument("--runs", type=int, default=500)
+
+    def handle(self, *args, **options):
+        rows, runs = options["rows"], options["runs"]
+        with transaction.atomic():
+            self._seed(rows)
+            mobiles = [f"8{n:09d}" for n in range(runs)]
+
+            legacy = self._time(mobiles, self._legacy_verify)
+            with mock.patch.object(otp_store, "OTP_CACHE_SHARED", True):
+                cached = self._time(mobiles, self._verify)
+            with mock.patch.object(otp_store, "OTP_CACHE_SHARED", False):
+                table = self._time(mobiles, self._verify)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{rows:,} historic rows, {runs} verifications each")
+        for label, samples in (("latest by mobile+code", legacy), ("verify_otp (cache)", cached),
+                               ("verify_otp (OTP table)", table)):
+            p50 = statistics.median(samples) * 1000
+            p99 = statistics.quantiles(samples, n=100)[98] * 1000
+            self.stdout.write(f"{label:<24}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+    @staticmethod
+    def _seed(rows):
+        # Expired codes spread over ~100k mobiles, as a table that was never purged
+        table = OTP._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (mobile, code, created_at, expires_at, attempts)
+                SELECT '9' || lpad((n %% 100000)::text, 9, '0'),
+                       lpad((n %% 10000)::text, 4, '0'),
+                       now() - (n || ' seconds')::interval,
+                       now() - (n || ' seconds')::interval + interval '5 minutes',
+                       0
+                FROM generate_series(1, %s) AS n
+                """,
+                [rows],
+            )
+            cursor.execute(f"ANALYZE {table}")
+
+    @staticmethod
+    def _time(mobiles, verify):
+        samples = []
+        for mobile in mobiles:
+            code = otp_store.issue_otp(mobile)
+            start = time.perf_counter()
+            assert verify(mobile, code)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    @staticmethod
+    def _verify(mobile, code):
+        return otp_store.verify_otp(mobile, code)
+
+    @staticmethod
+    def _legacy_verify(mobile, code):
+        # The lookup VerifyOTPView ran before the OTP store existed
+        return OTP.objects.filter(mobile=mobile, code=code).order_by("-created_at").first() is not None
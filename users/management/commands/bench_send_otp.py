@@ -0,0 +1,93 @@
+import statistics
+import threading
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from users.apis import login
+from users.models import OTP, OTPDelivery
+from users.utils import otp as otp_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Send-OTP request latency against a slow stub SMS gateway: SMS queued on the dispatcher's "
+        "otp lane vs sent inside the request. Also reports queued time-to-sent. Rows it creates are deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--rate", type=float, default=5.0, help="Requests per second")
+        parser.add_argument("--gateway-latency", type=float, default=0.3, help="Seconds per stub gateway call")
+
+    def handle(self, *args, **options):
+        requests, rate, latency = options["requests"], options["rate"], options["gateway_latency"]
+        sent_at = {}
+        drained = threading.Event()
+
+        def stub_gateway(mobile, code):
+            time.sleep(latency)
+            sent_at[mobile] = time.perf_counter()
+            if len(sent_at) == requests:
+                drained.set()
+            return True, "stub", None
+
+        def run_inline(fn, *args, lane):
+            # What the view did before the otp lane: the gateway call inside the request
+            return fn(*args)
+
+        view = login.SendOTPView.as_view(throttle_classes=[])
+        results = []
+        with mock.patch.object(otp_store, "send_otp_sms", stub_gateway):
+            for label, prefix, patches in (
+                ("otp lane", "61", ()),
+                ("inline", "62", (mock.patch.object(otp_store, "dispatch", run_inline),)),
+            ):
+                sent_at.clear()
+                drained.clear()
+                for patch in patches:
+                    patch.start()
+                try:
+                    samples, started = self._run(view, prefix, requests, rate)
+                finally:
+                    for patch in patches:
+                        patch.stop()
+                drained.wait(timeout=requests * latency + 60)
+                delivered = [sent_at[mobile] - started[mobile] for mobile in started if mobile in sent_at]
+                results.append((label, samples, delivered))
+
+        # OTP rows (table path / sampled audit) and delivery rows of the fake mobiles
+        OTP.objects.filter(mobile__regex=r"^6[12]\d{8}$").delete()
+        OTPDelivery.objects.filter(mobile__regex=r"^6[12]\d{8}$").delete()
+
+        self.stdout.write(f"{requests} requests at {rate:g}/s, stub gateway {latency * 1000:.0f} ms")
+        for label, samples, delivered in results:
+            self.stdout.write(
+                f"{label:<9}: request p50 {self._ms(samples, 50):7.1f} ms, p99 {self._ms(samples, 99):7.1f} ms | "
+                f"time-to-sent p50 {self._ms(delivered, 50):7.1f} ms, p99 {self._ms(delivered, 99):7.1f} ms"
+            )
+
+    @staticmethod
+    def _run(view, prefix, requests, rate):
+        factory = APIRequestFactory()
+        samples, started = [], {}
+        interval = 1 / rate
+        next_at = time.perf_counter()
+        for n in range(requests):
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at += interval
+            mobile = f"{prefix}{n:08d}"
+            request = factory.post("/api/auth/send-otp/", {"mobile": mobile}, format="json")
+            start = started[mobile] = time.perf_counter()
+            response = view(request)
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.data
+        return samples, started
+
+    @staticmethod
+    def _ms(samples, percentile):
+        if percentile == 50:
+            return statistics.median(samples) * 1000
+        return statistics.quantiles(samples, n=100)[percentile - 1] * 1000
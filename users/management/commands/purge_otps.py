@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import OTP, OTPDelivery
+
+
+class Command(BaseCommand):
+    help = "Delete OTP rows (audit samples / expired DB-backed OTPs) older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Keep audit rows this long")
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        removed = 0
+        while True:
+            # Bounded deletes so a multi-million row backlog doesn't hold one huge lock
+            ids = list(
+                OTP.objects.filter(created_at__lt=cutoff).values_list("id", flat=True)[: options["batch_size"]]
+            )
+            if not ids:
+                break
+            deleted, _ = OTP.objects.filter(id__in=ids).delete()
+            removed += deleted
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} OTP rows older than {options['days']} days."))
+
+        # Delivery rows are only polled while the OTP is live
+        deliveries, _ = OTPDelivery.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deliveries} OTP delivery rows older than 1 day."))
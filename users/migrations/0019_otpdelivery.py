@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_alter_olddata_mobile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OTPDelivery',
+            fields=[
+                ('dispatch_id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('mobile', models.CharField(max_length=15)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('details', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -10,6 +10,8 @@ class OTP(models.Model):
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
+    # Verification attempts, counted when the OTP table holds live codes (users.utils.otp)
+    attempts = models.PositiveSmallIntegerField(default=0)
 
     def is_expired(self):
         return timezone.now() > self.expires_at
@@ -17,4 +19,20 @@ class OTP(models.Model):
     def save(self, *args, **kwargs):
         if not self.expires_at:
             self.expires_at = datetime.now() + timedelta(minutes=5)  # OTP valid 5 min
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class OTPDelivery(models.Model):
+    """Delivery status of a queued OTP SMS, used when the cache is per-process."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    dispatch_id = models.CharField(max_length=32, primary_key=True)
+    mobile = models.CharField(max_length=15)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    details = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from users.authentication import user_cache
+from users.models import User, Role
+
+
+# ============================================================
+# 🔹 Auth cache invalidation
+# ============================================================
+@receiver(post_save, sender=User, dispatch_uid="user_auth_cache_on_save")
+@receiver(post_delete, sender=User, dispatch_uid="user_auth_cache_on_delete")
+def user_changed(sender, instance, **kwargs):
+    user_cache.drop(instance.pk)
+
+
+@receiver(post_save, sender=Role, dispatch_uid="role_auth_cache_on_save")
+@receiver(post_delete, sender=Role, dispatch_uid="role_auth_cache_on_delete")
+def role_changed(sender, instance, **kwargs):
+    user_cache.drop_role(instance.pk)
@@ -1,3 +1,94 @@
+from unittest import mock
+
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from users.authentication import CachedJWTAuthentication, issue_tokens, user_cache
+from users.models import OTP, Role, User
+from users.utils.otp import OTP_MAX_ATTEMPTS, issue_otp, verify_otp
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Per-request auth queries: simplejwt's JWTAuthentication vs the cached one."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(name="Agent")
+        cls.user = User.objects.create_user(email="agent@example.com", mobile="9000000201", role=cls.role)
+
+    def setUp(self):
+        user_cache.drop(self.user.pk)
+
+    def request(self, user=None):
+        token = issue_tokens(user or self.user).access_token
+        return APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_tokens_carry_only_the_version_claim(self):
+        token = issue_tokens(self.user).access_token
+        self.assertIn("uv", token)
+        self.assertNotIn("role_id", token)
+        self.assertNotIn("view_all", token)
+
+    def test_query_count_per_request(self):
+        # simplejwt loads the user every request, and the role on first access
+        with self.assertNumQueries(2):
+            user, _ = JWTAuthentication().authenticate(self.request())
+            user.role.name
+
+        cached = CachedJWTAuthentication()
+        with self.assertNumQueries(1):
+            user, _ = cached.authenticate(self.request())
+            user.role.name
+        with self.assertNumQueries(0):
+            user, _ = cached.authenticate(self.request())
+            user.role.name
+
+    def test_saving_the_user_drops_the_cached_entry(self):
+        auth = CachedJWTAuthentication()
+        auth.authenticate(self.request())
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed) as raised:
+            auth.authenticate(self.request())
+        self.assertEqual(raised.exception.detail["code"], "user_inactive")
+
+    def test_saving_the_role_drops_cached_members(self):
+        auth = CachedJWTAuthentication()
+        auth.authenticate(self.request())
+
+        self.role.name = "Supervisor"
+        self.role.save()
+        user, _ = auth.authenticate(self.request())
+        self.assertEqual(user.role.name, "Supervisor")
+
+
+@mock.patch("users.utils.otp.OTP_CACHE_SHARED", False)
+class DatabaseOTPTests(TestCase):
+    """OTP table path, used when the cache is per-process (LocMem)."""
+
+    MOBILE = "9000000301"
+
+    def test_code_verifies_once(self):
+        code = issue_otp(self.MOBILE)
+        self.assertTrue(verify_otp(self.MOBILE, code))
+        self.assertFalse(verify_otp(self.MOBILE, code))
+
+    def test_wrong_guesses_burn_the_code(self):
+        code = issue_otp(self.MOBILE)
+        wrong = "0000" if code != "0000" else "1111"
+        for _ in range(OTP_MAX_ATTEMPTS):
+            self.assertFalse(verify_otp(self.MOBILE, wrong))
+
+        self.assertFalse(verify_otp(self.MOBILE, code))
+        self.assertEqual(OTP.objects.get(mobile=self.MOBILE).attempts, OTP_MAX_ATTEMPTS)
+
+    def test_new_code_resets_attempts(self):
+        issue_otp(self.MOBILE)
+        for _ in range(OTP_MAX_ATTEMPTS):
+            verify_otp(self.MOBILE, "bad")
 
-# Create your tests here.
+        code = issue_otp(self.MOBILE)
+        self.assertTrue(verify_otp(self.MOBILE, code))
@@ -8,6 +8,7 @@ from users.apis import (
     PatientViewSet,
     AddressViewSet,
     SendOTPView,
+    OTPStatusView,
     VerifyOTPView,
     LocationViewSet,
     VerifyCustomerOTPView,
@@ -47,6 +48,7 @@ urlpatterns = [
 
     # Auth endpoints
     path("auth/send-otp/", SendOTPView.as_view(), name="send-otp"),
+    path("auth/otp-status/<str:dispatch_id>/", OTPStatusView.as_view(), name="otp-status"),
     path("auth/verify-otp/", VerifyOTPView.as_view(), name="verify-otp"),
     path("auth/verify-mpin/", VerifyMPINView.as_view(), name="verify-mpin"),
     path("auth/verify-customer-otp/", VerifyCustomerOTPView.as_view(), name="verify-customer-otp"),
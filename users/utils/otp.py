@@ -0,0 +1,268 @@
+import hashlib
+import hmac
+import random
+import secrets
+import threading
+import time
+import uuid
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from notifications.utils import send_otp_sms
+from notifications.utils.dispatcher import dispatch
+from users.models import OTP, OTPDelivery
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+OTP_TTL = getattr(settings, "OTP_TTL", 300)  # seconds, OTP valid 5 min
+OTP_MAX_ATTEMPTS = getattr(settings, "OTP_MAX_ATTEMPTS", 5)  # wrong codes before the OTP is burnt
+# Fraction of issued OTPs also written to the OTP table (0 → no DB writes)
+OTP_AUDIT_SAMPLE_RATE = getattr(settings, "OTP_AUDIT_SAMPLE_RATE", 0.01)
+# A per-process cache (LocMem, no REDIS_URL) can't hold live OTPs: the worker
+# verifying a code is often not the one that issued it → use the OTP table
+OTP_CACHE_SHARED = getattr(
+    settings, "OTP_CACHE_SHARED", "locmem" not in settings.CACHES["default"]["BACKEND"].lower()
+)
+# A delivery still queued/sending after this long was lost (worker restart)
+OTP_DELIVERY_TIMEOUT = getattr(settings, "OTP_DELIVERY_TIMEOUT", 60)  # seconds
+
+# scope → (bucket capacity, seconds to refill one token)
+OTP_RATES = {
+    "otp_send_mobile": (3, 60),
+    "otp_send_ip": (20, 10),
+    "otp_verify_mobile": (10, 30),
+    "otp_verify_ip": (30, 5),
+    **getattr(settings, "OTP_RATES", {}),
+}
+
+
+# ============================================================
+# 🔹 OTP store (shared cache with native TTL expiry, else the OTP table)
+# ============================================================
+def _code_key(mobile):
+    return f"otp:code:{mobile}"
+
+
+def _fails_key(mobile):
+    return f"otp:fails:{mobile}"
+
+
+def _digest(mobile, code):
+    # Codes never sit in the cache in clear text
+    return hmac.new(settings.SECRET_KEY.encode(), f"{mobile}:{code}".encode(), hashlib.sha256).hexdigest()
+
+
+def issue_otp(mobile, user=None):
+    """Generates a fresh OTP for `mobile` (replacing any previous one) and returns the code."""
+    code = str(1000 + secrets.randbelow(9000))
+
+    if not OTP_CACHE_SHARED:
+        OTP.objects.filter(mobile=mobile, expires_at__gt=timezone.now()).delete()
+        OTP.objects.create(
+            user=user, mobile=mobile, code=code, expires_at=timezone.now() + timedelta(seconds=OTP_TTL)
+        )
+        return code
+
+    cache.set(_code_key(mobile), _digest(mobile, code), OTP_TTL)
+    cache.delete(_fails_key(mobile))
+
+    if OTP_AUDIT_SAMPLE_RATE and random.random() < OTP_AUDIT_SAMPLE_RATE:
+        OTP.objects.create(
+            user=user, mobile=mobile, code=code, expires_at=timezone.now() + timedelta(seconds=OTP_TTL)
+        )
+    return code
+
+
+def verify_otp(mobile, code):
+    """True if `code` is the live OTP for `mobile`. A verified OTP can't be reused."""
+    if not OTP_CACHE_SHARED:
+        return _verify_db_otp(mobile, code)
+
+    expected = cache.get(_code_key(mobile))
+    if expected is None:
+        return False
+
+    if hmac.compare_digest(expected, _digest(mobile, str(code))):
+        cache.delete_many([_code_key(mobile), _fails_key(mobile)])
+        return True
+
+    cache.add(_fails_key(mobile), 0, OTP_TTL)
+    try:
+        fails = cache.incr(_fails_key(mobile))
+    except ValueError:
+        fails = 1
+    if fails >= OTP_MAX_ATTEMPTS:
+        cache.delete(_code_key(mobile))
+    return False
+
+
+def _verify_db_otp(mobile, code):
+    otp = (
+        OTP.objects
+        .filter(mobile=mobile, expires_at__gt=timezone.now(), attempts__lt=OTP_MAX_ATTEMPTS)
+        .order_by("-created_at")
+        .first()
+    )
+    if otp is None:
+        return False
+    # Every guess takes an attempt before it is compared, so concurrent
+    # guesses can't get past OTP_MAX_ATTEMPTS either
+    if not OTP.objects.filter(pk=otp.pk, attempts__lt=OTP_MAX_ATTEMPTS).update(attempts=F("attempts") + 1):
+        return False
+    if not hmac.compare_digest(otp.code, str(code)):
+        return False
+    # Conditional delete: of two concurrent verifications only one wins
+    deleted, _ = OTP.objects.filter(pk=otp.pk).delete()
+    return bool(deleted)
+
+
+# ============================================================
+# 🔹 Delivery (background fast lane, pollable status)
+# ============================================================
+# Status lives where every worker can read it: the shared cache, else OTPDelivery rows
+def _status_key(dispatch_id):
+    return f"otp:delivery:{dispatch_id}"
+
+
+def _set_delivery_status(dispatch_id, mobile, status, details=None):
+    if OTP_CACHE_SHARED:
+        cache.set(
+            _status_key(dispatch_id),
+            {"status": status, "details": details, "updated_at": time.time()},
+            OTP_TTL,
+        )
+    elif status == "queued":
+        OTPDelivery.objects.create(dispatch_id=dispatch_id, mobile=mobile, status=status)
+    else:
+        OTPDelivery.objects.filter(pk=dispatch_id).update(
+            status=status, details=details, updated_at=timezone.now()
+        )
+
+
+def dispatch_otp(mobile, code):
+    """
+    Queues the OTP SMS on the dispatcher's "otp" lane and returns a
+    dispatch id; the gateway call happens off the request thread.
+    """
+    dispatch_id = uuid.uuid4().hex
+    _set_delivery_status(dispatch_id, mobile, "queued")
+    dispatch(_deliver_otp, dispatch_id, mobile, code, lane="otp")
+    return dispatch_id
+
+
+def _deliver_otp(dispatch_id, mobile, code):
+    _set_delivery_status(dispatch_id, mobile, "sending")
+    try:
+        success, response_text, _ = send_otp_sms(mobile, code)
+    except Exception as e:
+        success, response_text = False, str(e)
+    _set_delivery_status(
+        dispatch_id, mobile, "sent" if success else "failed", None if success else response_text
+    )
+
+
+def otp_delivery_status(dispatch_id):
+    """{"status": queued | sending | sent | failed, "details"} or None once expired/unknown."""
+    if OTP_CACHE_SHARED:
+        delivery = cache.get(_status_key(dispatch_id))
+        if delivery is None:
+            return None
+        updated_at = delivery.get("updated_at", time.time())
+    else:
+        delivery = (
+            OTPDelivery.objects
+            .filter(pk=dispatch_id, created_at__gt=timezone.now() - timedelta(seconds=OTP_TTL))
+            .values("status", "details", "updated_at")
+            .first()
+        )
+        if delivery is None:
+            return None
+        updated_at = delivery["updated_at"].timestamp()
+
+    status, details = delivery["status"], delivery["details"]
+    if status in ("queued", "sending") and time.time() - updated_at > OTP_DELIVERY_TIMEOUT:
+        # The in-memory queue died with its worker; the client should resend
+        status, details = "failed", "Delivery interrupted, request a new OTP"
+    return {"status": status, "details": details}
+
+
+# ============================================================
+# 🔹 Token-bucket throttles (per mobile / per IP)
+# ============================================================
+_bucket_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Bucket state (tokens, timestamp) lives in the cache and expires once it
+    would be full again. The lock serialises a process; across processes
+    updates can race, which at worst lets a handful of extra requests through.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.capacity, self.refill = OTP_RATES[scope]
+
+    def consume(self, ident):
+        """Takes one token. Returns (allowed, seconds until the next token)."""
+        key = f"otp:bucket:{self.scope}:{ident}"
+        now = time.time()
+        with _bucket_lock:
+            tokens, stamp = cache.get(key) or (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - stamp) / self.refill)
+            if tokens < 1:
+                return False, (1 - tokens) * self.refill
+            cache.set(key, (tokens - 1, now), int(self.capacity * self.refill) + 1)
+        return True, None
+
+
+class OTPThrottle(BaseThrottle):
+    scope = None
+
+    def get_bucket_ident(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_bucket_ident(request)
+        if not ident:
+            return True  # serializer rejects the request anyway
+        allowed, self._wait = TokenBucket(self.scope).consume(ident)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class MobileOTPThrottle(OTPThrottle):
+    def get_bucket_ident(self, request):
+        mobile = request.data.get("mobile")
+        return str(mobile).strip() if mobile else None
+
+
+class IPOTPThrottle(OTPThrottle):
+    def get_bucket_ident(self, request):
+        return self.get_ident(request)
+
+
+class SendOTPMobileThrottle(MobileOTPThrottle):
+    scope = "otp_send_mobile"
+
+
+class SendOTPIPThrottle(IPOTPThrottle):
+    scope = "otp_send_ip"
+
+
+class VerifyOTPMobileThrottle(MobileOTPThrottle):
+    scope = "otp_verify_mobile"
+
+
+class VerifyOTPIPThrottle(IPOTPThrottle):
+    scope = "otp_verify_ip"